@@ -0,0 +1,35 @@
+"""Refresh the BidTabs corpus cache after new letting workbooks arrive."""
+from __future__ import annotations
+
+import argparse
+import os
+
+from costest.bidtabs_io import load_region_map
+from costest.config import load_config
+from costest.corpus_cache import load_prepared_bidtabs
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Incrementally ingest BidTabs files into the corpus cache")
+    parser.add_argument("--bidtabs-dir", help="Directory containing BidTabs files")
+    parser.add_argument("--bidtabs-cache-dir", help="Directory for the prepared BidTabs corpus cache")
+    parser.add_argument("--region-map", help="Optional region map CSV/XLSX")
+    parser.add_argument("--bidtabs-workers", type=int, help="Worker processes for parsing new workbooks")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    cfg = load_config(os.environ, _parse_args(argv))
+    region_map = load_region_map(cfg.region_map_path) if cfg.region_map_path else None
+    corpus = load_prepared_bidtabs(
+        cfg.bidtabs_dir, region_map, cache_dir=cfg.bidtabs_cache_dir, workers=cfg.bidtabs_workers
+    )
+    print(
+        f"{corpus.status}: {corpus.source_files} files ({corpus.parsed_files} parsed, "
+        f"{corpus.removed_files} removed), {len(corpus.frame):,} rows -> {corpus.cache_path}"
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
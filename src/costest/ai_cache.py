@@ -0,0 +1,227 @@
+"""
+Content-addressed on-disk cache of OpenAI chat responses.
+
+The alternate selector runs at ``temperature=0`` on a deterministic JSON
+payload and the report generators send the same prompts whenever their
+inputs are unchanged, so re-runs would otherwise repeat identical
+requests.  :func:`cached_completion` keys each request by a hash of the
+model, messages and sampling parameters, and stores the response text in a
+small SQLite database.
+
+Entries older than the TTL are ignored and purged.  The store is bounded to
+``max_entries`` rows, evicting the least recently used first.  In
+cache-only mode a miss raises :class:`AICacheMiss` instead of calling the
+API, which replays an earlier run deterministically on machines without
+network access.
+
+Settings come from :func:`configure_ai_cache` (the CLI calls it from the
+runtime config) or, when it has not been called, from the environment:
+``AI_CACHE_DIR``, ``AI_CACHE_TTL_DAYS``, ``AI_CACHE_MAX_ENTRIES``,
+``AI_CACHE_ONLY`` and ``DISABLE_AI_CACHE``.  Each lookup opens its own
+short-lived connection so the cache is safe to use from the selection
+thread pool and from forked alternate-seek workers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = BASE_DIR / "data_sample" / "cache" / "ai"
+DEFAULT_TTL_DAYS = 30.0
+DEFAULT_MAX_ENTRIES = 5_000
+CACHE_VERSION = 1
+DB_NAME = "ai_responses.sqlite3"
+
+_BOOLEAN_TRUE = {"1", "true", "yes", "on"}
+
+
+class AICacheMiss(RuntimeError):
+    """Raised in cache-only mode when a request has no stored response."""
+
+
+@dataclass(frozen=True)
+class AICacheSettings:
+    cache_dir: Path = DEFAULT_CACHE_DIR
+    ttl_days: Optional[float] = DEFAULT_TTL_DAYS
+    max_entries: int = DEFAULT_MAX_ENTRIES
+    cache_only: bool = False
+    enabled: bool = True
+
+    @property
+    def path(self) -> Path:
+        return Path(self.cache_dir) / DB_NAME
+
+
+_SETTINGS: Optional[AICacheSettings] = None
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "stored": 0}
+_STATS_LOCK = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _STATS_LOCK:
+        _STATS[name] += 1
+
+
+def _env_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(str(value).strip()) if value is not None and str(value).strip() else None
+    except ValueError:
+        return None
+
+
+def settings_from_env(env: Mapping[str, str] = os.environ) -> AICacheSettings:
+    """Build :class:`AICacheSettings` from ``AI_CACHE_*`` environment variables."""
+    cache_dir = (env.get("AI_CACHE_DIR") or "").strip()
+    ttl_days = _env_float(env.get("AI_CACHE_TTL_DAYS"))
+    max_entries = _env_float(env.get("AI_CACHE_MAX_ENTRIES"))
+    return AICacheSettings(
+        cache_dir=Path(cache_dir).expanduser().resolve() if cache_dir else DEFAULT_CACHE_DIR,
+        ttl_days=DEFAULT_TTL_DAYS if ttl_days is None else (ttl_days if ttl_days > 0 else None),
+        max_entries=DEFAULT_MAX_ENTRIES if max_entries is None else max(1, int(max_entries)),
+        cache_only=str(env.get("AI_CACHE_ONLY", "")).strip().lower() in _BOOLEAN_TRUE,
+        enabled=str(env.get("DISABLE_AI_CACHE", "")).strip().lower() not in _BOOLEAN_TRUE,
+    )
+
+
+def configure_ai_cache(settings: Optional[AICacheSettings]) -> None:
+    """Use ``settings`` for this process; ``None`` reverts to the environment."""
+    global _SETTINGS
+    _SETTINGS = settings
+
+
+def ai_cache_settings() -> AICacheSettings:
+    return _SETTINGS if _SETTINGS is not None else settings_from_env()
+
+
+def request_key(model: str, messages: Sequence[Mapping[str, object]], **params: object) -> str:
+    """Hash of everything that determines a chat response."""
+    payload = [CACHE_VERSION, str(model), list(messages), sorted(params.items())]
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30.0)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses ("
+        "key TEXT PRIMARY KEY, model TEXT NOT NULL, content TEXT NOT NULL, "
+        "created REAL NOT NULL, last_used REAL NOT NULL)"
+    )
+    return conn
+
+
+def _lookup(settings: AICacheSettings, key: str) -> Optional[str]:
+    now = time.time()
+    with closing(_connect(settings.path)) as conn, conn:
+        if settings.ttl_days is not None:
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - settings.ttl_days * 86400.0,))
+        row = conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+    return None if row is None else row[0]
+
+
+def _store(settings: AICacheSettings, key: str, model: str, content: str) -> None:
+    now = time.time()
+    with closing(_connect(settings.path)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, model, content, created, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, model, content, now, now),
+        )
+        conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (settings.max_entries,),
+        )
+
+
+def cached_completion(
+    call: Callable[[], str],
+    model: str,
+    messages: Sequence[Mapping[str, object]],
+    **params: object,
+) -> str:
+    """
+    Return the response text for a chat request, calling ``call`` only on a miss.
+
+    ``params`` are the sampling options sent with the request (temperature,
+    max_tokens, ...) and take part in the key.  Cache errors are logged and
+    the request goes to the API as if there were no cache.
+    """
+    settings = ai_cache_settings()
+    if not settings.enabled:
+        return call()
+    key = request_key(model, messages, **params)
+    try:
+        content = _lookup(settings, key)
+    except (OSError, sqlite3.Error):
+        logger.warning("AI response cache at %s is unavailable", settings.path, exc_info=True)
+        content = None
+    if content is not None:
+        _count("hits")
+        return content
+    _count("misses")
+    if settings.cache_only:
+        raise AICacheMiss(f"No cached AI response for request {key[:12]} (cache-only mode)")
+    content = call()
+    try:
+        _store(settings, key, model, content)
+        _count("stored")
+    except (OSError, sqlite3.Error):
+        logger.warning("Unable to store AI response in %s", settings.path, exc_info=True)
+    return content
+
+
+def ai_cache_counts() -> Dict[str, int]:
+    """This process's hit, miss and store counters."""
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def add_ai_cache_counts(counts: Mapping[str, int]) -> None:
+    """Fold counters reported by a worker process into this process's totals."""
+    with _STATS_LOCK:
+        for name in _STATS:
+            _STATS[name] += int(counts.get(name, 0))
+
+
+def ai_cache_stats() -> Dict[str, object]:
+    """Hit/miss counts for this process plus the active settings."""
+    settings = ai_cache_settings()
+    return {
+        "enabled": settings.enabled,
+        "cache_only": settings.cache_only,
+        "path": str(settings.path),
+        "ttl_days": settings.ttl_days,
+        "max_entries": settings.max_entries,
+        **_STATS,
+    }
+
+
+__all__ = [
+    "AICacheMiss",
+    "AICacheSettings",
+    "DEFAULT_CACHE_DIR",
+    "add_ai_cache_counts",
+    "ai_cache_counts",
+    "ai_cache_settings",
+    "ai_cache_stats",
+    "cached_completion",
+    "configure_ai_cache",
+    "request_key",
+    "settings_from_env",
+]
@@ -8,6 +8,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Mapping, Sequence, Optional
 
+from .ai_cache import cached_completion
 from .text_utils import sanitize_text
 
 try:
@@ -25,31 +26,35 @@ def _call_openai(
     temperature: float = 0.3,
     max_tokens: int = 2000,
 ) -> str:
-    if OpenAIClient is None:
-        raise RuntimeError("openai package is not installed. Install it with 'pip install openai'.")
-
-    api_key = os.getenv("OPENAI_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set. Place it in API_KEY/ or export it before running.")
-
-    client = OpenAIClient(api_key=api_key)
-
     system_prompt = (
         "You are ChatGPT-5 acting as an INDOT cost-estimation modernization lead. "
         "You may consult authoritative Internet sources if helpful. "
         "Produce a pragmatic modernization plan covering alternate-seek, upstream data processing, and reporting."
     )
 
-    response = client.chat.completions.create(  # type: ignore[attr-defined]
-        model=model,
-        temperature=temperature,
-        max_tokens=max_tokens,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(prompt, indent=2)},
-        ],
-    )
-    return response.choices[0].message.content.strip()
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": json.dumps(prompt, indent=2)},
+    ]
+
+    def _request() -> str:
+        if OpenAIClient is None:
+            raise RuntimeError("openai package is not installed. Install it with 'pip install openai'.")
+
+        api_key = os.getenv("OPENAI_API_KEY", "").strip()
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY is not set. Place it in API_KEY/ or export it before running.")
+
+        client = OpenAIClient(api_key=api_key)
+        response = client.chat.completions.create(  # type: ignore[attr-defined]
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            messages=messages,
+        )
+        return response.choices[0].message.content.strip()
+
+    return cached_completion(_request, model, messages, temperature=temperature, max_tokens=max_tokens)
 
 
 
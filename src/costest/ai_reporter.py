@@ -9,6 +9,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Iterable, Mapping, Optional
 
+from .ai_cache import cached_completion
 from .text_utils import sanitize_text
 
 import pandas as pd
@@ -89,34 +90,39 @@ def _format_prompt(project_context: Mapping[str, object], items: list[AlternateR
 
 
 def _call_openai(prompt: str, model: str, temperature: float = 0.2, max_tokens: int = 1800) -> str:
-    if OpenAIClient is None:
-        raise RuntimeError(
-            "openai package is not installed. Install it with 'pip install openai'."
-        )
+    messages = [
+        {
+            "role": "system",
+            "content": "You are ChatGPT-5, a senior transportation cost estimator.",
+        },
+        {
+            "role": "user",
+            "content": prompt,
+        },
+    ]
+
+    def _request() -> str:
+        if OpenAIClient is None:
+            raise RuntimeError(
+                "openai package is not installed. Install it with 'pip install openai'."
+            )
 
-    api_key = os.getenv("OPENAI_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError(
-            "OPENAI_API_KEY is not set. Place it in API_KEY/ or export the variable before running."
+        api_key = os.getenv("OPENAI_API_KEY", "").strip()
+        if not api_key:
+            raise RuntimeError(
+                "OPENAI_API_KEY is not set. Place it in API_KEY/ or export the variable before running."
+            )
+
+        client = OpenAIClient(api_key=api_key)
+        response = client.chat.completions.create(  # type: ignore[attr-defined]
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
         )
+        return response.choices[0].message.content.strip()
 
-    client = OpenAIClient(api_key=api_key)
-    response = client.chat.completions.create(  # type: ignore[attr-defined]
-        model=model,
-        messages=[
-            {
-                "role": "system",
-                "content": "You are ChatGPT-5, a senior transportation cost estimator.",
-            },
-            {
-                "role": "user",
-                "content": prompt,
-            },
-        ],
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
-    return response.choices[0].message.content.strip()
+    return cached_completion(_request, model, messages, temperature=temperature, max_tokens=max_tokens)
 
 
 def _write_pdf(report_text: str, output_path: Path) -> Path:
@@ -233,7 +239,6 @@ def generate_alternate_seek_report(
         "expected_contract_cost": expected_contract_cost,
         "contract_filter_bounds": filtered_bounds,
         "contract_filter_percent": contract_filter_pct,
-        "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
     }
 
     prompt = _format_prompt(context, items)
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
+from .ai_cache import cached_completion
 from .ai_reporter import OpenAIClient
 
 
@@ -17,7 +19,7 @@ class AISelection:
     reason: Optional[str] = None
 
 
-def _get_client():
+def _get_client(timeout: Optional[float] = None, max_retries: Optional[int] = None):
     if OpenAIClient is None:  # type: ignore[name-defined]
         raise RuntimeError(
             "openai package is not installed. Install it with 'pip install openai'."
@@ -27,7 +29,12 @@ def _get_client():
         raise RuntimeError(
             "OPENAI_API_KEY is not set. Place it in API_KEY/ or export it before running."
         )
-    return OpenAIClient(api_key=api_key)  # type: ignore[call-arg]
+    options: Dict[str, object] = {}
+    if timeout is not None:
+        options["timeout"] = timeout
+    if max_retries is not None:
+        options["max_retries"] = max_retries
+    return OpenAIClient(api_key=api_key, **options)  # type: ignore[call-arg]
 
 
 def _clean_json_payload(content: str) -> Mapping[str, object]:
@@ -42,18 +49,65 @@ def _clean_json_payload(content: str) -> Mapping[str, object]:
     return json.loads(text)
 
 
+_SCORING_RULES = (
+    "You are ChatGPT-5 acting as a senior INDOT transportation cost estimator. "
+    "Produce repeatable, audit-grade alternate selections by using only the structured inputs provided. "
+    "For every candidate compute a stability score = overall_similarity * (0.85 + 0.15*spec_similarity) * "
+    "(0.85 + 0.15*recency_similarity) * (0.90 + 0.10*locality_similarity) * (1 + log10(data_points + 1)) * "
+    "(1 / (1 + abs(ratio - 1))). "
+    "Rank candidates by this score and select the top three "
+    "(include UNIT_PRICE_SUMMARY only if it ranks in the top three). "
+    "Normalize those scores so the weights sum to 1.0, round each weight to four decimals, "
+    "and explain in plain language how the score was derived. "
+)
+_RESULT_SCHEMA = (
+    "{\n"
+    "  \"selected\": [ {\"item_code\": str, \"weight\": float, \"reason\": str} ],\n"
+    "  \"notes\": str,\n"
+    "  \"system\": {\"overview\": str, \"steps\": [str], \"validation\": str},\n"
+    "  \"show_work_method\": str,\n"
+    "  \"process_improvements\": str\n"
+    "}"
+)
+_PAYLOAD_GUARD = (
+    "Use only the provided `similarity_scores`, `category_counts`, and candidate metadata"
+    "—never invent alternates or extrapolate beyond the payload."
+)
+_SELECTION_INSTRUCTIONS = (
+    _SCORING_RULES + "Return strict JSON with the schema:\n" + _RESULT_SCHEMA + ".\n" + _PAYLOAD_GUARD
+)
+_BATCH_INSTRUCTIONS = (
+    _SCORING_RULES
+    + "The payload holds several independent `targets`. Score each target's candidates on their own, against "
+    "that target and the `references` entry named by its `references_id`. "
+    "Return strict JSON of the form {\"results\": [...]} with exactly one entry per target, each carrying the "
+    "target's `target_id` plus the per-target schema:\n"
+    + _RESULT_SCHEMA
+    + ".\n"
+    + _PAYLOAD_GUARD
+)
+SELECTION_MAX_TOKENS = 900
+
+
 def choose_alternates_via_ai(
     target_info: Mapping[str, object],
     candidates: Iterable[Mapping[str, object]],
     references: Optional[Mapping[str, object]] = None,
     model: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
 ) -> Tuple[List[AISelection], Optional[str], Dict[str, object]]:
-    """Ask the LLM to weigh candidate alternates, returning selections and metadata."""
+    """Ask the LLM to weigh candidate alternates, returning selections and metadata.
+
+    ``timeout`` (seconds per request) and ``max_retries`` are handed to the
+    OpenAI client, which retries connection errors, 429s and 5xx responses
+    with backoff; ``None`` keeps the client defaults.  Responses are served
+    from the AI response cache when the same request was made before.
+    """
 
     if os.getenv("DISABLE_OPENAI", "0").strip().lower() in ("1", "true", "yes"):
         return [], "AI disabled via DISABLE_OPENAI", {}
 
-    client = _get_client()
     model = model or os.getenv("OPENAI_MODEL", "gpt-4.1")
 
     payload = {
@@ -62,44 +116,32 @@ def choose_alternates_via_ai(
         "references": references or {},
     }
 
-    instructions = (
-        "You are ChatGPT-5 acting as a senior INDOT transportation cost estimator. "
-        "Produce repeatable, audit-grade alternate selections by using only the structured inputs provided. "
-        "For every candidate compute a stability score = overall_similarity * (0.85 + 0.15*spec_similarity) * "
-        "(0.85 + 0.15*recency_similarity) * (0.90 + 0.10*locality_similarity) * (1 + log10(data_points + 1)) * "
-        "(1 / (1 + abs(ratio - 1))). "
-        "Rank candidates by this score and select the top three (include UNIT_PRICE_SUMMARY only if it ranks in the top three). "
-        "Normalize those scores so the weights sum to 1.0, round each weight to four decimals, and explain in plain language how the score was derived. "
-        "Return strict JSON with the schema:\n"
-        "{\n"
-        "  \"selected\": [ {\"item_code\": str, \"weight\": float, \"reason\": str} ],\n"
-        "  \"notes\": str,\n"
-        "  \"system\": {\"overview\": str, \"steps\": [str], \"validation\": str},\n"
-        "  \"show_work_method\": str,\n"
-        "  \"process_improvements\": str\n"
-        "}.\n"
-        "Use only the provided `similarity_scores`, `category_counts`, and candidate metadata—never invent alternates or extrapolate beyond the payload."
-    )
-
-    response = client.chat.completions.create(  # type: ignore[attr-defined]
-        model=model,
-        temperature=0.0,
-        max_tokens=900,
-        messages=[
-            {
-                "role": "system",
-                "content": instructions,
-            },
-            {
-                "role": "user",
-                "content": json.dumps(payload, indent=2),
-            },
-        ],
-    )
+    messages = [
+        {
+            "role": "system",
+            "content": _SELECTION_INSTRUCTIONS,
+        },
+        {
+            "role": "user",
+            "content": json.dumps(payload, indent=2),
+        },
+    ]
+
+    def _request() -> str:
+        client = _get_client(timeout=timeout, max_retries=max_retries)
+        response = client.chat.completions.create(  # type: ignore[attr-defined]
+            model=model,
+            temperature=0.0,
+            max_tokens=SELECTION_MAX_TOKENS,
+            messages=messages,
+        )
+        return response.choices[0].message.content or ""
+
+    content = cached_completion(_request, model, messages, temperature=0.0, max_tokens=SELECTION_MAX_TOKENS)
+    return _parse_selection(_clean_json_payload(content))
 
-    content = response.choices[0].message.content or ""
-    data = _clean_json_payload(content)
 
+def _parse_selection(data: object) -> Tuple[List[AISelection], Optional[str], Dict[str, object]]:
     selected_raw = data.get("selected", []) if isinstance(data, dict) else []
     notes = data.get("notes") if isinstance(data, dict) else None
     system = data.get("system") if isinstance(data, dict) else None
@@ -129,3 +171,155 @@ def choose_alternates_via_ai(
         "process_improvements": process_improvements,
     }
     return selections, str(notes) if notes is not None else None, meta
+
+
+SelectionRequest = Tuple[Mapping[str, object], Sequence[Mapping[str, object]], Optional[Mapping[str, object]]]
+SelectionOutcome = Union[Tuple[List[AISelection], Optional[str], Dict[str, object]], Exception]
+
+
+def choose_alternates_concurrently(
+    requests: Sequence[SelectionRequest],
+    concurrency: int = 1,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> List[SelectionOutcome]:
+    """Run :func:`choose_alternates_via_ai` for ``(target_info, candidates, references)`` requests.
+
+    Up to ``concurrency`` calls are in flight at once on worker threads.
+    Results come back in request order; a call that fails yields its
+    exception in place of a result instead of raising.
+    """
+
+    def _select(request: SelectionRequest):
+        target_info, candidates, references = request
+        try:
+            return choose_alternates_via_ai(
+                target_info,
+                candidates,
+                references,
+                timeout=timeout,
+                max_retries=max_retries,
+            )
+        except Exception as exc:  # noqa: BLE001
+            return exc
+
+    if concurrency <= 1 or len(requests) < 2:
+        return [_select(request) for request in requests]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(requests)), thread_name_prefix="costest-ai") as pool:
+        return list(pool.map(_select, requests))
+
+
+def _batch_payload(requests: Sequence[SelectionRequest]) -> Dict[str, object]:
+    """Pack ``requests`` into one payload, sending each distinct reference bundle once."""
+    references: Dict[str, Mapping[str, object]] = {}
+    reference_ids: Dict[str, str] = {}
+    targets = []
+    for position, (target_info, candidates, bundle) in enumerate(requests):
+        bundle = bundle or {}
+        fingerprint = json.dumps(bundle, sort_keys=True, default=str)
+        reference_id = reference_ids.get(fingerprint)
+        if reference_id is None:
+            reference_id = reference_ids[fingerprint] = f"R{len(reference_ids) + 1}"
+            references[reference_id] = bundle
+        targets.append(
+            {
+                "target_id": f"T{position + 1}",
+                "target": target_info,
+                "candidates": list(candidates),
+                "references_id": reference_id,
+            }
+        )
+    return {"references": references, "targets": targets}
+
+
+def _batch_entries(
+    data: object, requests: Sequence[SelectionRequest]
+) -> Dict[int, Tuple[List[AISelection], Optional[str], Dict[str, object]]]:
+    """Map well-formed per-target entries of a batch response back to request positions."""
+    results = data.get("results") if isinstance(data, Mapping) else None
+    if not isinstance(results, list):
+        return {}
+    parsed: Dict[int, Tuple[List[AISelection], Optional[str], Dict[str, object]]] = {}
+    for entry in results:
+        if not isinstance(entry, Mapping) or not isinstance(entry.get("selected"), list):
+            continue
+        target_id = str(entry.get("target_id", "")).strip()
+        if not target_id.startswith("T") or not target_id[1:].isdigit():
+            continue
+        position = int(target_id[1:]) - 1
+        if not 0 <= position < len(requests) or position in parsed:
+            continue
+        outcome = _parse_selection(dict(entry))
+        allowed = {str(candidate.get("item_code", "")).strip() for candidate in requests[position][1]}
+        if not outcome[0] or any(selection.item_code not in allowed for selection in outcome[0]):
+            continue
+        parsed[position] = outcome
+    return parsed
+
+
+def choose_alternates_batched(
+    requests: Sequence[SelectionRequest],
+    batch_size: int = 8,
+    concurrency: int = 1,
+    model: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> List[SelectionOutcome]:
+    """Weigh alternates for many targets with one request per ``batch_size`` targets.
+
+    Each batch shares a single instruction header and sends every distinct
+    reference bundle once.  Selections are mapped back by ``target_id``; a
+    target whose entry is missing, malformed or names an alternate outside
+    its own candidate list (or every target, when the whole response is
+    unusable) falls back to its own :func:`choose_alternates_via_ai` call.
+    Up to ``concurrency`` batches run at once and results come back in
+    request order, with failures returned in place as exceptions.
+    """
+
+    if os.getenv("DISABLE_OPENAI", "0").strip().lower() in ("1", "true", "yes"):
+        return [([], "AI disabled via DISABLE_OPENAI", {}) for _ in requests]
+    model = model or os.getenv("OPENAI_MODEL", "gpt-4.1")
+
+    def _single(request: SelectionRequest) -> SelectionOutcome:
+        target_info, candidates, references = request
+        try:
+            return choose_alternates_via_ai(
+                target_info, candidates, references, model=model, timeout=timeout, max_retries=max_retries
+            )
+        except Exception as exc:  # noqa: BLE001
+            return exc
+
+    def _batch(chunk: Sequence[SelectionRequest]) -> List[SelectionOutcome]:
+        if len(chunk) == 1:
+            return [_single(chunk[0])]
+        messages = [
+            {"role": "system", "content": _BATCH_INSTRUCTIONS},
+            {"role": "user", "content": json.dumps(_batch_payload(chunk), indent=2)},
+        ]
+        max_tokens = SELECTION_MAX_TOKENS * len(chunk)
+
+        def _request() -> str:
+            client = _get_client(timeout=timeout, max_retries=max_retries)
+            response = client.chat.completions.create(  # type: ignore[attr-defined]
+                model=model,
+                temperature=0.0,
+                max_tokens=max_tokens,
+                messages=messages,
+            )
+            return response.choices[0].message.content or ""
+
+        try:
+            content = cached_completion(_request, model, messages, temperature=0.0, max_tokens=max_tokens)
+            parsed = _batch_entries(_clean_json_payload(content), chunk)
+        except Exception:  # noqa: BLE001 - fall back per target below
+            parsed = {}
+        return [parsed[position] if position in parsed else _single(request) for position, request in enumerate(chunk)]
+
+    size = max(1, int(batch_size))
+    chunks = [requests[start : start + size] for start in range(0, len(requests), size)]
+    if concurrency <= 1 or len(chunks) < 2:
+        batches = [_batch(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks)), thread_name_prefix="costest-ai") as pool:
+            batches = list(pool.map(_batch, chunks))
+    return [outcome for batch in batches for outcome in batch]
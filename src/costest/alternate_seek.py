@@ -3,15 +3,23 @@
 from __future__ import annotations
 
 import math
+import time
+import weakref
 from dataclasses import dataclass, field
-from typing import Dict, List, Mapping, Optional, Tuple
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from . import reference_data
-from .ai_selector import choose_alternates_via_ai
+from .ai_selector import (
+    AISelection,
+    choose_alternates_batched,
+    choose_alternates_concurrently,
+    choose_alternates_via_ai,
+)
 from .geometry import GeometryInfo
-from .price_logic import MIN_SAMPLE_TARGET, category_breakdown
+from .price_logic import MIN_SAMPLE_TARGET, BidTabsIndex, bidtabs_frame, category_breakdown
 
 CATEGORY_LABELS = [
     "DIST_12M",
@@ -30,6 +38,10 @@ SIMILARITY_WEIGHTS = {
     "data_volume_score": 0.1,
 }
 
+# Description keywords whose presence must agree between target and candidate.
+SPEC_KEYWORDS = ("COAT", "GALV", "REINFORC", "TEMPORARY", "POLYMER", "STAINLESS")
+_KEYWORD_PENALTY = 0.15
+
 _MIN_TARGET = max(10, MIN_SAMPLE_TARGET)
 _MAX_STABLE_ALTERNATES = 3
 _MAX_CANDIDATES = 50
@@ -90,6 +102,36 @@ class AlternateResult:
     process_improvements: Optional[str] = None
 
 
+@dataclass
+class AlternateSearch:
+    """Candidates gathered for one target item, ready for the AI selection step."""
+
+    bidtabs: pd.DataFrame | BidTabsIndex
+    target_code: str
+    target_area: float
+    project_region: int | None
+    candidates: List[AlternateCandidate]
+    candidate_map: Dict[str, AlternateCandidate]
+    candidate_payload: List[Dict[str, object]]
+    target_info: Dict[str, object]
+    reference_bundle: Mapping[str, object] | None
+    unit_price_value: float
+    unit_price_contracts: int
+
+    def ai_candidates(self) -> List[Dict[str, object]]:
+        """Copies of the candidate payload safe to hand to the AI selector."""
+        payloads = []
+        for payload in self.candidate_payload:
+            payload_copy = dict(payload)
+            payload_copy["similarity_scores"] = dict(payload_copy.get("similarity_scores", {}))
+            payloads.append(payload_copy)
+        return payloads
+
+
+# Outcome of one AI selection call: its result, or the exception it raised.
+AIOutcome = Union[Tuple[List[AISelection], Optional[str], Dict[str, object]], Exception]
+
+
 def _item_prefix(item_code: str) -> str:
     item_code = str(item_code)
     if "-" in item_code:
@@ -97,6 +139,86 @@ def _item_prefix(item_code: str) -> str:
     return item_code[:3]
 
 
+class GeometryCandidateIndex:
+    """
+    Geometry rows of a BidTabs frame bucketed by item prefix and shape.
+
+    Every row with a ``GEOM_AREA_SQFT`` and a dashed item code lands in its
+    prefix bucket and, when it has a ``GEOM_SHAPE``, in its (prefix, shape)
+    bucket.  Each bucket keeps its rows sorted by area, so the alternate-seek
+    area window is a ``searchsorted`` range rather than a corpus scan.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._by_prefix: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._by_shape: Dict[Tuple[str, object], Tuple[np.ndarray, np.ndarray]] = {}
+        if frame.empty or "GEOM_AREA_SQFT" not in frame.columns:
+            return
+
+        parts = frame["ITEM_CODE"].astype(str).str.partition("-")
+        area = pd.to_numeric(frame["GEOM_AREA_SQFT"], errors="coerce").to_numpy(dtype=float)
+        positions = np.flatnonzero((parts[1] == "-").to_numpy() & ~np.isnan(area))
+        table = pd.DataFrame(
+            {
+                "prefix": parts[0].to_numpy(dtype=object)[positions],
+                "shape": (
+                    frame["GEOM_SHAPE"].astype(object).to_numpy()[positions]
+                    if "GEOM_SHAPE" in frame.columns
+                    else None
+                ),
+                "area": area[positions],
+                "position": positions,
+            }
+        ).sort_values("area", kind="stable")
+
+        for prefix, block in table.groupby("prefix", sort=False):
+            self._by_prefix[prefix] = (block["area"].to_numpy(), block["position"].to_numpy())
+        for (prefix, shape), block in table.dropna(subset=["shape"]).groupby(["prefix", "shape"], sort=False):
+            self._by_shape[(prefix, shape)] = (block["area"].to_numpy(), block["position"].to_numpy())
+
+    def candidate_rows(
+        self,
+        prefix: str,
+        shape: Optional[str],
+        lower: float,
+        upper: float,
+        exclude_code: str,
+    ) -> pd.DataFrame:
+        """Rows with code ``<prefix>-*`` (not ``exclude_code``) whose area is in ``[lower, upper]``.
+
+        ``shape=None`` accepts any shape.  Rows keep their original order and
+        index labels.
+        """
+        bucket = self._by_prefix.get(prefix) if shape is None else self._by_shape.get((prefix, shape))
+        if bucket is None:
+            return self.frame.iloc[0:0]
+        areas, positions = bucket
+        start = np.searchsorted(areas, lower, side="left")
+        stop = np.searchsorted(areas, upper, side="right")
+        rows = self.frame.iloc[np.sort(positions[start:stop])]
+        return rows.loc[rows["ITEM_CODE"] != exclude_code]
+
+
+_CANDIDATE_INDEXES: "weakref.WeakKeyDictionary[BidTabsIndex, GeometryCandidateIndex]" = weakref.WeakKeyDictionary()
+
+
+def geometry_candidate_index(bidtabs: pd.DataFrame | BidTabsIndex) -> GeometryCandidateIndex:
+    """
+    Return the :class:`GeometryCandidateIndex` for ``bidtabs``.
+
+    The index is built once per :class:`BidTabsIndex` view (and its ``as_of``
+    date) and reused by every later search; plain frames get a fresh one.
+    """
+    if isinstance(bidtabs, pd.DataFrame):
+        return GeometryCandidateIndex(bidtabs)
+    index = _CANDIDATE_INDEXES.get(bidtabs)
+    if index is None:
+        index = GeometryCandidateIndex(bidtabs_frame(bidtabs))
+        _CANDIDATE_INDEXES[bidtabs] = index
+    return index
+
+
 def _clamp(value: float, *, lower: float = 0.0, upper: float = 1.0) -> float:
     return max(lower, min(upper, value))
 
@@ -123,6 +245,23 @@ def _has_keyword(text: str | None, keyword: str) -> bool:
     return keyword.upper() in text.upper()
 
 
+def _keyword_mask(text: str | None) -> int:
+    """Bit ``i`` is set when ``SPEC_KEYWORDS[i]`` occurs in ``text``."""
+    if not text:
+        return 0
+    upper = text.upper()
+    return sum(1 << bit for bit, keyword in enumerate(SPEC_KEYWORDS) if keyword in upper)
+
+
+def _payitem_description(bundle: Mapping[str, object] | None) -> str:
+    if not isinstance(bundle, Mapping):
+        return ""
+    try:
+        return str((bundle.get("payitem") or {}).get("description", ""))
+    except AttributeError:
+        return ""
+
+
 def _score_candidate(
     target_area: float,
     target_shape: Optional[str],
@@ -133,6 +272,7 @@ def _score_candidate(
     target_description: Optional[str] = None,
     area_tolerance: float = 0.2,
 ) -> Tuple[Dict[str, float], List[str]]:
+    """Similarity scores and notes for one candidate (see :func:`_score_candidates`)."""
     notes: List[str] = []
 
     area_ratio = 0.0
@@ -171,29 +311,16 @@ def _score_candidate(
     else:
         notes.append("Candidate missing specification section metadata")
 
-    target_payitem_desc = ""
-    if isinstance(target_bundle, Mapping):
-        try:
-            target_payitem_desc = str((target_bundle.get("payitem") or {}).get("description", ""))
-        except AttributeError:
-            target_payitem_desc = ""
-    target_desc = " ".join(filter(None, [target_description, target_payitem_desc]))
-
-    candidate_payitem_desc = ""
-    if isinstance(candidate_bundle, Mapping):
-        try:
-            candidate_payitem_desc = str((candidate_bundle.get("payitem") or {}).get("description", ""))
-        except AttributeError:
-            candidate_payitem_desc = ""
-    cand_desc = " ".join(filter(None, [candidate.description, candidate_payitem_desc]))
+    target_desc = " ".join(filter(None, [target_description, _payitem_description(target_bundle)]))
+    cand_desc = " ".join(filter(None, [candidate.description, _payitem_description(candidate_bundle)]))
 
-    def _adjust_for_keyword(keyword: str, penalty: float = 0.15) -> None:
+    def _adjust_for_keyword(keyword: str, penalty: float = _KEYWORD_PENALTY) -> None:
         nonlocal spec_score
         if _has_keyword(target_desc, keyword) != _has_keyword(cand_desc, keyword):
             spec_score = _clamp(spec_score - penalty)
             notes.append(f"Keyword mismatch: '{keyword}' present in one description only")
 
-    for kw in ("COAT", "GALV", "REINFORC", "TEMPORARY", "POLYMER", "STAINLESS"):
+    for kw in SPEC_KEYWORDS:
         _adjust_for_keyword(kw)
 
     counts = {label: int(candidate.cat_data.get(f"{label}_COUNT", 0) or 0) for label in CATEGORY_LABELS}
@@ -229,19 +356,144 @@ def _score_candidate(
     return scores, notes
 
 
-def _build_candidate(
-    bidtabs: pd.DataFrame,
-    code: str,
-    group: pd.DataFrame,
+def _score_candidates(
     target_area: float,
     target_shape: Optional[str],
-    project_region: int | None,
+    candidates: Sequence[AlternateCandidate],
     target_bundle: Mapping[str, object] | None,
+    candidate_bundles: Sequence[Mapping[str, object] | None],
     *,
     target_description: Optional[str] = None,
-    area_tolerance: float = 0.2,
+    area_tolerances: Sequence[float] | float = 0.2,
+) -> List[Tuple[Dict[str, float], List[str]]]:
+    """
+    :func:`_score_candidate` for a whole candidate pool at once.
+
+    Each candidate is reduced to feature arrays (area, shape and section
+    match levels, keyword bitmasks, category counts, data points) and every
+    sub-score is computed with NumPy in the same operation order as the
+    scalar function, so the numbers and notes are identical.
+    """
+    count = len(candidates)
+    if not count:
+        return []
+    tolerance = np.broadcast_to(np.asarray(area_tolerances, dtype=float), (count,))
+
+    area = np.array([candidate.area_sqft for candidate in candidates], dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        has_area = (area > 0) & (target_area > 0)
+        area_ratio = np.where(has_area, np.minimum(area, target_area) / np.maximum(area, target_area), 0.0)
+        area_gap = np.abs(area - target_area) / max(target_area, 1e-6)
+    area_flagged = has_area & (area_gap > tolerance)
+
+    shapes = [candidate.shape or "" for candidate in candidates]
+    has_shape = np.array([bool(shape) for shape in shapes])
+    if target_shape:
+        same_shape = np.array([shape == target_shape for shape in shapes])
+        same_family = np.array([shape[:3] == target_shape[:3] for shape in shapes])
+        shape_score = np.select(
+            [has_shape & same_shape, has_shape & same_family, has_shape], [1.0, 0.7, 0.4], default=0.6
+        )
+        shape_flagged = has_shape & ~same_shape & ~same_family
+    else:
+        shape_score = np.where(has_shape, 0.6, 0.5)
+        shape_flagged = np.zeros(count, dtype=bool)
+    geometry_score = np.clip(0.7 * area_ratio + 0.3 * shape_score, 0.0, 1.0)
+
+    target_section = _extract_section_id(target_bundle)
+    sections = [_extract_section_id(bundle) for bundle in candidate_bundles]
+    has_section = np.array([bool(section) for section in sections])
+    if target_section:
+        target_major = target_section.split(".")[0]
+        same_section = np.array([section == target_section for section in sections])
+        same_major = np.array([section.split(".")[0] == target_major for section in sections])
+        spec_score = np.select(
+            [has_section & same_section, has_section & same_major, has_section], [1.0, 0.75, 0.55], default=0.5
+        )
+        section_flagged = has_section & ~same_section & ~same_major
+    else:
+        spec_score = np.where(has_section, 0.6, 0.5)
+        section_flagged = np.zeros(count, dtype=bool)
+
+    target_mask = _keyword_mask(" ".join(filter(None, [target_description, _payitem_description(target_bundle)])))
+    candidate_masks = np.array(
+        [
+            _keyword_mask(" ".join(filter(None, [candidate.description, _payitem_description(bundle)])))
+            for candidate, bundle in zip(candidates, candidate_bundles)
+        ],
+        dtype=np.int64,
+    )
+    keyword_mismatch = candidate_masks ^ target_mask
+    for bit in range(len(SPEC_KEYWORDS)):
+        mismatched = ((keyword_mismatch >> bit) & 1).astype(bool)
+        spec_score = np.where(mismatched, np.clip(spec_score - _KEYWORD_PENALTY, 0.0, 1.0), spec_score)
+
+    counts = np.array(
+        [
+            [int(candidate.cat_data.get(f"{label}_COUNT", 0) or 0) for label in CATEGORY_LABELS]
+            for candidate in candidates
+        ],
+        dtype=np.int64,
+    ).reshape(count, len(CATEGORY_LABELS))
+    total_counts = counts.sum(axis=1)
+    recent = counts[:, 0] + counts[:, 3]
+    mid = counts[:, 1] + counts[:, 4]
+    long = counts[:, 2] + counts[:, 5]
+    locality_counts = counts[:, 0] + counts[:, 1] + counts[:, 2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recency_score = np.where(
+            total_counts > 0, np.clip((3 * recent + 2 * mid + long) / (3 * total_counts), 0.0, 1.0), 0.0
+        )
+        locality_score = np.where(total_counts > 0, np.clip(locality_counts / total_counts, 0.0, 1.0), 0.0)
+
+    data_points = np.array([candidate.data_points for candidate in candidates], dtype=np.int64)
+    data_volume_score = np.clip(data_points / max(_MIN_TARGET, 1), 0.0, 1.0)
+
+    columns = {
+        "geometry_score": geometry_score,
+        "spec_score": np.clip(spec_score, 0.0, 1.0),
+        "recency_score": recency_score,
+        "locality_score": locality_score,
+        "data_volume_score": data_volume_score,
+    }
+    overall = np.zeros(count)
+    for key, weight in SIMILARITY_WEIGHTS.items():
+        overall = overall + weight * columns[key]
+    columns["overall_score"] = np.clip(overall, 0.0, 1.0)
+
+    results: List[Tuple[Dict[str, float], List[str]]] = []
+    for position, candidate in enumerate(candidates):
+        notes: List[str] = []
+        if area_flagged[position]:
+            notes.append(f"Area differs {area_gap[position]:.0%} from target")
+        if shape_flagged[position]:
+            notes.append(f"Shape mismatch: target={target_shape} candidate={candidate.shape}")
+        if section_flagged[position]:
+            notes.append(f"Spec section differs: target={target_section} candidate={sections[position]}")
+        elif not has_section[position]:
+            notes.append("Candidate missing specification section metadata")
+        for bit, keyword in enumerate(SPEC_KEYWORDS):
+            if (int(keyword_mismatch[position]) >> bit) & 1:
+                notes.append(f"Keyword mismatch: '{keyword}' present in one description only")
+        if total_counts[position] == 0:
+            notes.append("No BidTabs recency data available; relying on statewide surrogates")
+        if candidate.data_points < _MIN_TARGET:
+            notes.append(f"Only {candidate.data_points} BidTabs data points (target {_MIN_TARGET})")
+        scores = {key: float(values[position]) for key, values in columns.items()}
+        results.append((scores, notes))
+    return results
+
+
+def _candidate_stub(
+    bidtabs: pd.DataFrame | BidTabsIndex,
+    code: str,
+    group: pd.DataFrame,
+    target_area: float,
+    project_region: int | None,
+    *,
     source: str,
-) -> Optional[AlternateCandidate]:
+) -> Optional[Tuple[AlternateCandidate, Mapping[str, object]]]:
+    """Price ``code`` and return its unscored candidate with its reference bundle."""
     area_series = pd.to_numeric(group.get("GEOM_AREA_SQFT"), errors="coerce") if "GEOM_AREA_SQFT" in group else None
     if area_series is not None:
         area_series = area_series.dropna()
@@ -274,7 +526,7 @@ def _build_candidate(
         description = str(desc_series.dropna().iloc[0])
 
     candidate_bundle = reference_data.build_reference_bundle(code)
-    placeholder = AlternateCandidate(
+    candidate = AlternateCandidate(
         item_code=code,
         description=description,
         area_sqft=candidate_area,
@@ -285,21 +537,9 @@ def _build_candidate(
         cat_data=dict(cat_data),
         shape=candidate_shape,
         source=source,
+        spec_section=_extract_section_id(candidate_bundle),
     )
-    scores, notes = _score_candidate(
-        target_area,
-        target_shape,
-        placeholder,
-        target_bundle,
-        candidate_bundle,
-        target_description=target_description,
-        area_tolerance=area_tolerance,
-    )
-
-    placeholder.similarity = scores
-    placeholder.notes = notes
-    placeholder.spec_section = _extract_section_id(candidate_bundle)
-    return placeholder
+    return candidate, candidate_bundle
 
 
 def _build_unit_price_candidate(
@@ -434,6 +674,29 @@ def _deterministic_weight_score(candidate: AlternateCandidate) -> float:
     return overall * spec_boost * recency_boost * locality_boost * data_factor * ratio_penalty * reference_bias
 
 
+def _deterministic_weight_scores(candidates: Sequence[AlternateCandidate]) -> np.ndarray:
+    """:func:`_deterministic_weight_score` for every candidate, computed once as arrays."""
+    if not candidates:
+        return np.zeros(0)
+    overall = np.array([max(cand.similarity.get("overall_score", 0.0), 0.0) for cand in candidates], dtype=float)
+
+    def component(name: str) -> np.ndarray:
+        return np.array([cand.similarity.get(name, base) for cand, base in zip(candidates, overall)], dtype=float)
+
+    spec = component("spec_score")
+    recency = component("recency_score")
+    locality = component("locality_score")
+    # math.log10 keeps the data factor bit-identical to the scalar score.
+    data_factor = 1.0 + np.array([math.log10(max(cand.data_points, 0) + 1) for cand in candidates], dtype=float)
+    ratio_penalty = 1.0 / (1.0 + np.abs(np.array([cand.ratio for cand in candidates], dtype=float) - 1.0))
+    spec_boost = 0.85 + 0.15 * np.maximum(spec, 0.0)
+    recency_boost = 0.85 + 0.15 * np.maximum(recency, 0.0)
+    locality_boost = 0.9 + 0.1 * np.maximum(locality, 0.0)
+    reference_bias = np.array([0.65 if cand.item_code == "UNIT_PRICE_SUMMARY" else 1.0 for cand in candidates])
+    score = overall * spec_boost * recency_boost * locality_boost * data_factor * ratio_penalty * reference_bias
+    return np.where(overall > 0, score, 0.0)
+
+
 def _stabilize_ai_selections(
     selections: List[SelectedAlternate],
     candidate_map: Mapping[str, AlternateCandidate],
@@ -456,9 +719,13 @@ def _stabilize_ai_selections(
     if not merged:
         return []
 
+    pool = list(candidate_map.values())
+    deterministic = {
+        cand.item_code: float(score) for cand, score in zip(pool, _deterministic_weight_scores(pool))
+    }
     scored_candidates = sorted(
-        candidate_map.values(),
-        key=lambda cand: (_deterministic_weight_score(cand), cand.data_points, -abs(cand.ratio - 1.0)),
+        pool,
+        key=lambda cand: (deterministic[cand.item_code], cand.data_points, -abs(cand.ratio - 1.0)),
         reverse=True,
     )
 
@@ -484,8 +751,7 @@ def _stabilize_ai_selections(
         cand = candidate_map.get(sel.item_code)
         if not cand:
             continue
-        score = _deterministic_weight_score(cand)
-        scored_pairs.append((sel, score))
+        scored_pairs.append((sel, deterministic[sel.item_code]))
 
     if not scored_pairs:
         return list(merged.values())
@@ -509,17 +775,16 @@ def _stabilize_ai_selections(
     return [pair[0] for pair in scored_pairs]
 
 
-def find_alternate_price(
-    bidtabs: pd.DataFrame,
+def gather_alternate_candidates(
+    bidtabs: pd.DataFrame | BidTabsIndex,
     target_code: str,
     target_geometry: GeometryInfo | None,
     area_tolerance: float = 0.2,
     project_region: int | None = None,
     target_description: Optional[str] = None,
     reference_bundle: Optional[Mapping[str, object]] = None,
-    allow_ai: bool = True,
-) -> Optional[AlternateResult]:
-    """Return an alternate-seek estimate enriched with reference datasets."""
+) -> Optional[AlternateSearch]:
+    """First phase of alternate seek: collect and score candidates for ``target_code``."""
 
     if target_geometry is None or not math.isfinite(target_geometry.area_sqft) or target_geometry.area_sqft <= 0:
         return None
@@ -536,89 +801,66 @@ def find_alternate_price(
     target_shape = getattr(target_geometry, "shape", None)
     prefix = _item_prefix(target_code)
 
-    candidates_df = bidtabs.copy()
-    candidates_df = candidates_df.loc[candidates_df["ITEM_CODE"].astype(str).str.startswith(prefix + "-")]
-    candidates_df = candidates_df.loc[candidates_df["ITEM_CODE"] != target_code]
-    candidates_df = candidates_df.loc[candidates_df["GEOM_AREA_SQFT"].notna()]
-
-    if target_shape and target_shape != "min_area":
-        candidates_df = candidates_df.loc[candidates_df["GEOM_SHAPE"] == target_shape]
-
     lower = target_area * (1 - area_tolerance)
     upper = target_area * (1 + area_tolerance)
-    candidates_df = candidates_df.loc[
-        (candidates_df["GEOM_AREA_SQFT"] >= lower)
-        & (candidates_df["GEOM_AREA_SQFT"] <= upper)
-    ]
+    candidates_df = geometry_candidate_index(bidtabs).candidate_rows(
+        prefix,
+        target_shape if target_shape and target_shape != "min_area" else None,
+        lower,
+        upper,
+        target_code,
+    )
 
     candidates: List[AlternateCandidate] = []
     candidate_payload: List[Dict[str, object]] = []
     candidate_map: Dict[str, AlternateCandidate] = {}
+    candidate_bundles: List[Mapping[str, object]] = []
+    area_tolerances: List[float] = []
 
     for code, group in candidates_df.groupby("ITEM_CODE"):
-        candidate = _build_candidate(
-            bidtabs,
-            str(code),
-            group,
-            target_area,
-            target_shape,
-            project_region,
-            reference_bundle,
-            target_description=target_description,
-            area_tolerance=area_tolerance,
-            source="bidtabs-prefix",
-        )
-        if not candidate:
+        stub = _candidate_stub(bidtabs, str(code), group, target_area, project_region, source="bidtabs-prefix")
+        if not stub:
             continue
+        candidate, candidate_bundle = stub
         candidates.append(candidate)
         candidate_map[candidate.item_code] = candidate
-        candidate_payload.append(
-            {
-                "item_code": candidate.item_code,
-                "description": candidate.description,
-                "area_sqft": candidate.area_sqft,
-                "shape": candidate.shape,
-                "adjusted_price": candidate.adjusted_price,
-                "base_price": candidate.base_price,
-                "ratio": candidate.ratio,
-                "data_points": candidate.data_points,
-                "similarity_scores": candidate.similarity,
-                "notes": candidate.notes,
-                "source": candidate.source,
-                "category_counts": {
-                    label: int(candidate.cat_data.get(f"{label}_COUNT", 0) or 0)
-                    for label in CATEGORY_LABELS
-                },
-                "spec_section": candidate.spec_section,
-            }
-        )
+        candidate_bundles.append(candidate_bundle)
+        area_tolerances.append(area_tolerance)
 
     related_items = (reference_bundle or {}).get("related_items") or []
     for related in related_items:
         code = str(related.get("item_code") or "").strip()
         if not code or code == target_code or code in candidate_map:
             continue
-        related_group = bidtabs.loc[bidtabs["ITEM_CODE"].astype(str) == code]
+        if isinstance(bidtabs, pd.DataFrame):
+            related_group = bidtabs.loc[bidtabs["ITEM_CODE"].astype(str) == code]
+        else:
+            related_group = bidtabs.rows(code)
         if related_group.empty and unit_price_value <= 0:
             continue
         if related_group.empty:
             continue
-        candidate = _build_candidate(
-            bidtabs,
-            code,
-            related_group,
-            target_area,
-            target_shape,
-            project_region,
-            reference_bundle,
-            target_description=target_description,
-            area_tolerance=0.35,
-            source="bidtabs-related",
-        )
-        if not candidate:
+        stub = _candidate_stub(bidtabs, code, related_group, target_area, project_region, source="bidtabs-related")
+        if not stub:
             continue
+        candidate, candidate_bundle = stub
         candidates.append(candidate)
         candidate_map[candidate.item_code] = candidate
+        candidate_bundles.append(candidate_bundle)
+        area_tolerances.append(0.35)
+
+    scored = _score_candidates(
+        target_area,
+        target_shape,
+        candidates,
+        reference_bundle,
+        candidate_bundles,
+        target_description=target_description,
+        area_tolerances=area_tolerances,
+    )
+    for candidate, (scores, notes) in zip(candidates, scored):
+        candidate.similarity = scores
+        candidate.notes = notes
         candidate_payload.append(
             {
                 "item_code": candidate.item_code,
@@ -684,23 +926,69 @@ def find_alternate_price(
         "related_items": (reference_bundle or {}).get("related_items"),
     }
 
+    return AlternateSearch(
+        bidtabs=bidtabs,
+        target_code=target_code,
+        target_area=target_area,
+        project_region=project_region,
+        candidates=candidates,
+        candidate_map=candidate_map,
+        candidate_payload=candidate_payload,
+        target_info=target_info,
+        reference_bundle=reference_bundle,
+        unit_price_value=unit_price_value,
+        unit_price_contracts=unit_price_contracts,
+    )
+
+
+def select_alternates_via_ai(
+    search: AlternateSearch,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> AIOutcome:
+    """Second phase: ask the AI selector to weigh ``search``'s candidates."""
+    try:
+        return choose_alternates_via_ai(
+            target_info=search.target_info,
+            candidates=search.ai_candidates(),
+            references=search.reference_bundle,
+            timeout=timeout,
+            max_retries=max_retries,
+        )
+    except Exception as exc:  # noqa: BLE001
+        return exc
+
+
+def complete_alternate_price(
+    search: AlternateSearch,
+    ai_outcome: Optional[AIOutcome] = None,
+) -> Optional[AlternateResult]:
+    """
+    Final phase: blend the selected alternates into an :class:`AlternateResult`.
+
+    ``ai_outcome`` is ``None`` when AI selection was disabled; a failed call
+    (an exception) falls back to the deterministic selection like an empty one.
+    """
+    bidtabs = search.bidtabs
+    target_code = search.target_code
+    target_area = search.target_area
+    project_region = search.project_region
+    candidates = search.candidates
+    candidate_map = search.candidate_map
+    candidate_payload = search.candidate_payload
+    reference_bundle = search.reference_bundle
+    unit_price_value = search.unit_price_value
+    unit_price_contracts = search.unit_price_contracts
+
     ai_notes: Optional[str] = None
     ai_meta: Dict[str, object] = {}
     selections: List[SelectedAlternate] = []
 
-    if allow_ai:
-        candidate_payload_for_ai = []
-        for payload in candidate_payload:
-            payload_copy = dict(payload)
-            payload_copy["similarity_scores"] = dict(payload_copy.get("similarity_scores", {}))
-            candidate_payload_for_ai.append(payload_copy)
-
+    if isinstance(ai_outcome, Exception):
+        ai_notes = f"AI selection failed: {ai_outcome}"
+    elif ai_outcome is not None:
         try:
-            ai_selected, ai_notes, ai_meta = choose_alternates_via_ai(
-                target_info=target_info,
-                candidates=candidate_payload_for_ai,
-                references=reference_bundle,
-            )
+            ai_selected, ai_notes, ai_meta = ai_outcome
             for sel in ai_selected:
                 cand = candidate_map.get(sel.item_code)
                 if not cand:
@@ -863,3 +1151,110 @@ def find_alternate_price(
             else None
         ),
     )
+
+
+def find_alternate_price(
+    bidtabs: pd.DataFrame | BidTabsIndex,
+    target_code: str,
+    target_geometry: GeometryInfo | None,
+    area_tolerance: float = 0.2,
+    project_region: int | None = None,
+    target_description: Optional[str] = None,
+    reference_bundle: Optional[Mapping[str, object]] = None,
+    allow_ai: bool = True,
+    ai_timeout: Optional[float] = None,
+    ai_retries: Optional[int] = None,
+) -> Optional[AlternateResult]:
+    """Return an alternate-seek estimate enriched with reference datasets."""
+
+    search = gather_alternate_candidates(
+        bidtabs,
+        target_code,
+        target_geometry,
+        area_tolerance=area_tolerance,
+        project_region=project_region,
+        target_description=target_description,
+        reference_bundle=reference_bundle,
+    )
+    if search is None:
+        return None
+    if not allow_ai:
+        return complete_alternate_price(search)
+    selection = select_alternates_via_ai(search, timeout=ai_timeout, max_retries=ai_retries)
+    return complete_alternate_price(search, selection)
+
+
+def find_alternate_prices(
+    bidtabs: pd.DataFrame | BidTabsIndex,
+    targets: Sequence[Tuple[str, GeometryInfo | None, Optional[str], Optional[Mapping[str, object]]]],
+    project_region: int | None = None,
+    allow_ai: bool = True,
+    ai_concurrency: int = 1,
+    ai_timeout: Optional[float] = None,
+    ai_retries: Optional[int] = None,
+    ai_batch_size: int = 1,
+    return_timings: bool = False,
+) -> Union[List[Optional[AlternateResult]], Tuple[List[Optional[AlternateResult]], List[float]]]:
+    """
+    :func:`find_alternate_price` for many ``(code, geometry, description, references)`` targets.
+
+    Candidates are gathered for every target first.  The AI selection round
+    trips then run on up to ``ai_concurrency`` threads, each with
+    ``ai_timeout`` seconds and ``ai_retries`` retries; with ``ai_batch_size``
+    above 1 up to that many targets share one request (see
+    :func:`~costest.ai_selector.choose_alternates_batched`).  Results are
+    blended in target order, so the output does not depend on which call
+    finished first.
+
+    With ``return_timings`` the result is ``(results, seconds)``: each
+    target's own search and blend time plus an equal share of the AI phase
+    among the targets sent to it.
+    """
+    seconds = [0.0] * len(targets)
+    searches = []
+    for position, (code, geometry, description, references) in enumerate(targets):
+        started = time.perf_counter()
+        searches.append(
+            gather_alternate_candidates(
+                bidtabs,
+                code,
+                geometry,
+                project_region=project_region,
+                target_description=description,
+                reference_bundle=references,
+            )
+        )
+        seconds[position] += time.perf_counter() - started
+    outcomes: Dict[int, AIOutcome] = {}
+    if allow_ai:
+        ai_started = time.perf_counter()
+        pending = [position for position, search in enumerate(searches) if search is not None]
+        requests = [
+            (searches[position].target_info, searches[position].ai_candidates(), searches[position].reference_bundle)
+            for position in pending
+        ]
+        if ai_batch_size > 1:
+            results = choose_alternates_batched(
+                requests,
+                batch_size=ai_batch_size,
+                concurrency=ai_concurrency,
+                timeout=ai_timeout,
+                max_retries=ai_retries,
+            )
+        else:
+            results = choose_alternates_concurrently(
+                requests,
+                concurrency=ai_concurrency,
+                timeout=ai_timeout,
+                max_retries=ai_retries,
+            )
+        outcomes = dict(zip(pending, results))
+        ai_share = (time.perf_counter() - ai_started) / max(len(pending), 1)
+        for position in pending:
+            seconds[position] += ai_share
+    blended: List[Optional[AlternateResult]] = []
+    for position, search in enumerate(searches):
+        started = time.perf_counter()
+        blended.append(None if search is None else complete_alternate_price(search, outcomes.get(position)))
+        seconds[position] += time.perf_counter() - started
+    return (blended, seconds) if return_timings else blended
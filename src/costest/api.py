@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Dict, Iterable, Optional
 
-from .config import load_config
+from .config import load_config, parse_as_of
 from .cli import run as run_pipeline
 
 
@@ -16,13 +16,10 @@ class EstimateOptions:
     output_dir: Optional[Path] = None
     apply_dm23_21: bool = False
     disable_ai: bool = True
+    as_of: Optional[str] = None
 
 
-def estimate(options: EstimateOptions) -> Dict[str, Path]:
-    """Programmatic interface to run the estimator and return artifact paths.
-
-    Returns a dict with keys: xlsx, audit_csv, payitems_workbook, run_metadata.
-    """
+def _options_env(options: EstimateOptions) -> Dict[str, str]:
     import os
 
     env = dict(os.environ)
@@ -38,8 +35,18 @@ def estimate(options: EstimateOptions) -> Dict[str, Path]:
         env["APPLY_DM23_21"] = "1"
     if options.disable_ai:
         env["DISABLE_OPENAI"] = "1"
+    as_of = parse_as_of(options.as_of, "EstimateOptions.as_of")
+    if as_of:
+        env["PRICING_AS_OF"] = as_of
+    return env
+
+
+def estimate(options: EstimateOptions) -> Dict[str, Path]:
+    """Programmatic interface to run the estimator and return artifact paths.
 
-    cfg = load_config(env, None)
+    Returns a dict with keys: xlsx, audit_csv, payitems_workbook, run_metadata.
+    """
+    cfg = load_config(_options_env(options), None)
     rc = run_pipeline(runtime_config=cfg)
     if rc != 0:
         raise RuntimeError(f"Estimator run failed with code {rc}")
@@ -49,3 +56,25 @@ def estimate(options: EstimateOptions) -> Dict[str, Path]:
         "payitems_workbook": cfg.output_payitem_audit,
         "run_metadata": cfg.output_dir / "run_metadata.json",
     }
+
+
+def estimate_batch(
+    options: EstimateOptions,
+    paths: Iterable[Path] = (),
+    manifest: Optional[Path] = None,
+) -> Path:
+    """Price many quantities workbooks against one loaded corpus.
+
+    ``paths`` are workbooks or folders of ``*_project_quantities.xlsx``;
+    ``manifest`` is an optional CSV with per-project expected cost and
+    district.  Each project is written to its own folder under
+    ``options.output_dir``.  Returns the path of ``batch_summary.csv``.
+    """
+    from .batch import SUMMARY_NAME, discover_projects, run_batch
+
+    cfg = load_config(_options_env(options), None)
+    summary = run_batch(discover_projects(paths, manifest), cfg)
+    failed = summary.loc[summary["STATUS"] != "ok", "PROJECT"].tolist()
+    if failed:
+        raise RuntimeError(f"Batch estimate failed for: {', '.join(failed)}")
+    return cfg.output_dir / SUMMARY_NAME
@@ -0,0 +1,333 @@
+"""
+Price many project quantity workbooks against one loaded BidTabs corpus.
+
+``costest batch`` loads and geometry-augments the corpus once per distinct
+region map, then runs the regular single-project pipeline
+(:func:`costest.cli.run`) for every project, writing each project's outputs
+to its own folder under the batch output directory.  A combined ``batch_summary.csv`` covers the whole batch.
+
+Projects come from directories (every ``*_project_quantities.xlsx`` inside),
+explicit workbook paths, or a manifest CSV with the columns
+``QUANTITIES_XLSX`` (required), ``NAME``, ``EXPECTED_COST`` and ``DISTRICT``.
+Without manifest values a project uses a sibling
+``<name>_project_attributes.xlsx`` when present, else the batch-level
+expected cost/district settings.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from . import cli
+from .config import Config
+from .config import load_config as load_runtime_config
+from .corpus_cache import PreparedCorpus, load_prepared_bidtabs, region_map_key
+from .project_meta import normalize_district
+
+logger = logging.getLogger(__name__)
+
+QUANTITIES_SUFFIX = "_project_quantities"
+ATTRIBUTES_SUFFIX = "_project_attributes"
+SUMMARY_NAME = "batch_summary.csv"
+
+
+@dataclass
+class BatchProject:
+    """One project of a batch run."""
+
+    name: str
+    quantities_path: Path
+    expected_cost: Optional[float] = None
+    district: Optional[str] = None
+    attributes_path: Optional[Path] = None
+
+
+def _project_name(path: Path) -> str:
+    stem = path.stem
+    if stem.lower().endswith(QUANTITIES_SUFFIX):
+        stem = stem[: -len(QUANTITIES_SUFFIX)]
+    return re.sub(r"[^\w.-]+", "_", stem).strip("_") or "project"
+
+
+def _sibling_attributes(path: Path) -> Optional[Path]:
+    stem = path.stem
+    if not stem.lower().endswith(QUANTITIES_SUFFIX):
+        return None
+    candidate = path.with_name(f"{stem[: -len(QUANTITIES_SUFFIX)]}{ATTRIBUTES_SUFFIX}{path.suffix}")
+    return candidate if candidate.exists() else None
+
+
+def _to_float(value: object) -> Optional[float]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    text = str(value).replace("$", "").replace(",", "").strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _text(value: object) -> Optional[str]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _manifest_projects(manifest: Path) -> List[BatchProject]:
+    frame = pd.read_csv(manifest, dtype=str)
+    frame.columns = [str(col).strip().upper() for col in frame.columns]
+    if "QUANTITIES_XLSX" not in frame.columns:
+        raise ValueError(f"Batch manifest {manifest} needs a QUANTITIES_XLSX column")
+    projects: List[BatchProject] = []
+    for record in frame.to_dict("records"):
+        raw = _text(record.get("QUANTITIES_XLSX"))
+        if raw is None:
+            continue
+        path = Path(raw).expanduser()
+        if not path.is_absolute():
+            path = manifest.parent / path
+        path = path.resolve()
+        projects.append(
+            BatchProject(
+                name=_text(record.get("NAME")) or _project_name(path),
+                quantities_path=path,
+                expected_cost=_to_float(record.get("EXPECTED_COST")),
+                district=_text(record.get("DISTRICT")),
+                attributes_path=_sibling_attributes(path),
+            )
+        )
+    return projects
+
+
+def discover_projects(paths: Iterable[str | Path] = (), manifest: str | Path | None = None) -> List[BatchProject]:
+    """
+    Collect batch projects from ``paths`` (workbooks or directories) and ``manifest``.
+
+    Project names are made unique so every project gets its own output folder.
+    """
+    projects: List[BatchProject] = []
+    if manifest:
+        projects.extend(_manifest_projects(Path(manifest).expanduser().resolve()))
+    for raw in paths:
+        path = Path(raw).expanduser().resolve()
+        if path.is_dir():
+            files = sorted(path.glob(f"*{QUANTITIES_SUFFIX}.xlsx"))
+        elif path.exists():
+            files = [path]
+        else:
+            raise FileNotFoundError(f"Quantities workbook or folder not found: {path}")
+        for file in files:
+            projects.append(
+                BatchProject(_project_name(file), file, attributes_path=_sibling_attributes(file))
+            )
+
+    seen: dict[str, int] = {}
+    for project in projects:
+        count = seen.get(project.name, 0)
+        seen[project.name] = count + 1
+        if count:
+            project.name = f"{project.name}_{count + 1}"
+    return projects
+
+
+def _project_config(runtime_cfg: Config, project: BatchProject, output_root: Path) -> Config:
+    output_dir = (output_root / project.name).resolve()
+    cfg = replace(
+        runtime_cfg,
+        quantities_path=project.quantities_path,
+        output_dir=output_dir,
+        output_xlsx=output_dir / "Estimate_Draft.xlsx",
+        output_audit=output_dir / "Estimate_Audit.csv",
+        output_payitem_audit=output_dir / "PayItems_Audit.xlsx",
+    )
+    if project.expected_cost is not None or project.district:
+        return replace(
+            cfg,
+            expected_contract_cost=project.expected_cost,
+            project_district=project.district,
+            project_region=None,
+        )
+    if project.attributes_path is not None:
+        return replace(
+            cfg,
+            project_attributes=project.attributes_path,
+            expected_contract_cost=None,
+            project_district=None,
+            project_region=None,
+        )
+    return cfg
+
+
+def load_batch_corpus(runtime_cfg: Config, region_map: Optional[pd.DataFrame] = None) -> PreparedCorpus:
+    """
+    Load the prepared corpus for ``region_map`` and add geometry columns.
+
+    ``region_map`` defaults to the district map used for GUI/environment inputs.
+    """
+    corpus = load_prepared_bidtabs(
+        runtime_cfg.bidtabs_dir,
+        cli.district_region_map() if region_map is None else region_map,
+        cache_dir=runtime_cfg.bidtabs_cache_dir,
+        use_cache=not runtime_cfg.disable_bidtabs_cache,
+        workers=runtime_cfg.bidtabs_workers,
+    )
+    cli.augment_geometry(corpus.frame, corpus)
+    return corpus
+
+
+class BatchCorpora:
+    """
+    Corpora shared across projects, loaded once per distinct region map.
+
+    Instances are passed to :func:`costest.cli.run` as its ``corpus``: a
+    project whose attributes workbook carries its own REGION_MAP gets a
+    corpus prepared with that map, exactly as a standalone run would.
+    """
+
+    def __init__(self, runtime_cfg: Config):
+        self.runtime_cfg = runtime_cfg
+        self._corpora: Dict[str, PreparedCorpus] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, region_map: Optional[pd.DataFrame] = None) -> PreparedCorpus:
+        if region_map is None:
+            region_map = cli.district_region_map()
+        key = region_map_key(region_map)
+        with self._lock:
+            corpus = self._corpora.get(key)
+            if corpus is None:
+                if self._corpora:
+                    logger.info("[batch] loading BidTabs corpus for another region map")
+                corpus = self._corpora[key] = load_batch_corpus(self.runtime_cfg, region_map)
+        return corpus
+
+    def __len__(self) -> int:
+        return len(self._corpora)
+
+
+def _summarize(project: BatchProject, cfg: Config, status: str) -> dict:
+    row: dict = {
+        "PROJECT": project.name,
+        "QUANTITIES_XLSX": str(project.quantities_path),
+        "EXPECTED_COST": project.expected_cost,
+        "DISTRICT": normalize_district(project.district or "") or project.district,
+        "STATUS": status,
+        "ITEMS": None,
+        "PROJECT_SUBTOTAL": None,
+        "NO_DATA_ITEMS": None,
+        "ALTERNATES_USED": None,
+        "OUTPUT_DIR": str(cfg.output_dir),
+    }
+    if status != "ok" or not Path(cfg.output_audit).exists():
+        return row
+    try:
+        items = pd.read_csv(cfg.output_audit)
+    except Exception:  # pragma: no cover - defensive
+        logger.debug("Unable to read %s for the batch summary", cfg.output_audit, exc_info=True)
+        return row
+    quantity = pd.to_numeric(items.get("QUANTITY"), errors="coerce")
+    price = pd.to_numeric(items.get("UNIT_PRICE_EST"), errors="coerce")
+    row["ITEMS"] = int(len(items))
+    if quantity is not None and price is not None:
+        row["PROJECT_SUBTOTAL"] = round(float((quantity * price).sum()), 2)
+    if "DATA_POINTS_USED" in items.columns:
+        row["NO_DATA_ITEMS"] = int((pd.to_numeric(items["DATA_POINTS_USED"], errors="coerce").fillna(0) == 0).sum())
+    if "ALTERNATE_USED" in items.columns:
+        alternates = items["ALTERNATE_USED"].astype(str).str.strip().str.lower().isin({"true", "1"})
+        row["ALTERNATES_USED"] = int(alternates.sum())
+    return row
+
+
+def run_batch(
+    projects: Sequence[BatchProject],
+    runtime_cfg: Config,
+    output_root: Path | None = None,
+) -> pd.DataFrame:
+    """
+    Price every project against shared loaded corpora and write ``batch_summary.csv``.
+
+    A failing project is logged and reported with ``STATUS=failed``; the
+    remaining projects still run.  Returns the summary table.
+    """
+    if not projects:
+        raise ValueError("No project quantities workbooks to price")
+    output_root = Path(output_root or runtime_cfg.output_dir).resolve()
+    output_root.mkdir(parents=True, exist_ok=True)
+
+    logger.info("[batch] loading BidTabs corpus once for %s projects", len(projects))
+    corpora = BatchCorpora(runtime_cfg)
+    corpora()
+
+    summary_rows: List[dict] = []
+    for position, project in enumerate(projects, start=1):
+        cfg = _project_config(runtime_cfg, project, output_root)
+        logger.info("[batch] (%s/%s) %s :: %s", position, len(projects), project.name, project.quantities_path)
+        try:
+            cfg.output_dir.mkdir(parents=True, exist_ok=True)
+            status = "ok" if cli.run(runtime_config=cfg, corpus=corpora) == 0 else "failed"
+        except Exception:
+            logger.exception("[batch] project %s failed", project.name)
+            status = "failed"
+        summary_rows.append(_summarize(project, cfg, status))
+
+    summary = pd.DataFrame(summary_rows)
+    summary_path = output_root / SUMMARY_NAME
+    summary.to_csv(summary_path, index=False)
+    logger.info("[batch] summary written => %s", summary_path)
+    return summary
+
+
+def build_parser():
+    parser = cli.build_parser(
+        prog="costest batch",
+        description="Price many project quantity workbooks against one loaded BidTabs corpus",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="Project quantities workbooks or folders containing *_project_quantities.xlsx files",
+    )
+    parser.add_argument(
+        "--manifest",
+        help="CSV listing QUANTITIES_XLSX with optional NAME, EXPECTED_COST and DISTRICT per project",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        runtime_cfg = load_runtime_config(os.environ, args)
+    except ValueError as exc:
+        parser.error(str(exc))
+    log_level = logging.DEBUG if runtime_cfg.verbose else logging.INFO
+    logging.basicConfig(level=log_level, format="%(message)s")
+    try:
+        projects = discover_projects(args.paths, args.manifest)
+        summary = run_batch(projects, runtime_cfg)
+    except Exception:  # pragma: no cover - defensive
+        logger.exception("Fatal error during batch estimate generation")
+        return 1
+    return 0 if (summary["STATUS"] == "ok").all() else 1
+
+
+__all__ = [
+    "SUMMARY_NAME",
+    "BatchCorpora",
+    "BatchProject",
+    "discover_projects",
+    "load_batch_corpus",
+    "run_batch",
+]
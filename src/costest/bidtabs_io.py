@@ -10,6 +10,7 @@ BidTabs / Quantities IO helpers
 from __future__ import annotations
 
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Union
 
@@ -115,31 +116,62 @@ def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 # ------------ Public loaders ------------
 
-def load_bidtabs_files(folder: str | Path) -> pd.DataFrame:
+def list_bidtabs_files(folder: str | Path) -> list[Path]:
+    """Return the CSV/XLS/XLSX files in ``folder`` sorted by name for determinism."""
+    p = Path(folder)
+    files = list(p.glob("*.csv")) + list(p.glob("*.xls")) + list(p.glob("*.xlsx"))
+    return sorted(files, key=lambda f: f.name)
+
+
+def read_bidtabs_file(path: str | Path) -> list[pd.DataFrame]:
+    """
+    Parse a single BidTabs CSV/XLS/XLSX file into normalized, non-empty frames.
+    Excel workbooks yield one frame per sheet.
+    """
+    f = Path(path)
+    dfs: list[pd.DataFrame] = []
+    if f.suffix.lower() == ".csv":
+        raw = pd.read_csv(f, dtype=str, encoding="utf-8", na_filter=False)
+        if not raw.empty:
+            dfs.append(_normalize_columns(raw))
+    else:
+        # Excel: read all sheets
+        xl = pd.ExcelFile(f)
+        for sh in xl.sheet_names:
+            df = xl.parse(sh, dtype=str)
+            if not df.empty:
+                dfs.append(_normalize_columns(df))
+    return dfs
+
+
+def parse_bidtabs_files(files: list[Path], workers: int = 1) -> list[list[pd.DataFrame]]:
+    """
+    Parse each file with :func:`read_bidtabs_file`, preserving input order.
+    With ``workers > 1`` the workbooks are parsed in a process pool; the first
+    failing file (in input order) raises exactly as in the serial path.
+    """
+    workers = max(1, int(workers or 1))
+    if workers == 1 or len(files) < 2:
+        return [read_bidtabs_file(f) for f in files]
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        return list(pool.map(read_bidtabs_file, files))
+
+
+def load_bidtabs_files(folder: str | Path, workers: int = 1) -> pd.DataFrame:
     """
     Load and stack all CSV/XLS/XLSX files in a folder.
     - Reads all visible sheets from Excel workbooks.
     - Normalizes columns.
+    - ``workers > 1`` parses workbooks in parallel processes.
     """
     p = Path(folder)
-    files = list(p.glob("*.csv")) + list(p.glob("*.xls")) + list(p.glob("*.xlsx"))
+    files = list_bidtabs_files(p)
     if not files:
         raise FileNotFoundError(f"No BidTabs files (.csv/.xls/.xlsx) found in {p}")
 
     dfs: list[pd.DataFrame] = []
-    for f in files:
-        ext = f.suffix.lower()
-        if ext == ".csv":
-            raw = pd.read_csv(f, dtype=str, encoding="utf-8", na_filter=False)
-            if not raw.empty:
-                dfs.append(_normalize_columns(raw))
-        else:
-            # Excel: read all sheets
-            xl = pd.ExcelFile(f)
-            for sh in xl.sheet_names:
-                df = xl.parse(sh, dtype=str)
-                if not df.empty:
-                    dfs.append(_normalize_columns(df))
+    for parsed in parse_bidtabs_files(files, workers):
+        dfs.extend(parsed)
 
     if not dfs:
         raise ValueError(f"Parsed 0 rows from files in {p}")
@@ -147,6 +179,40 @@ def load_bidtabs_files(folder: str | Path) -> pd.DataFrame:
     return pd.concat(dfs, ignore_index=True)
 
 
+def coerce_bidtabs_types(bidtabs: pd.DataFrame) -> pd.DataFrame:
+    """Parse LETTING_DATE and coerce the numeric pricing columns in place."""
+    if "LETTING_DATE" in bidtabs.columns:
+        bidtabs["LETTING_DATE"] = pd.to_datetime(bidtabs["LETTING_DATE"], errors="coerce")
+    for col in ("UNIT_PRICE", "WEIGHT", "JOB_SIZE"):
+        if col in bidtabs.columns:
+            bidtabs[col] = pd.to_numeric(bidtabs[col], errors="coerce")
+    return bidtabs
+
+
+def sanitize_bidtabs(df: pd.DataFrame) -> pd.DataFrame:
+    """Basic cleansing: drop non-positive prices and duplicate bid rows."""
+    if df is None or df.empty:
+        return df
+
+    cleaned = df.copy()
+    if "UNIT_PRICE" in cleaned.columns:
+        cleaned["UNIT_PRICE"] = pd.to_numeric(cleaned["UNIT_PRICE"], errors="coerce")
+        cleaned = cleaned.loc[cleaned["UNIT_PRICE"] > 0].copy()
+
+    if "QUANTITY" in cleaned.columns:
+        cleaned["QUANTITY"] = pd.to_numeric(cleaned["QUANTITY"], errors="coerce")
+
+    subset = [
+        col
+        for col in ["ITEM_CODE", "LETTING_DATE", "UNIT_PRICE", "QUANTITY", "BIDDER"]
+        if col in cleaned.columns
+    ]
+    if subset:
+        cleaned = cleaned.drop_duplicates(subset=subset, keep="first")
+
+    return cleaned
+
+
 def ensure_region_column(bidtabs: pd.DataFrame, region_map: pd.DataFrame | None = None) -> pd.DataFrame:
     """
     Guarantee a numeric REGION column.
@@ -191,6 +257,10 @@ def ensure_region_column(bidtabs: pd.DataFrame, region_map: pd.DataFrame | None
     return df
 
 
+class QuantitiesColumnError(KeyError):
+    """Raised when a quantities workbook lacks a required column."""
+
+
 def load_quantities(xlsx_path: str | Path) -> pd.DataFrame:
     """
     Load project quantities Excel.
@@ -207,7 +277,7 @@ def load_quantities(xlsx_path: str | Path) -> pd.DataFrame:
         for n in names:
             if n in cols:
                 return cols[n]
-        raise KeyError(
+        raise QuantitiesColumnError(
             f"Missing one of {names} in quantities file: {xlsx_path}\n"
             f"Found columns: {list(df.columns)}"
         )
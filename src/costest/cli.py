@@ -4,38 +4,58 @@ import math
 import os
 import sys
 import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import replace
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional, Sequence, Union
 
 import pandas as pd
 from dotenv import load_dotenv
 
 from . import design_memo_prices, design_memos, reference_data
 from .ai_reporter import generate_alternate_seek_report
-from .alternate_seek import find_alternate_price
+from .ai_cache import AICacheSettings, add_ai_cache_counts, ai_cache_counts, ai_cache_stats, configure_ai_cache
+from .alternate_seek import find_alternate_price, find_alternate_prices, geometry_candidate_index
 from .bidtabs_io import (
-    ensure_region_column,
     find_quantities_file,
-    load_bidtabs_files,
     load_quantities,
     load_region_map,
     normalize_item_code,
 )
-from .config import Config
+from .config import Config, parse_as_of
 from .config import load_config as load_runtime_config
+from .corpus_cache import (
+    PreparedCorpus,
+    derived_key,
+    file_sha256,
+    load_derived_frame,
+    load_prepared_bidtabs,
+    region_map_key,
+    store_derived_frame,
+)
 from .estimate_writer import write_outputs
-from .geometry import parse_geometry
-from .hma_dm2321 import CrosswalkRow, load_crosswalk, maybe_apply_dm2321_adder, remap_item
+from .geometry import GEOMETRY_COLUMNS, GEOMETRY_PARSER_KEY, geometry_codes, geometry_frame, parse_geometry
+from .hma_dm2321 import CrosswalkRow, load_crosswalk, maybe_apply_dm2321_adder, remap_frame, remap_item
 from .price_logic import (
-    category_breakdown,
+    BidTabsIndex,
+    batch_category_breakdown,
+    bidtabs_frame,
     compute_recency_factor,
     compute_region_factor,
-    memo_rollup_price,
+    get_pool_for_codes,
+    merge_breakdowns,
     prepare_memo_rollup_pool,
+    rollup_pool_price,
+    resolve_as_of,
 )
+from .pricing_cache import corpus_key as pricing_corpus_key
+from .pricing_cache import open_pricing_cache
 from .project_meta import DISTRICT_CHOICES, DISTRICT_REGION_MAP, normalize_district
 from .reporting import make_summary_text
+from .run_profile import RunProfiler, profile_call
 from . import reference_data as _refdata
 from .policy import apply_policy_defaults
 
@@ -101,7 +121,11 @@ def _resolve_path(value: Optional[str], default: Path) -> Path:
 _load_api_key_from_file()
 load_dotenv(BASE_DIR / ".env")
 
-DEFAULT_CONFIG = load_runtime_config(os.environ, None)
+try:
+    DEFAULT_CONFIG = load_runtime_config(os.environ, None)
+except ValueError:
+    # Keep the module importable; main() reports the bad value with usage.
+    DEFAULT_CONFIG = load_runtime_config({k: v for k, v in os.environ.items() if k != "PRICING_AS_OF"}, None)
 
 BIDFOLDER = DEFAULT_CONFIG.bidtabs_dir
 QTY_FILE_GLOB = DEFAULT_CONFIG.quantities_glob
@@ -156,6 +180,31 @@ def _table_friendly_meta_value(value: object) -> object:
         return str(value)
 
 
+def _unit_price_summary(
+    item_code: str,
+    summary_lookup: Mapping[str, Mapping[str, object]],
+) -> Optional[tuple[float, int]]:
+    """Return ``(weighted_average, contracts)`` when the Unit Price Summary can price ``item_code``."""
+    if not summary_lookup:
+        return None
+    info = summary_lookup.get(normalize_item_code(item_code))
+    if not info:
+        return None
+
+    try:
+        weighted_avg = float(info.get("weighted_average", 0) or 0)
+    except Exception:
+        weighted_avg = 0.0
+    try:
+        contracts = int(float(info.get("contracts", 0) or 0))
+    except Exception:
+        contracts = 0
+
+    if weighted_avg <= 0 or contracts < 2:
+        return None
+    return weighted_avg, contracts
+
+
 def _apply_geometry_summary_price(
     row: Dict[str, object],
     item_code: str,
@@ -170,25 +219,14 @@ def _apply_geometry_summary_price(
     ``applied`` indicates whether Unit Price Summary data was used.
     """
     current_price = float(row.get("UNIT_PRICE_EST", 0) or 0.0)
-    if geometry is None or data_points_used != 0 or not summary_lookup:
-        return False, data_points_used, current_price
-
-    info = summary_lookup.get(normalize_item_code(item_code))
-    if not info:
+    if geometry is None or data_points_used != 0:
         return False, data_points_used, current_price
 
-    try:
-        weighted_avg = float(info.get("weighted_average", 0) or 0)
-    except Exception:
-        weighted_avg = 0.0
-    try:
-        contracts = int(float(info.get("contracts", 0) or 0))
-    except Exception:
-        contracts = 0
-
-    if weighted_avg <= 0 or contracts < 2:
+    summary = _unit_price_summary(item_code, summary_lookup)
+    if summary is None:
         return False, data_points_used, current_price
 
+    weighted_avg, contracts = summary
     unit_price_est = _round_unit_price(weighted_avg)
     row["UNIT_PRICE_EST"] = unit_price_est
     row["SOURCE"] = "UNIT_PRICE_SUMMARY"
@@ -227,7 +265,7 @@ def _apply_geometry_summary_price(
 
 def apply_non_geometry_fallbacks(
     rows: List[Dict[str, object]],
-    bidtabs: pd.DataFrame,
+    bidtabs: pd.DataFrame | BidTabsIndex,
     project_region: Optional[int],
     payitem_details: Dict[str, pd.DataFrame],
 ) -> None:
@@ -308,8 +346,11 @@ def apply_non_geometry_fallbacks(
             ]
         )
 
+    history_frame = bidtabs_frame(bidtabs)
     bidtabs_normalized_codes = (
-        bidtabs["ITEM_CODE"].astype(str).map(normalize_item_code) if "ITEM_CODE" in bidtabs.columns else pd.Series(dtype=str)
+        history_frame["ITEM_CODE"].astype(str).map(normalize_item_code)
+        if "ITEM_CODE" in history_frame.columns
+        else pd.Series(dtype=str)
     )
     bid_history_cache: Dict[str, pd.DataFrame] = {}
 
@@ -318,10 +359,10 @@ def apply_non_geometry_fallbacks(
         if norm in bid_history_cache:
             return bid_history_cache[norm]
         if bidtabs_normalized_codes.empty:
-            result = pd.DataFrame(columns=bidtabs.columns)
+            result = pd.DataFrame(columns=history_frame.columns)
         else:
             mask = bidtabs_normalized_codes == norm
-            result = bidtabs.loc[mask].copy()
+            result = history_frame.loc[mask].copy()
         bid_history_cache[norm] = result
         return result
 
@@ -388,6 +429,92 @@ def apply_non_geometry_fallbacks(
             detail_df = pd.concat([existing, detail_df], ignore_index=True, sort=False)
         payitem_details[target_code] = detail_df
 
+    def _quantity_adjustment(ratio: float) -> tuple[float, str]:
+        if ratio >= 2.0:
+            return 0.95, "quantity adj=-5%"
+        if ratio <= 0.5:
+            return 1.05, "quantity adj=+5%"
+        return 1.0, ""
+
+    def _apply_summary_price(
+        row_obj: Dict[str, object],
+        code: str,
+        norm_code: str,
+        summary_info: Mapping[str, object],
+        qty_val: float,
+        existing_note: str,
+        lead_note: str = "",
+    ) -> None:
+        try:
+            base_price = float(summary_info.get("weighted_average", 0) or 0)
+        except Exception:
+            base_price = 0.0
+        contracts = int(float(summary_info.get("contracts", 0) or 0))
+        quantity_factor = 1.0
+        quantity_note = ""
+        if qty_val > 0:
+            try:
+                total_value = float(summary_info.get("total_value", 0) or 0)
+            except Exception:
+                total_value = 0.0
+            typical_per_contract = 0.0
+            if base_price > 0 and total_value > 0 and contracts > 0:
+                total_qty = total_value / base_price
+                typical_per_contract = total_qty / contracts if contracts else 0.0
+            if typical_per_contract > 0:
+                quantity_factor, quantity_note = _quantity_adjustment(qty_val / typical_per_contract)
+        combined_raw = recency_factor * region_factor * quantity_factor
+        combined_factor, capped = _clamp_factor(combined_raw)
+        adjusted_price = base_price * combined_factor
+        clamp_applied = False
+        try:
+            lowest = float(summary_info.get("lowest", 0) or 0)
+        except Exception:
+            lowest = 0.0
+        try:
+            highest = float(summary_info.get("highest", 0) or 0)
+        except Exception:
+            highest = 0.0
+        if lowest > 0 and adjusted_price < lowest:
+            adjusted_price = lowest
+            clamp_applied = True
+        if highest > 0 and highest >= lowest and adjusted_price > highest:
+            adjusted_price = highest
+            clamp_applied = True
+        row_obj["UNIT_PRICE_EST"] = _round_unit_price(adjusted_price)
+        row_obj["SOURCE"] = "UNIT_PRICE_SUMMARY"
+        row_obj["DATA_POINTS_USED"] = contracts
+        row_obj["STD_DEV"] = float("nan")
+        row_obj["COEF_VAR"] = float("nan")
+        notes_parts = [
+            lead_note,
+            f"UNIT_PRICE_SUMMARY CY{int(summary_info.get('year', 0) or 0)} (contracts={contracts})",
+            _format_factor("recency", recency_factor, recency_meta),
+            _format_factor("region", region_factor, region_meta),
+        ]
+        if quantity_note:
+            notes_parts.append(quantity_note)
+        if capped:
+            notes_parts.append("combined adj capped at +/-25%")
+        if clamp_applied:
+            notes_parts.append("clamped to summary range")
+        fallback_note = "; ".join(part for part in notes_parts if part)
+        row_obj["NOTES"] = " | ".join(part for part in (existing_note, fallback_note) if part)
+        summary_entry = {
+            "SOURCE_ITEM_CODE": norm_code,
+            "SUMMARY_YEAR": summary_info.get("year"),
+            "SUMMARY_WEIGHTED_AVERAGE": base_price,
+            "SUMMARY_CONTRACTS": float(summary_info.get("contracts", 0) or 0),
+            "SUMMARY_TOTAL_VALUE": float(summary_info.get("total_value", 0) or 0),
+            "SUMMARY_LOWEST": float(summary_info.get("lowest", 0) or 0),
+            "SUMMARY_HIGHEST": float(summary_info.get("highest", 0) or 0),
+        }
+        _record_summary_details(code, "UNIT_PRICE_SUMMARY", [summary_entry])
+
+    # Classify every row up front so each distinct design memo rollup pool
+    # (obsolete codes + target quantity) is built once, on top of a single
+    # BidTabs lookup per obsolete-code group.
+    candidates: List[tuple] = []
     for row in rows:
         if row.get("ALTERNATE_USED"):
             continue
@@ -403,7 +530,7 @@ def apply_non_geometry_fallbacks(
         if memo_guidance is not None:
             min_conf = float(os.getenv('MEMO_PRICE_MIN_CONFIDENCE', '0.7'))
             if (memo_guidance.confidence or 1.0) >= min_conf:
-                _apply_memo_price(row, memo_guidance, existing_note)
+                candidates.append((row, code, norm_code, existing_note, memo_guidance, True, 0.0, None))
                 continue
             else:
                 # Low confidence: keep as advisory note; continue with other fallbacks
@@ -418,6 +545,34 @@ def apply_non_geometry_fallbacks(
             continue
 
         qty_val = float(row.get("QUANTITY", 0) or 0)
+        mapping = design_memos.get_obsolete_mapping(norm_code)
+        if mapping is None or not mapping.get("obsolete_codes"):
+            mapping = None
+        candidates.append((row, code, norm_code, existing_note, memo_guidance, False, qty_val, mapping))
+
+    group_pools: Dict[tuple[str, ...], pd.DataFrame] = {}
+    rollup_pools: Dict[tuple[tuple[str, ...], Optional[float]], pd.DataFrame] = {}
+    for _, _, _, _, _, _, qty_val, mapping in candidates:
+        if mapping is None:
+            continue
+        obsolete_codes = tuple(mapping["obsolete_codes"])
+        pool_key = (obsolete_codes, qty_val if qty_val > 0 else None)
+        if pool_key in rollup_pools:
+            continue
+        if obsolete_codes not in group_pools:
+            group_pools[obsolete_codes] = get_pool_for_codes(bidtabs, obsolete_codes)
+        rollup_pools[pool_key] = prepare_memo_rollup_pool(
+            bidtabs,
+            obsolete_codes,
+            project_region=project_region,
+            target_quantity=pool_key[1],
+            pool=group_pools[obsolete_codes],
+        )
+
+    for row, code, norm_code, existing_note, memo_guidance, memo_applies, qty_val, mapping in candidates:
+        if memo_applies:
+            _apply_memo_price(row, memo_guidance, existing_note)
+            continue
 
         # Precompute Unit Price Summary sufficiency (for notes and fallback), but do not apply yet
         summary_info = summary_lookup.get(norm_code)
@@ -440,80 +595,10 @@ def apply_non_geometry_fallbacks(
                 summary_reason = ", ".join(reasons)
 
         # Try Design Memo Rollup first
-        mapping = design_memos.get_obsolete_mapping(norm_code)
-        if mapping is None or not mapping.get("obsolete_codes"):
+        if mapping is None:
             # No design memo mapping; try summary if eligible, else remain NO_DATA with context.
             if summary_eligible and summary_info:
-                try:
-                    base_price = float(summary_info.get("weighted_average", 0) or 0)
-                except Exception:
-                    base_price = 0.0
-                contracts = int(float(summary_info.get("contracts", 0) or 0))
-                quantity_factor = 1.0
-                quantity_note = ""
-                if qty_val > 0:
-                    try:
-                        total_value = float(summary_info.get("total_value", 0) or 0)
-                    except Exception:
-                        total_value = 0.0
-                    typical_per_contract = 0.0
-                    if base_price > 0 and total_value > 0 and contracts > 0:
-                        total_qty = total_value / base_price
-                        typical_per_contract = total_qty / contracts if contracts else 0.0
-                    if typical_per_contract > 0:
-                        ratio = qty_val / typical_per_contract
-                        if ratio >= 2.0:
-                            quantity_factor = 0.95
-                            quantity_note = "quantity adj=-5%"
-                        elif ratio <= 0.5:
-                            quantity_factor = 1.05
-                            quantity_note = "quantity adj=+5%"
-                combined_raw = recency_factor * region_factor * quantity_factor
-                combined_factor, capped = _clamp_factor(combined_raw)
-                adjusted_price = base_price * combined_factor
-                clamp_applied = False
-                try:
-                    lowest = float(summary_info.get("lowest", 0) or 0)
-                except Exception:
-                    lowest = 0.0
-                try:
-                    highest = float(summary_info.get("highest", 0) or 0)
-                except Exception:
-                    highest = 0.0
-                if lowest > 0 and adjusted_price < lowest:
-                    adjusted_price = lowest
-                    clamp_applied = True
-                if highest > 0 and highest >= lowest and adjusted_price > highest:
-                    adjusted_price = highest
-                    clamp_applied = True
-                row["UNIT_PRICE_EST"] = _round_unit_price(adjusted_price)
-                row["SOURCE"] = "UNIT_PRICE_SUMMARY"
-                row["DATA_POINTS_USED"] = contracts
-                row["STD_DEV"] = float("nan")
-                row["COEF_VAR"] = float("nan")
-                notes_parts = [
-                    f"UNIT_PRICE_SUMMARY CY{int(summary_info.get('year', 0) or 0)} (contracts={contracts})",
-                    _format_factor("recency", recency_factor, recency_meta),
-                    _format_factor("region", region_factor, region_meta),
-                ]
-                if quantity_note:
-                    notes_parts.append(quantity_note)
-                if capped:
-                    notes_parts.append("combined adj capped at +/-25%")
-                if clamp_applied:
-                    notes_parts.append("clamped to summary range")
-                fallback_note = "; ".join(part for part in notes_parts if part)
-                row["NOTES"] = " | ".join(part for part in (existing_note, fallback_note) if part)
-                summary_entry = {
-                    "SOURCE_ITEM_CODE": norm_code,
-                    "SUMMARY_YEAR": summary_info.get("year"),
-                    "SUMMARY_WEIGHTED_AVERAGE": base_price,
-                    "SUMMARY_CONTRACTS": float(summary_info.get("contracts", 0) or 0),
-                    "SUMMARY_TOTAL_VALUE": float(summary_info.get("total_value", 0) or 0),
-                    "SUMMARY_LOWEST": float(summary_info.get("lowest", 0) or 0),
-                    "SUMMARY_HIGHEST": float(summary_info.get("highest", 0) or 0),
-                }
-                _record_summary_details(code, "UNIT_PRICE_SUMMARY", [summary_entry])
+                _apply_summary_price(row, code, norm_code, summary_info, qty_val, existing_note)
                 continue
             if memo_guidance is not None:
                 _apply_memo_price(row, memo_guidance, existing_note)
@@ -529,19 +614,8 @@ def apply_non_geometry_fallbacks(
                 continue
 
         target_quantity = qty_val if qty_val > 0 else None
-        base_price, obs_count, source_label = memo_rollup_price(
-            bidtabs,
-            norm_code,
-            mapping["obsolete_codes"],
-            project_region=project_region,
-            target_quantity=target_quantity,
-        )
-        memo_pool = prepare_memo_rollup_pool(
-            bidtabs,
-            mapping["obsolete_codes"],
-            project_region=project_region,
-            target_quantity=target_quantity,
-        )
+        memo_pool = rollup_pools[(tuple(mapping["obsolete_codes"]), target_quantity)]
+        base_price, obs_count, source_label = rollup_pool_price(memo_pool, norm_code, mapping["obsolete_codes"])
         memo_codes = "+".join(mapping["obsolete_codes"])
         if obs_count == 0 or memo_pool.empty or not math.isfinite(base_price) or base_price <= 0:
             # DM insufficient: first try to average legacy summary values, then fall back to standard summary logic
@@ -608,83 +682,15 @@ def apply_non_geometry_fallbacks(
 
             # DM insufficient: attempt Unit Price Summary if eligible; otherwise record insufficiency and NO_DATA
             if summary_eligible and summary_info:
-                try:
-                    sum_base = float(summary_info.get("weighted_average", 0) or 0)
-                except Exception:
-                    sum_base = 0.0
-                contracts = int(float(summary_info.get("contracts", 0) or 0))
-                quantity_factor = 1.0
-                quantity_note = ""
-                if qty_val > 0:
-                    try:
-                        total_value = float(summary_info.get("total_value", 0) or 0)
-                    except Exception:
-                        total_value = 0.0
-                    typical_per_contract = 0.0
-                    if sum_base > 0 and total_value > 0 and contracts > 0:
-                        total_qty = total_value / sum_base
-                        typical_per_contract = total_qty / contracts if contracts else 0.0
-                    if typical_per_contract > 0:
-                        ratio = qty_val / typical_per_contract
-                        if ratio >= 2.0:
-                            quantity_factor = 0.95
-                            quantity_note = "quantity adj=-5%"
-                        elif ratio <= 0.5:
-                            quantity_factor = 1.05
-                            quantity_note = "quantity adj=+5%"
-                combined_raw = recency_factor * region_factor * quantity_factor
-                combined_factor, capped = _clamp_factor(combined_raw)
-                adjusted_price = sum_base * combined_factor
-                clamp_applied = False
-                try:
-                    lowest = float(summary_info.get("lowest", 0) or 0)
-                except Exception:
-                    lowest = 0.0
-                try:
-                    highest = float(summary_info.get("highest", 0) or 0)
-                except Exception:
-                    highest = 0.0
-                if lowest > 0 and adjusted_price < lowest:
-                    adjusted_price = lowest
-                    clamp_applied = True
-                if highest > 0 and highest >= lowest and adjusted_price > highest:
-                    adjusted_price = highest
-                    clamp_applied = True
-                row["UNIT_PRICE_EST"] = _round_unit_price(adjusted_price)
-                row["SOURCE"] = "UNIT_PRICE_SUMMARY"
-                row["DATA_POINTS_USED"] = contracts
-                row["STD_DEV"] = float("nan")
-                row["COEF_VAR"] = float("nan")
-                memo_codes_fallback = "+".join(mapping["obsolete_codes"])
-                notes_parts = [
-                    f"Design memo {mapping['memo_id']} pooling insufficient ({memo_codes_fallback}); review manually.",
-                    f"UNIT_PRICE_SUMMARY CY{int(summary_info.get('year', 0) or 0)} (contracts={contracts})",
-                    _format_factor("recency", recency_factor, recency_meta),
-                    _format_factor("region", region_factor, region_meta),
-                ]
-                if quantity_note:
-                    notes_parts.append(quantity_note)
-                if capped:
-                    notes_parts.append("combined adj capped at +/-25%")
-                if clamp_applied:
-                    notes_parts.append("clamped to summary range")
-                row["NOTES"] = " | ".join(part for part in (existing_note, "; ".join(notes_parts)) if part)
-                summary_entry = {
-                    "SOURCE_ITEM_CODE": norm_code,
-                    "SUMMARY_YEAR": summary_info.get("year"),
-                    "SUMMARY_WEIGHTED_AVERAGE": sum_base,
-                    "SUMMARY_CONTRACTS": float(summary_info.get("contracts", 0) or 0),
-                    "SUMMARY_TOTAL_VALUE": float(summary_info.get("total_value", 0) or 0),
-                    "SUMMARY_LOWEST": float(summary_info.get("lowest", 0) or 0),
-                    "SUMMARY_HIGHEST": float(summary_info.get("highest", 0) or 0),
-                }
-                _record_summary_details(code, "UNIT_PRICE_SUMMARY", [summary_entry])
+                lead_note = (
+                    f"Design memo {mapping['memo_id']} pooling insufficient ({memo_codes}); review manually."
+                )
+                _apply_summary_price(row, code, norm_code, summary_info, qty_val, existing_note, lead_note)
                 continue
             if memo_guidance is not None:
                 _apply_memo_price(row, memo_guidance, existing_note)
                 continue
             else:
-                memo_codes = "+".join(mapping["obsolete_codes"])
                 detail = (
                     f"Design memo {mapping['memo_id']} pooling insufficient ({memo_codes}); review manually."
                 )
@@ -703,13 +709,7 @@ def apply_non_geometry_fallbacks(
             if not pooled_qty.empty:
                 median_qty = float(pooled_qty.median())
                 if median_qty > 0:
-                    ratio = target_quantity / median_qty
-                    if ratio >= 2.0:
-                        quantity_factor = 0.95
-                        quantity_note = "quantity adj=-5%"
-                    elif ratio <= 0.5:
-                        quantity_factor = 1.05
-                        quantity_note = "quantity adj=+5%"
+                    quantity_factor, quantity_note = _quantity_adjustment(target_quantity / median_qty)
 
         combined_raw = recency_factor * region_factor * quantity_factor
         combined_factor, capped = _clamp_factor(combined_raw)
@@ -839,34 +839,209 @@ def _project_inputs_from_config(cfg: Config) -> tuple[
     if district_name and project_region is None:
         project_region = DISTRICT_REGION_MAP.get(district_name)
 
+    return expected_cost, project_region, district_region_map(), district_name or None, True
+
+
+def district_region_map() -> pd.DataFrame:
+    """DISTRICT -> REGION map used when project inputs come from the GUI/environment."""
     rows = [{"DISTRICT": name, "REGION": number} for number, name in DISTRICT_CHOICES]
-    region_map_df = pd.DataFrame(rows)
+    return pd.DataFrame(rows)
 
-    return expected_cost, project_region, region_map_df, district_name or None, True
 
+def augment_geometry(bid: pd.DataFrame, corpus: Optional[PreparedCorpus] = None) -> str:
+    """
+    Add parsed ``GEOM_*`` columns to the BidTabs frame in place.
 
-def _sanitize_bidtabs(df: pd.DataFrame) -> pd.DataFrame:
-    """Basic cleansing: drop non-positive prices and duplicate bid rows."""
-    if df is None or df.empty:
-        return df
+    Each distinct description is parsed once.  When ``bid`` is the frame of
+    a cached ``corpus`` the per-row geometry codes are stored next to it, so
+    warm runs skip parsing.  Returns ``"hit"``, ``"built"`` or ``"uncached"``.
+    """
+    key = derived_key(corpus, GEOMETRY_PARSER_KEY) if corpus is not None else None
+    cached = load_derived_frame(corpus, "geometry", key) if corpus is not None else None
+    if cached is not None and len(cached[0]) == len(bid):
+        codes_frame, info = cached
+        codes = codes_frame["GEOM_CODE"].to_numpy()
+        table = pd.DataFrame(info["table"], columns=list(GEOMETRY_COLUMNS))
+        status = "hit"
+    else:
+        codes, table = geometry_codes(bid["DESCRIPTION"])
+        status = "uncached"
+        if corpus is not None and corpus.cache_path is not None:
+            store_derived_frame(
+                corpus,
+                "geometry",
+                key,
+                pd.DataFrame({"GEOM_CODE": codes}),
+                table=table.to_dict(orient="list"),
+            )
+            status = "built"
+    geom = geometry_frame(codes, table, index=bid.index)
+    for column in GEOMETRY_COLUMNS:
+        bid[column] = geom[column]
+    return status
+
+
+def _pricing_path(row: Mapping[str, object], prefetched: bool = False) -> str:
+    """Label the path that priced ``row`` for the slowest-item profile."""
+    if row.get("ALTERNATE_USED"):
+        return "alternate_seek (prefetched)" if prefetched else "alternate_seek"
+    source = str(row.get("SOURCE") or "")
+    if source in CATEGORY_LABELS:
+        return f"category:{source}"
+    if not source or source == "NO_DATA":
+        return "no_data"
+    return f"fallback:{source.split(':', 1)[0]}"
+
+
+def _pricing_request(
+    code: str,
+    desc: str,
+    qty_val: float,
+    dm2321_crosswalk: Optional[Mapping[str, CrosswalkRow]],
+    dm2321_reverse_meta: Mapping[str, Mapping[str, object]],
+    dm2321_desc_by_new: Mapping[str, str],
+) -> tuple[str, float | None, str] | None:
+    """Return the ``(item_code, target_quantity, description)`` a project row is priced with.
+
+    Applies the DM 23-21 remap so every row can be priced up front by
+    :func:`batch_category_breakdown`; the pricing loop reuses the result.
+    Deleted items return ``None``.
+    """
+    target_quantity = qty_val if qty_val > 0 else None
+    if dm2321_crosswalk is None:
+        return code, target_quantity, desc
+    new_code, meta = remap_item(code, dm2321_crosswalk)
+    if meta.get("deleted") and new_code is None:
+        return None
+    mapped_code = new_code or code
+    reverse_meta = dm2321_reverse_meta.get(mapped_code, {})
+    if (meta.get("mapping_rule") or ("DM 23-21" if reverse_meta else None)) == "DM 23-21":
+        target_quantity = None
+    new_desc = meta.get("new_desc") or reverse_meta.get("new_desc") or dm2321_desc_by_new.get(mapped_code)
+    return mapped_code, target_quantity, new_desc or desc
 
-    cleaned = df.copy()
-    if "UNIT_PRICE" in cleaned.columns:
-        cleaned["UNIT_PRICE"] = pd.to_numeric(cleaned["UNIT_PRICE"], errors="coerce")
-        cleaned = cleaned.loc[cleaned["UNIT_PRICE"] > 0].copy()
 
-    if "QUANTITY" in cleaned.columns:
-        cleaned["QUANTITY"] = pd.to_numeric(cleaned["QUANTITY"], errors="coerce")
+# Set in each alternate-seek worker by _init_alternate_seek_worker:
+# (bid_index, project_region, allow_ai, ai_timeout, ai_retries).
+_ALT_SEEK_CONTEXT: Optional[tuple] = None
 
-    subset = [
-        col
-        for col in ["ITEM_CODE", "LETTING_DATE", "UNIT_PRICE", "QUANTITY", "BIDDER"]
-        if col in cleaned.columns
-    ]
-    if subset:
-        cleaned = cleaned.drop_duplicates(subset=subset, keep="first")
 
-    return cleaned
+def _init_alternate_seek_worker(context: tuple) -> None:
+    global _ALT_SEEK_CONTEXT
+    _ALT_SEEK_CONTEXT = context
+
+
+def _alternate_seek_task(task: tuple[str, str]):
+    """
+    Run one alternate seek in a worker.
+
+    Returns ``(result, breakdowns, ai_counts, seconds)``: the category
+    breakdowns the search computed and the worker's AI-cache counters for
+    this task, so the parent can keep them in its memo, pricing cache and
+    run metadata, and how long the search took.
+    """
+    bid_index, project_region, allow_ai, ai_timeout, ai_retries = _ALT_SEEK_CONTEXT
+    code, desc = task
+    started = time.perf_counter()
+    known = bid_index.memo.keys()
+    ai_before = ai_cache_counts()
+    result = find_alternate_price(
+        bid_index,
+        code,
+        parse_geometry(desc),
+        project_region=project_region,
+        target_description=desc,
+        reference_bundle=reference_data.build_reference_bundle(code),
+        allow_ai=allow_ai,
+        ai_timeout=ai_timeout,
+        ai_retries=ai_retries,
+    )
+    ai_counts = {name: count - ai_before.get(name, 0) for name, count in ai_cache_counts().items()}
+    return result, bid_index.memo.entries_since(known), ai_counts, time.perf_counter() - started
+
+
+def _prefetch_alternate_seek(
+    tasks: Dict[int, tuple[str, str]],
+    bid_index: BidTabsIndex,
+    project_region: int | None,
+    allow_ai: bool,
+    workers: int,
+    ai_timeout: Optional[float] = None,
+    ai_retries: Optional[int] = None,
+) -> Dict[int, tuple[object, float]]:
+    """
+    Run :func:`find_alternate_price` for ``tasks`` in a forked process pool.
+
+    Workers inherit the prepared :class:`BidTabsIndex` through ``fork`` instead
+    of receiving a pickled copy.  Breakdowns the workers compute are merged
+    into ``bid_index`` (memo and pricing cache) and their AI-cache counters
+    into this process's totals.  Returns ``(result, seconds)`` keyed like
+    ``tasks``, where ``seconds`` is the search time in its worker; an
+    empty dict means the caller should run alternate seek inline (one
+    worker, fewer than two tasks, no ``fork`` start method, or a broken pool).
+    """
+    if workers <= 1 or len(tasks) < 2 or "fork" not in multiprocessing.get_all_start_methods():
+        return {}
+    result_store = bid_index.result_store
+    bid_index.result_store = None  # SQLite connections must not cross fork()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_alternate_seek_worker,
+            initargs=((bid_index, project_region, allow_ai, ai_timeout, ai_retries),),
+        ) as pool:
+            outputs = list(pool.map(_alternate_seek_task, tasks.values()))
+    except BrokenProcessPool:
+        logger.warning("Alternate-seek worker pool failed; continuing serially", exc_info=True)
+        return {}
+    finally:
+        bid_index.result_store = result_store
+    results: Dict[int, tuple[object, float]] = {}
+    for position, (result, breakdowns, ai_counts, seconds) in zip(tasks, outputs):
+        merge_breakdowns(bid_index, breakdowns)
+        add_ai_cache_counts(ai_counts)
+        results[position] = (result, seconds)
+    return results
+
+
+def _prefetch_alternate_ai(
+    tasks: Dict[int, tuple[str, str]],
+    bid_index: BidTabsIndex,
+    project_region: int | None,
+    concurrency: int,
+    ai_timeout: Optional[float] = None,
+    ai_retries: Optional[int] = None,
+    batch_size: int = 1,
+) -> Dict[int, tuple[object, float]]:
+    """
+    Run alternate seek for ``tasks`` in-process with overlapping AI calls.
+
+    Used when the run is serial (or batched) and AI weighting is on: the
+    candidate searches stay sequential while up to ``concurrency`` OpenAI
+    requests, each covering up to ``batch_size`` targets, are in flight at
+    once.  Returns ``(result, seconds)`` keyed like ``tasks`` (see
+    :func:`find_alternate_prices` for how ``seconds`` is split); an empty
+    dict means the caller should run alternate seek inline.
+    """
+    if (concurrency <= 1 and batch_size <= 1) or len(tasks) < 2:
+        return {}
+    targets = [
+        (code, parse_geometry(desc), desc, reference_data.build_reference_bundle(code))
+        for code, desc in tasks.values()
+    ]
+    results, seconds = find_alternate_prices(
+        bid_index,
+        targets,
+        project_region=project_region,
+        allow_ai=True,
+        ai_concurrency=concurrency,
+        ai_timeout=ai_timeout,
+        ai_retries=ai_retries,
+        ai_batch_size=batch_size,
+        return_timings=True,
+    )
+    return dict(zip(tasks, zip(results, seconds)))
 
 
 def load_project_attributes(
@@ -930,8 +1105,122 @@ def load_project_attributes(
     return expected_cost, project_region, region_map_df
 
 
-def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] = None) -> int:
+CorpusSource = Union[PreparedCorpus, Callable[[pd.DataFrame], PreparedCorpus]]
+
+
+def _shared_corpus(corpus: Optional[CorpusSource], region_map: pd.DataFrame) -> Optional[PreparedCorpus]:
+    """
+    Resolve a caller-supplied corpus for a project priced with ``region_map``.
+
+    ``corpus`` may be a preloaded corpus or a callable returning the shared
+    corpus for a region map.  A corpus prepared with a different map is not
+    reused (``None`` is returned), so a project priced by a batch or the
+    service sees the same REGION values as a standalone run.
+    """
+    if callable(corpus):
+        corpus = corpus(region_map)
+    if corpus is not None and corpus.region_key not in (None, region_map_key(region_map)):
+        logger.info("Preloaded BidTabs corpus was prepared with a different region map; reloading")
+        return None
+    return corpus
+
+
+
+def _line_amount(entry: Mapping[str, object]) -> float:
+    return float(entry.get("QUANTITY", 0) or 0) * float(entry.get("UNIT_PRICE_EST", 0) or 0)
+
+
+class _ContractPercentPricer:
+    """
+    Price contract-percent lines (IDM Chapter 20) against subtotals of ``rows``.
+
+    Rows are indexed by code once (the first row with a code wins) and one
+    subtotal is kept per distinct exclusion set, so adding rules does not
+    rescan the project.  Subtotals add the line amounts in row order, exactly
+    as a per-rule scan does, because ``math.floor(total / 1000)`` turns a
+    last-bit difference into a $1000 step.  Repricing a line drops every
+    cached subtotal that included it.
+    """
+
+    def __init__(self, rows: List[Dict[str, object]]) -> None:
+        self.rows = rows
+        self._positions: Dict[object, int] = {}
+        for position, entry in enumerate(rows):
+            self._positions.setdefault(entry.get("ITEM_CODE"), position)
+        self._codes = [entry.get("ITEM_CODE") for entry in rows]
+        self._amounts = [_line_amount(entry) for entry in rows]
+        self._subtotals: Dict[frozenset, float] = {}
+
+    def position(self, code: object) -> Optional[int]:
+        return self._positions.get(code)
+
+    def subtotal(self, exclude_codes: set[str]) -> float:
+        key = frozenset(exclude_codes)
+        if key not in self._subtotals:
+            total = 0.0
+            for line_code, amount in zip(self._codes, self._amounts):
+                if line_code not in key:
+                    total += amount
+            self._subtotals[key] = total
+        return self._subtotals[key]
+
+    def apply(self, position: int, percent: float, exclude_codes: set[str], note_label: str) -> tuple[float, float]:
+        """Reprice ``rows[position]``; returns ``(rounded_amount, unit_price)``."""
+        row_obj = self.rows[position]
+        code = self._codes[position]
+        qty_val = float(row_obj.get("QUANTITY", 0) or 0)
+        target_amount = self.subtotal(exclude_codes) * percent
+        rounded_amount = math.floor(target_amount / 1000.0) * 1000.0
+        unit_price = round(rounded_amount / qty_val, 2) if qty_val else 0.0
+        row_obj["UNIT_PRICE_EST"] = unit_price
+        self._amounts[position] = _line_amount(row_obj)
+        for stale in [codes for codes in self._subtotals if code not in codes]:
+            del self._subtotals[stale]
+        row_obj["DATA_POINTS_USED"] = 0
+        row_obj["ALTERNATE_USED"] = False
+        for key in (
+            "ALTERNATE_SOURCE_ITEM",
+            "ALTERNATE_RATIO",
+            "ALTERNATE_BASE_PRICE",
+            "ALTERNATE_SOURCE_AREA",
+            "ALTERNATE_CANDIDATE_COUNT",
+            "ALTERNATE_METHOD",
+            "ALTERNATE_AI_NOTES",
+        ):
+            row_obj.pop(key, None)
+        note_text = f"{note_label} {percent * 100:.1f}% of applicable items = ${rounded_amount:,.0f}."
+        existing_note = str(row_obj.get("NOTES", "") or "").strip()
+        row_obj["NOTES"] = f"{existing_note} {note_text}".strip() if existing_note else note_text
+        for label in CATEGORY_LABELS:
+            row_obj[f"{label}_PRICE"] = float("nan")
+            row_obj[f"{label}_COUNT"] = 0
+            row_obj[f"{label}_INCLUDED"] = False
+        return rounded_amount, unit_price
+
+
+def run(
+    config: Optional["CLIConfig"] = None,
+    runtime_config: Optional[Config] = None,
+    corpus: Optional[CorpusSource] = None,
+) -> int:
+    """
+    Price one project and write its outputs.
+
+    ``corpus`` lets callers such as :mod:`costest.batch` share a BidTabs
+    corpus that is already loaded and geometry-augmented across projects;
+    it is treated as read-only.  Pass a callable to get the shared corpus
+    for the project's region map.
+    """
     runtime_cfg = runtime_config or DEFAULT_CONFIG
+    if runtime_cfg.profile_run:
+        profile_dir = config.estimate_audit_csv.parent if config is not None else runtime_cfg.output_dir
+        return profile_call(
+            profile_dir,
+            run,
+            config,
+            replace(runtime_cfg, profile_run=False),
+            corpus,
+        )
 
     # Apply repository policy defaults (non-invasive; env can override)
     try:
@@ -954,7 +1243,12 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
             disable_ai=config.disable_ai,
         )
 
+    # Resolve the pricing date up front so a malformed PRICING_AS_OF fails
+    # before the corpus is loaded rather than when the index is built.
+    pricing_as_of = resolve_as_of(runtime_cfg.pricing_as_of)
+
     stage_counter = 0
+    profiler = RunProfiler(runtime_cfg.profile_memory, runtime_cfg.profile_slowest_items)
 
     if not logging.getLogger().handlers:
         logging.basicConfig(level=logging.INFO, format="%(message)s")
@@ -963,6 +1257,7 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
         nonlocal stage_counter
         stage_counter += 1
         logger.info("[pipeline:%02d] %s", stage_counter, message)
+        profiler.stage(message)
 
     def log_detail(message: str) -> None:
         logger.info("           %s", message)
@@ -1076,30 +1371,31 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
         )
     )
 
-    log_stage(f"Ingesting BidTabs corpus from {bidtabs_dir}")
-    bid = load_bidtabs_files(bidtabs_dir)
-    log_detail(f"raw_bidtabs_rows={len(bid):,} | columns={len(bid.columns)}")
-
-    bid = ensure_region_column(bid, region_map)
-    log_detail("region dimensions normalized onto BidTabs frame")
-
-    log_stage("Augmenting BidTabs dataset with geometry and numeric coercions")
-    geom_info = bid["DESCRIPTION"].apply(parse_geometry)
-    bid["GEOM_SHAPE"] = geom_info.map(lambda g: getattr(g, "shape", None))
-    bid["GEOM_AREA_SQFT"] = geom_info.map(lambda g: getattr(g, "area_sqft", float("nan")))
-    bid["GEOM_DIMENSIONS"] = geom_info.map(lambda g: getattr(g, "dimensions", None))
-
-    if "LETTING_DATE" in bid.columns:
-        bid["LETTING_DATE"] = pd.to_datetime(bid["LETTING_DATE"], errors="coerce")
-    if "UNIT_PRICE" in bid.columns:
-        bid["UNIT_PRICE"] = pd.to_numeric(bid["UNIT_PRICE"], errors="coerce")
-    if "WEIGHT" in bid.columns:
-        bid["WEIGHT"] = pd.to_numeric(bid["WEIGHT"], errors="coerce")
-    if "JOB_SIZE" in bid.columns:
-        bid["JOB_SIZE"] = pd.to_numeric(bid["JOB_SIZE"], errors="coerce")
+    corpus = _shared_corpus(corpus, region_map)
+    if corpus is None:
+        log_stage(f"Ingesting BidTabs corpus from {bidtabs_dir}")
+        corpus = load_prepared_bidtabs(
+            bidtabs_dir,
+            region_map,
+            cache_dir=runtime_cfg.bidtabs_cache_dir,
+            use_cache=not runtime_cfg.disable_bidtabs_cache,
+            workers=runtime_cfg.bidtabs_workers,
+        )
+    else:
+        log_stage(f"Reusing preloaded BidTabs corpus from {bidtabs_dir}")
+    bid = corpus.frame
+    log_detail(
+        f"bidtabs_cache={corpus.status} | source_files={corpus.source_files:,} | "
+        f"parsed_files={corpus.parsed_files:,} | removed_files={corpus.removed_files:,} | "
+        f"fingerprint={corpus.fingerprint[:12]}"
+    )
+    log_detail("region dimensions normalized, numeric coercions applied")
+    log_detail(f"post-sanitize BidTabs footprint => rows={len(bid):,} | columns={len(bid.columns)}")
+    profiler.count(bidtabs_rows=len(bid))
 
-    bid = _sanitize_bidtabs(bid)
-    log_detail(f"post-sanitize BidTabs footprint => rows={len(bid):,}")
+    if "GEOM_AREA_SQFT" not in bid.columns:
+        log_stage("Augmenting BidTabs dataset with geometry")
+        log_detail(f"geometry_cache={augment_geometry(bid, corpus)}")
 
     log_stage("Resolving project quantities workbook")
     if quantities_override:
@@ -1112,6 +1408,7 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
     qty_rows = len(qty)
     unique_items = qty["ITEM_CODE"].nunique(dropna=True) if "ITEM_CODE" in qty.columns else qty_rows
     log_detail(f"project_quantities_rows={qty_rows:,} | distinct_item_codes={unique_items:,}")
+    profiler.count(quantity_rows=qty_rows, distinct_item_codes=unique_items)
 
     if Path(aliases_path).exists():
         alias = pd.read_csv(aliases_path, dtype=str)
@@ -1149,44 +1446,18 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
     if dm2321_enabled and dm2321_crosswalk and "ITEM_CODE" in bid.columns:
         log_stage("Applying DM 23-21 HMA crosswalk data")
         log_detail(f"dm2321_crosswalk_rows={len(dm2321_crosswalk):,}")
-        deleted_rows = 0
-        keep_indices: list[int] = []
-        mapped_codes: list[str] = []
-        mapped_rules: list[str | None] = []
-        mapped_sources: list[str | None] = []
-        mapped_courses: list[str | None] = []
-        mapped_esals: list[str | None] = []
-        mapped_binders: list[str | None] = []
-
-        codes = bid["ITEM_CODE"].astype(str)
-        for idx, item_code in enumerate(codes):
-            new_code, meta = remap_item(item_code, dm2321_crosswalk)
-            if meta.get("deleted") and new_code is None:
-                deleted_rows += 1
-                continue
-            mapped = new_code or item_code
-            reverse_meta = dm2321_reverse_meta.get(mapped, {})
-            keep_indices.append(idx)
-            mapped_codes.append(mapped)
-            mapped_rules.append(meta.get("mapping_rule") or ("DM 23-21" if reverse_meta else None))
-            mapped_sources.append(meta.get("source_item") if meta.get("mapping_rule") else None)
-            mapped_courses.append(meta.get("course") or reverse_meta.get("course"))
-            mapped_esals.append(meta.get("esal_cat") or reverse_meta.get("esal_cat"))
-            mapped_binders.append(meta.get("binder_class") or reverse_meta.get("binder_class"))
-
-        if keep_indices:
-            bid = bid.iloc[keep_indices].copy()
-            bid.reset_index(drop=True, inplace=True)
-            bid["ITEM_CODE"] = mapped_codes
-            bid["DM2321_MAPPING_RULE"] = mapped_rules
-            bid["DM2321_SOURCE_ITEM"] = mapped_sources
-            bid["DM2321_COURSE"] = mapped_courses
-            bid["DM2321_ESAL_CAT"] = mapped_esals
-            bid["DM2321_BINDER_CLASS"] = mapped_binders
+        remap_key = derived_key(corpus, file_sha256(dm2321_path), list(bid.columns))
+        cached_remap = load_derived_frame(corpus, "dm2321", remap_key)
+        if cached_remap is not None:
+            bid, remap_info = cached_remap
+            deleted_rows = int(remap_info.get("deleted_rows", 0))
+            log_detail("dm2321_remap_cache=hit")
         else:
-            bid = bid.iloc[0:0].copy()
+            bid, deleted_rows = remap_frame(bid, dm2321_crosswalk, dm2321_reverse_meta)
+            store_derived_frame(corpus, "dm2321", remap_key, bid, deleted_rows=deleted_rows)
         if deleted_rows:
             log_detail(f"dm2321_deleted_bidtab_rows={deleted_rows:,}")
+        profiler.count(bidtabs_rows=len(bid), deleted_rows=deleted_rows)
     elif dm2321_enabled and not dm2321_crosswalk:
         logger.warning("DM 23-21 crosswalk enabled but no mapping data available at %s", dm2321_path)
 
@@ -1224,51 +1495,199 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
     else:
         log_detail("contract_filter bypassed (expected_contract_cost missing or JOB_SIZE unavailable)")
 
+    profiler.count(bidtabs_rows=len(bid))
+    with profiler.span("Building BidTabs index"):
+        bid_index = BidTabsIndex(bid, as_of=pricing_as_of)
+        profiler.count(item_codes=len(bid_index.item_codes))
+    log_detail(
+        f"bidtabs_index => rows={len(bid_index):,} | item_codes={len(bid_index.item_codes):,} | "
+        f"as_of={bid_index.as_of.date().isoformat()}"
+    )
+
+    pricing_cache = None
+    if not runtime_cfg.disable_pricing_cache:
+        crosswalk_key = file_sha256(dm2321_path) if dm2321_enabled and dm2321_path.exists() else "none"
+        pricing_cache = open_pricing_cache(
+            pricing_corpus_key(corpus.fingerprint, f"dm2321={int(bool(dm2321_enabled))}", crosswalk_key),
+            runtime_cfg.pricing_cache_dir,
+            runtime_cfg.pricing_cache_max_entries,
+        )
+        bid_index.result_store = pricing_cache
+    if pricing_cache is not None:
+        log_detail(f"pricing_cache => {pricing_cache.path}")
+    else:
+        log_detail("pricing_cache disabled")
+
     alt_seek_enabled = not runtime_cfg.disable_alt_seek
     if not alt_seek_enabled:
         log_detail("alternate_seek disabled via runtime configuration")
 
     ai_enabled = not runtime_cfg.disable_ai
 
+    ai_cache_settings = AICacheSettings(
+        ttl_days=runtime_cfg.ai_cache_ttl_days,
+        max_entries=runtime_cfg.ai_cache_max_entries,
+        cache_only=runtime_cfg.ai_cache_only,
+        enabled=not runtime_cfg.disable_ai_cache,
+    )
+    if runtime_cfg.ai_cache_dir is not None:
+        ai_cache_settings = replace(ai_cache_settings, cache_dir=runtime_cfg.ai_cache_dir)
+    configure_ai_cache(ai_cache_settings)
+    if ai_enabled:
+        log_detail(
+            f"ai_cache => {ai_cache_settings.path if ai_cache_settings.enabled else 'disabled'}"
+            + (" | cache_only" if ai_cache_settings.cache_only else "")
+        )
+
     rows = []
     dm2321_deleted_items: list[str] = []
     payitem_details: Dict[str, pd.DataFrame] = {}
     alternate_reports: Dict[str, Dict[str, object]] = {}
     summary_lookup = reference_data.load_unit_price_summary()
 
-    log_stage(f"Running item pricing analytics for {qty_rows:,} project rows")
+    pricing_requests: list[tuple[str, float | None, str] | None] = []
     for _, r in qty.iterrows():
+        pricing_requests.append(
+            _pricing_request(
+                str(r["ITEM_CODE"]).strip(),
+                str(r.get("DESCRIPTION", "")).strip(),
+                float(r.get("QUANTITY", 0) or 0),
+                dm2321_crosswalk if dm2321_enabled else None,
+                dm2321_reverse_meta,
+                dm2321_desc_by_new,
+            )
+        )
+    batch_started = time.perf_counter()
+    with profiler.span("Batch category pricing"):
+        batched = iter(
+            batch_category_breakdown(
+                bid_index,
+                [(code, target) for code, target, _ in filter(None, pricing_requests)],
+                project_region=project_region,
+                include_details=True,
+            )
+        )
+        row_breakdowns = [next(batched) if request is not None else None for request in pricing_requests]
+        profiler.count(requests=sum(request is not None for request in pricing_requests))
+    batch_requests = sum(request is not None for request in pricing_requests)
+    # Each priced line is credited with an equal share of the batch pass.
+    batch_share = (time.perf_counter() - batch_started) / max(batch_requests, 1)
+    log_detail(f"batch_pricing => requests={batch_requests:,}")
+
+    # Alternate seek runs for geometry items with no history that the Unit
+    # Price Summary cannot price; with --workers those calls are fanned out.
+    # Its result depends only on the item code and description, so repeated
+    # lines share one search.
+    alt_seek_tasks: Dict[int, tuple[str, str]] = {}
+    if alt_seek_enabled:
+        seek_keys: set[tuple[str, str]] = set()
+        for position, (request, breakdown) in enumerate(zip(pricing_requests, row_breakdowns)):
+            if request is None:
+                continue
+            code, _, desc = request
+            if (code, desc) in seek_keys:
+                continue
+            cat_data, combined_used = breakdown[2], breakdown[5]
+            if int(cat_data.get("TOTAL_USED_COUNT", len(combined_used))) != 0:
+                continue
+            if parse_geometry(desc) is None or _unit_price_summary(code, summary_lookup) is not None:
+                continue
+            alt_seek_tasks[position] = (code, desc)
+            seek_keys.add((code, desc))
+    with profiler.span("Alternate-seek prefetch"):
+        if alt_seek_tasks:
+            # Built before any worker forks so every search shares it.
+            geometry_candidate_index(bid_index)
+        # Batched AI selection needs every target in one process, so it takes
+        # precedence over the forked workers (the AI round trips dominate).
+        batch_ai = ai_enabled and runtime_cfg.ai_batch_size > 1
+        prefetched_alternates = {}
+        if not batch_ai:
+            prefetched_alternates = _prefetch_alternate_seek(
+                alt_seek_tasks,
+                bid_index,
+                project_region,
+                ai_enabled,
+                runtime_cfg.pricing_workers,
+                ai_timeout=runtime_cfg.ai_timeout,
+                ai_retries=runtime_cfg.ai_retries,
+            )
+        ai_prefetch = False
+        if not prefetched_alternates and ai_enabled:
+            prefetched_alternates = _prefetch_alternate_ai(
+                alt_seek_tasks,
+                bid_index,
+                project_region,
+                runtime_cfg.ai_concurrency,
+                ai_timeout=runtime_cfg.ai_timeout,
+                ai_retries=runtime_cfg.ai_retries,
+                batch_size=runtime_cfg.ai_batch_size,
+            )
+            ai_prefetch = bool(prefetched_alternates)
+        profiler.count(tasks=len(alt_seek_tasks), prefetched=len(prefetched_alternates))
+    if prefetched_alternates:
+        if ai_prefetch:
+            concurrency_label = (
+                f"ai_concurrency={min(runtime_cfg.ai_concurrency, len(alt_seek_tasks))} | "
+                f"ai_batch_size={runtime_cfg.ai_batch_size}"
+            )
+        else:
+            concurrency_label = f"workers={min(runtime_cfg.pricing_workers, len(alt_seek_tasks))}"
+        log_detail(f"alternate_seek_prefetch => items={len(prefetched_alternates):,} | {concurrency_label}")
+    alternate_results: Dict[tuple[str, str], object] = {
+        alt_seek_tasks[position]: result for position, (result, _) in prefetched_alternates.items()
+    }
+    # Prefetched search time is credited to the line that requested it.
+    prefetch_seconds = {position: seconds for position, (_, seconds) in prefetched_alternates.items()}
+    prefetched_keys = set(alternate_results)
+    alternate_keys_used: set[tuple[str, str]] = set()
+
+    # Lines repeating an earlier (code, description, unit, quantity) are priced
+    # identically, so they reuse that line's row, audit detail and report. The
+    # key holds the exact quantity rather than its quantity band: the band's
+    # bounds scale with the quantity, so two lines in one band can draw on
+    # different bids. Reused rows are copied before the fallback and
+    # contract-percent passes, which price each copy from the same inputs.
+    priced_lines: Dict[tuple, tuple[int, Dict[str, object], Optional[pd.DataFrame], Optional[dict]]] = {}
+    dedupe_counts = {"reused_lines": 0, "alternate_seek_shared": 0}
+
+    def _item_seconds(position: int, started: float) -> float:
+        """Latency of one line: its loop time, its batch share and any prefetched search."""
+        return time.perf_counter() - started + batch_share + prefetch_seconds.get(position, 0.0)
+
+    log_stage(f"Running item pricing analytics for {qty_rows:,} project rows")
+    item_timings: list[tuple[Dict[str, object], float, bool]] = []
+    for position, ((_, r), request, breakdown) in enumerate(zip(qty.iterrows(), pricing_requests, row_breakdowns)):
+        item_started = time.perf_counter()
         code = str(r["ITEM_CODE"]).strip()
         desc = str(r.get("DESCRIPTION", "")).strip()
         unit = str(r.get("UNIT", "")).strip()
         qty_val = float(r.get("QUANTITY", 0) or 0)
         original_code = code
+        line_key = (code, desc, unit, qty_val)
+        line_alt_entry: Optional[dict] = None
 
         mapped_from_old: str | None = None
         dm_mapping_rule: str | None = None
         dm_course: str | None = None
         dm_esal: str | None = None
         dm_binder: str | None = None
-        dm_new_desc: str | None = None
         dm_adder_applied = False
 
+        if request is None:
+            logger.info("[item] %s :: skipped (DM 23-21 deleted)", code or "(blank)")
+            dm2321_deleted_items.append(code)
+            continue
+        # The remapped code, pricing quantity and description come from _pricing_request.
+        code, _, desc = request
         if dm2321_enabled:
-            new_code, meta = remap_item(code, dm2321_crosswalk)
-            if meta.get("deleted") and new_code is None:
-                logger.info("[item] %s :: skipped (DM 23-21 deleted)", code or "(blank)")
-                dm2321_deleted_items.append(code)
-                continue
-            mapped_code = new_code or code
-            reverse_meta = dm2321_reverse_meta.get(mapped_code, {})
+            _, meta = remap_item(original_code, dm2321_crosswalk)
+            reverse_meta = dm2321_reverse_meta.get(code, {})
             mapped_from_old = meta.get("source_item") if meta.get("mapping_rule") else None
             dm_course = meta.get("course") or reverse_meta.get("course")
             dm_esal = meta.get("esal_cat") or reverse_meta.get("esal_cat")
             dm_binder = meta.get("binder_class") or reverse_meta.get("binder_class")
             dm_mapping_rule = meta.get("mapping_rule") or ("DM 23-21" if reverse_meta else None)
-            dm_new_desc = meta.get("new_desc") or reverse_meta.get("new_desc") or dm2321_desc_by_new.get(mapped_code)
-            code = mapped_code
-            if dm_new_desc:
-                desc = dm_new_desc
 
         code_display = code or "(blank)"
         desc_compact = " ".join(desc.split())
@@ -1278,16 +1697,21 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
         if dm_mapping_rule and mapped_from_old:
             logger.info("        dm2321_mapping => %s -> %s", mapped_from_old, code_display)
 
-        target_quantity = qty_val if qty_val > 0 else None
-        if dm2321_enabled and dm_mapping_rule == "DM 23-21":
-            target_quantity = None
-        price, source_label, cat_data, detail_map, used_categories, combined_used = category_breakdown(
-            bid,
-            code,
-            project_region=project_region,
-            include_details=True,
-            target_quantity=target_quantity,
-        )
+        priced = priced_lines.get(line_key)
+        if priced is not None:
+            first_line, template, detail_frame, alt_entry = priced
+            logger.info("        reusing pricing of project line %s", first_line + 1)
+            row = dict(template)
+            rows.append(row)
+            if detail_frame is not None:
+                payitem_details[code] = detail_frame
+            if alt_entry is not None:
+                alternate_reports[code] = alt_entry
+            dedupe_counts["reused_lines"] += 1
+            item_timings.append((row, _item_seconds(position, item_started), (code, desc) in prefetched_keys))
+            continue
+
+        price, source_label, cat_data, detail_map, used_categories, combined_used = breakdown
 
         note = ""
         if pd.isna(price):
@@ -1398,15 +1822,25 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
         if not summary_applied and alt_seek_enabled and data_points_used == 0 and geometry is not None:
             area_display = getattr(geometry, "area_sqft", float("nan"))
             logger.info("        alternate_seek activating => geometry_area=%s sqft", f"{area_display:.2f}")
-            alt_result = find_alternate_price(
-                bid,
-                code,
-                geometry,
-                project_region=project_region,
-                target_description=desc,
-                reference_bundle=reference_bundle,
-                allow_ai=ai_enabled,
-            )
+            alt_key = (code, desc)
+            if alt_key in alternate_keys_used:
+                dedupe_counts["alternate_seek_shared"] += 1
+            alternate_keys_used.add(alt_key)
+            if alt_key in alternate_results:
+                alt_result = alternate_results[alt_key]
+            else:
+                alt_result = find_alternate_price(
+                    bid_index,
+                    code,
+                    geometry,
+                    project_region=project_region,
+                    target_description=desc,
+                    reference_bundle=reference_bundle,
+                    allow_ai=ai_enabled,
+                    ai_timeout=runtime_cfg.ai_timeout,
+                    ai_retries=runtime_cfg.ai_retries,
+                )
+                alternate_results[alt_key] = alt_result
             if alt_result is not None:
                 price = alt_result.final_price
                 unit_price_est = _round_unit_price(price)
@@ -1518,6 +1952,7 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
                 if alt_result.process_improvements:
                     alt_entry["process_improvements"] = alt_result.process_improvements
                 alternate_reports[code] = alt_entry
+                line_alt_entry = alt_entry
                 if alt_result.ai_notes:
                     alt_entry["chosen"]["notes"] = alt_result.ai_notes
                 cat_data = alt_result.cat_data
@@ -1556,55 +1991,51 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
 
         if detail_frames:
             payitem_details[code] = pd.concat(detail_frames, ignore_index=True)
+        priced_lines[line_key] = (
+            position,
+            dict(row),
+            payitem_details[code] if detail_frames else None,
+            line_alt_entry,
+        )
+        item_timings.append((row, _item_seconds(position, item_started), (code, desc) in prefetched_keys))
+    category_requests = [(code, target) for code, target, _ in filter(None, pricing_requests)]
+    pricing_dedupe = {
+        "project_lines": len(rows),
+        "distinct_lines": len(priced_lines),
+        "reused_lines": dedupe_counts["reused_lines"],
+        "category_requests_shared": len(category_requests) - len(set(category_requests)),
+        "alternate_seek_shared": dedupe_counts["alternate_seek_shared"],
+    }
+    log_detail(
+        f"pricing_dedupe => distinct_lines={pricing_dedupe['distinct_lines']:,} | "
+        f"reused_lines={pricing_dedupe['reused_lines']:,} | "
+        f"alternate_seek_shared={pricing_dedupe['alternate_seek_shared']:,}"
+    )
+    profiler.count(
+        priced_rows=len(rows),
+        dm2321_deleted_items=len(dm2321_deleted_items),
+        reused_lines=dedupe_counts["reused_lines"],
+    )
 
     log_stage("Executing non-geometry fallback pricing routines")
-    apply_non_geometry_fallbacks(rows, bid, project_region, payitem_details)
+    apply_non_geometry_fallbacks(rows, bid_index, project_region, payitem_details)
     log_detail("non-geometry fallback pass complete")
+    for row, seconds, prefetched in item_timings:
+        profiler.record_item(str(row.get("ITEM_CODE") or ""), seconds, _pricing_path(row, prefetched))
 
-    def _compute_contract_subtotal(exclude_codes: set[str]) -> float:
-        total = 0.0
-        for entry in rows:
-            code = entry.get("ITEM_CODE")
-            if code in exclude_codes:
-                continue
-            qty_val = float(entry.get("QUANTITY", 0) or 0)
-            price_val = float(entry.get("UNIT_PRICE_EST", 0) or 0)
-            total += qty_val * price_val
-        return total
+    contract_pricer = _ContractPercentPricer(rows)
 
     def _apply_contract_percent(code: str, percent: float, exclude_codes: set[str], note_label: str) -> None:
-        row_obj = next((entry for entry in rows if entry.get("ITEM_CODE") == code), None)
-        if row_obj is None:
+        position = contract_pricer.position(code)
+        if position is None:
             log_detail(f"contract_percent skipped => code={code} not present in rows")
             return
+        row_obj = rows[position]
         qty_val = float(row_obj.get("QUANTITY", 0) or 0)
         if qty_val <= 0:
             log_detail(f"contract_percent skipped => code={code} has non-positive quantity")
             return
-        subtotal = _compute_contract_subtotal(exclude_codes)
-        target_amount = subtotal * percent
-        rounded_amount = math.floor(target_amount / 1000.0) * 1000.0
-        unit_price = round(rounded_amount / qty_val, 2) if qty_val else 0.0
-        row_obj["UNIT_PRICE_EST"] = unit_price
-        row_obj["DATA_POINTS_USED"] = 0
-        row_obj["ALTERNATE_USED"] = False
-        for key in (
-            "ALTERNATE_SOURCE_ITEM",
-            "ALTERNATE_RATIO",
-            "ALTERNATE_BASE_PRICE",
-            "ALTERNATE_SOURCE_AREA",
-            "ALTERNATE_CANDIDATE_COUNT",
-            "ALTERNATE_METHOD",
-            "ALTERNATE_AI_NOTES",
-        ):
-            row_obj.pop(key, None)
-        note_text = f"{note_label} {percent * 100:.1f}% of applicable items = ${rounded_amount:,.0f}."
-        existing_note = str(row_obj.get("NOTES", "") or "").strip()
-        row_obj["NOTES"] = f"{existing_note} {note_text}".strip() if existing_note else note_text
-        for label in CATEGORY_LABELS:
-            row_obj[f"{label}_PRICE"] = float("nan")
-            row_obj[f"{label}_COUNT"] = 0
-            row_obj[f"{label}_INCLUDED"] = False
+        rounded_amount, unit_price = contract_pricer.apply(position, percent, exclude_codes, note_label)
         alternate_reports.pop(code, None)
         detail_columns = [
             "ITEM_CODE",
@@ -1694,6 +2125,7 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
     log_stage("Compiling estimator dataframe for export")
     df = pd.DataFrame(rows)
     log_detail(f"estimate_dataframe_shape => rows={len(df):,} | columns={len(df.columns)}")
+    profiler.count(estimate_rows=len(df))
 
     log_stage("Evaluating alternate-seek narrative generation pipeline")
     ai_report_path = None
@@ -1715,9 +2147,36 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
     elif alternate_reports and not ai_enabled:
         logger.info("AI reporting disabled; skipping alternate-seek narrative generation.")
 
+    memo_stats = bid_index.memo.stats()
+    log_detail(
+        f"breakdown_memo => hits={memo_stats['hits']:,} | misses={memo_stats['misses']:,} | "
+        f"entries={memo_stats['size']:,}/{memo_stats['maxsize']:,}"
+    )
+
+    pricing_cache_meta: Dict[str, object] = {"status": "disabled"}
+    if pricing_cache is not None:
+        try:
+            pricing_cache.flush()
+            pricing_cache_meta = dict(pricing_cache.stats(), status="enabled")
+        except Exception:
+            logger.warning("Unable to persist pricing cache at %s", pricing_cache.path, exc_info=True)
+        finally:
+            pricing_cache.close()
+        log_detail(
+            f"pricing_cache => hits={pricing_cache.hits:,} | misses={pricing_cache.misses:,} | "
+            f"stored={pricing_cache.stored:,} | evicted={pricing_cache.evicted:,}"
+        )
+
     log_stage("Persisting estimator outputs to disk")
     write_outputs(df, str(out_xlsx), str(out_audit), payitem_details, str(out_pay_audit))
     log_detail(f"outputs_written => {out_xlsx}, {out_audit}, {out_pay_audit}")
+    profiler.finish()
+    profile = profiler.as_dict()
+    slowest_stage = max(profiler.root.children, key=lambda span: span.wall_seconds or 0.0)
+    log_detail(
+        f"profile => wall={profile['wall_seconds']:.2f}s | cpu={profile['cpu_seconds']:.2f}s | "
+        f"slowest_stage={slowest_stage.name} ({slowest_stage.wall_seconds or 0.0:.2f}s)"
+    )
 
     # Emit run provenance/metadata for reliability and auditability
     try:
@@ -1743,6 +2202,19 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
             "memo_rollup_sigma_threshold": float(os.getenv('MEMO_ROLLUP_SIGMA_THRESHOLD', '2.0')),
             "quantity_elasticity_enabled": os.getenv('ENABLE_QUANTITY_ELASTICITY', '0') in {'1','true','on','yes'},
             "spec_edition": spec_edition,
+            "pricing_as_of": bid_index.as_of.date().isoformat(),
+            "breakdown_memo": bid_index.memo.stats(),
+            "pricing_cache": pricing_cache_meta,
+            "ai_cache": ai_cache_stats(),
+            "pricing_dedupe": pricing_dedupe,
+            "profile": profile,
+            "bidtabs_cache": {
+                "status": corpus.status,
+                "fingerprint": corpus.fingerprint,
+                "parsed_files": corpus.parsed_files,
+                "removed_files": corpus.removed_files,
+                "path": str(corpus.cache_path) if corpus.cache_path else None,
+            },
             "inputs": {
                 "bidtabs_dir": str(bidtabs_dir),
                 "quantities_path": str(qty_path),
@@ -1821,8 +2293,17 @@ def run(config: Optional["CLIConfig"] = None, runtime_config: Optional[Config] =
     return 0
 
 
-def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Generate cost estimate outputs from BidTabs history")
+def _as_of_argument(value: str) -> Optional[str]:
+    try:
+        return parse_as_of(value, "--as-of")
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def build_parser(**kwargs) -> argparse.ArgumentParser:
+    """Return the argument parser shared by ``costest``, ``costest batch`` and ``costest serve``."""
+    kwargs.setdefault("description", "Generate cost estimate outputs from BidTabs history")
+    parser = argparse.ArgumentParser(**kwargs)
     parser.add_argument("--bidtabs-dir", help="Directory containing BidTabs files")
     parser.add_argument("--quantities-xlsx", help="Path to project quantities workbook")
     parser.add_argument("--project-attributes", help="Path to project attributes workbook")
@@ -1836,13 +2317,101 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Enable HMA remapping + transitional adders per INDOT DM 23-21.",
     )
+    parser.add_argument("--bidtabs-cache-dir", help="Directory for the prepared BidTabs corpus cache")
+    parser.add_argument(
+        "--no-bidtabs-cache",
+        action="store_true",
+        help="Always re-parse BidTabs files instead of using the on-disk corpus cache.",
+    )
+    parser.add_argument(
+        "--bidtabs-workers",
+        type=int,
+        help="Parse BidTabs workbooks in this many worker processes (default 1 = serial).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Run alternate-seek item pricing in this many forked worker processes (default 1 = serial).",
+    )
+    parser.add_argument(
+        "--ai-concurrency",
+        type=int,
+        help="Maximum OpenAI alternate-selection requests in flight at once when --workers is 1 (default 4).",
+    )
+    parser.add_argument(
+        "--ai-timeout",
+        type=float,
+        help="Seconds to wait for each OpenAI request before retrying (default 60; 0 = client default).",
+    )
+    parser.add_argument(
+        "--ai-batch-size",
+        type=int,
+        help="Send up to this many alternate-seek targets per OpenAI selection request (default 1 = one each).",
+    )
+    parser.add_argument("--ai-cache-dir", help="Directory for the on-disk OpenAI response cache")
+    parser.add_argument(
+        "--ai-cache-only",
+        action="store_true",
+        help="Answer OpenAI requests from the response cache only; uncached requests fail without network calls.",
+    )
+    parser.add_argument(
+        "--no-ai-cache",
+        action="store_true",
+        help="Send every OpenAI request instead of reusing cached responses.",
+    )
+    parser.add_argument(
+        "--ai-retries",
+        type=int,
+        help="Retries for OpenAI requests that time out or hit rate limits/server errors (default 2).",
+    )
+    parser.add_argument("--pricing-cache-dir", help="Directory for the cross-run pricing result cache")
+    parser.add_argument(
+        "--no-pricing-cache",
+        action="store_true",
+        help="Recompute every item price instead of reusing results from earlier runs.",
+    )
+    parser.add_argument(
+        "--as-of",
+        type=_as_of_argument,
+        help=(
+            "Price as of this date (YYYY-MM-DD): bids let later are ignored and the "
+            "DIST_*/STATE_* windows are measured from it (default today)."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run under cProfile and write run_profile.pstats and flamegraph stacks next to the outputs.",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Trace Python allocations per pipeline stage in run_metadata.json (slower).",
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Increase logging verbosity")
-    return parser.parse_args(argv)
+    return parser
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    return build_parser().parse_args(argv)
 
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
-    args = parse_args(argv)
-    runtime_cfg = load_runtime_config(os.environ, args)
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ["batch"]:
+        from .batch import main as batch_main
+
+        return batch_main(argv[1:])
+    if argv[:1] == ["serve"]:
+        from .serve import main as serve_main
+
+        return serve_main(argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        runtime_cfg = load_runtime_config(os.environ, args)
+    except ValueError as exc:
+        parser.error(str(exc))
     log_level = logging.DEBUG if runtime_cfg.verbose else logging.INFO
     logging.basicConfig(level=log_level, format="%(message)s")
     try:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from datetime import date, datetime
 from pathlib import Path
 from types import SimpleNamespace
 from typing import Mapping, Optional
@@ -35,6 +36,26 @@ class Config:
     legacy_expected_cost_path: Optional[Path]
     apply_dm23_21: bool = False
     verbose: bool = False
+    bidtabs_cache_dir: Optional[Path] = None
+    disable_bidtabs_cache: bool = False
+    bidtabs_workers: int = 1
+    pricing_as_of: Optional[str] = None
+    pricing_cache_dir: Optional[Path] = None
+    disable_pricing_cache: bool = False
+    pricing_cache_max_entries: int = 50_000
+    pricing_workers: int = 1
+    ai_concurrency: int = 4
+    ai_timeout: Optional[float] = 60.0
+    ai_retries: int = 2
+    ai_batch_size: int = 1
+    ai_cache_dir: Optional[Path] = None
+    ai_cache_ttl_days: Optional[float] = 30.0
+    ai_cache_max_entries: int = 5_000
+    ai_cache_only: bool = False
+    disable_ai_cache: bool = False
+    profile_memory: bool = False
+    profile_slowest_items: int = 10
+    profile_run: bool = False
 
 
 def _to_path(value: object | None) -> Optional[Path]:
@@ -72,6 +93,26 @@ def _to_float(value: object | None) -> Optional[float]:
         return None
 
 
+def parse_as_of(value: object | None, source: str = "as-of date") -> Optional[str]:
+    """
+    Normalize a pricing as-of date to ``YYYY-MM-DD``; blank means "today" (``None``).
+
+    Raises :class:`ValueError` naming ``source`` when the value is not a
+    calendar date, so bad input is rejected before any corpus work.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Invalid {source} {text!r}: expected a date in YYYY-MM-DD form") from None
+
+
 def _flag(value: object | None) -> bool:
     if value is None:
         return False
@@ -123,6 +164,31 @@ def load_config(env: Mapping[str, str], cli_args: object | None = None) -> Confi
     project_region = _to_int(env.get("PROJECT_REGION"))
     project_district = env.get("PROJECT_DISTRICT") or None
     legacy_expected_cost_path = _to_path(env.get("EXPECTED_COST_XLSX"))
+    bidtabs_cache_dir = _to_path(env.get("BIDTABS_CACHE_DIR"))
+    disable_bidtabs_cache = _flag(env.get("DISABLE_BIDTABS_CACHE"))
+    bidtabs_workers = max(1, _to_int(env.get("BIDTABS_WORKERS")) or 1)
+    pricing_as_of = parse_as_of(env.get("PRICING_AS_OF"), "PRICING_AS_OF")
+    pricing_cache_dir = _to_path(env.get("PRICING_CACHE_DIR"))
+    disable_pricing_cache = _flag(env.get("DISABLE_PRICING_CACHE"))
+    pricing_cache_max_entries = max(1, _to_int(env.get("PRICING_CACHE_MAX_ENTRIES")) or 50_000)
+    pricing_workers = max(1, _to_int(env.get("PRICING_WORKERS")) or 1)
+    ai_concurrency = _to_int(env.get("AI_CONCURRENCY"))
+    ai_concurrency = 4 if ai_concurrency is None else max(1, ai_concurrency)
+    ai_timeout = _to_float(env.get("AI_TIMEOUT_SECONDS"))
+    ai_timeout = 60.0 if ai_timeout is None else (ai_timeout if ai_timeout > 0 else None)
+    ai_retries = _to_int(env.get("AI_RETRIES"))
+    ai_retries = 2 if ai_retries is None else max(0, ai_retries)
+    ai_batch_size = max(1, _to_int(env.get("AI_BATCH_SIZE")) or 1)
+    ai_cache_dir = _to_path(env.get("AI_CACHE_DIR"))
+    ai_cache_ttl_days = _to_float(env.get("AI_CACHE_TTL_DAYS"))
+    ai_cache_ttl_days = 30.0 if ai_cache_ttl_days is None else (ai_cache_ttl_days if ai_cache_ttl_days > 0 else None)
+    ai_cache_max_entries = max(1, _to_int(env.get("AI_CACHE_MAX_ENTRIES")) or 5_000)
+    ai_cache_only = _flag(env.get("AI_CACHE_ONLY"))
+    disable_ai_cache = _flag(env.get("DISABLE_AI_CACHE"))
+    profile_memory = _flag(env.get("PROFILE_MEMORY"))
+    profile_slowest_items = _to_int(env.get("PROFILE_SLOWEST_ITEMS"))
+    profile_slowest_items = 10 if profile_slowest_items is None else max(0, profile_slowest_items)
+    profile_run = _flag(env.get("COSTEST_PROFILE"))
     verbose = False
 
     cli_ns = _namespace(cli_args)
@@ -149,6 +215,38 @@ def load_config(env: Mapping[str, str], cli_args: object | None = None) -> Confi
         verbose = bool(cli_ns.verbose)
     if getattr(cli_ns, "apply_dm23_21", False):
         apply_dm23_21 = True
+    if getattr(cli_ns, "bidtabs_cache_dir", None):
+        bidtabs_cache_dir = _to_path(cli_ns.bidtabs_cache_dir) or bidtabs_cache_dir
+    if getattr(cli_ns, "no_bidtabs_cache", False):
+        disable_bidtabs_cache = True
+    if getattr(cli_ns, "bidtabs_workers", None) is not None:
+        bidtabs_workers = max(1, int(cli_ns.bidtabs_workers))
+    if getattr(cli_ns, "as_of", None):
+        pricing_as_of = parse_as_of(cli_ns.as_of, "--as-of")
+    if getattr(cli_ns, "pricing_cache_dir", None):
+        pricing_cache_dir = _to_path(cli_ns.pricing_cache_dir) or pricing_cache_dir
+    if getattr(cli_ns, "no_pricing_cache", False):
+        disable_pricing_cache = True
+    if getattr(cli_ns, "workers", None) is not None:
+        pricing_workers = max(1, int(cli_ns.workers))
+    if getattr(cli_ns, "ai_concurrency", None) is not None:
+        ai_concurrency = max(1, int(cli_ns.ai_concurrency))
+    if getattr(cli_ns, "ai_timeout", None) is not None:
+        ai_timeout = float(cli_ns.ai_timeout) if float(cli_ns.ai_timeout) > 0 else None
+    if getattr(cli_ns, "ai_retries", None) is not None:
+        ai_retries = max(0, int(cli_ns.ai_retries))
+    if getattr(cli_ns, "ai_batch_size", None) is not None:
+        ai_batch_size = max(1, int(cli_ns.ai_batch_size))
+    if getattr(cli_ns, "ai_cache_dir", None):
+        ai_cache_dir = _to_path(cli_ns.ai_cache_dir) or ai_cache_dir
+    if getattr(cli_ns, "ai_cache_only", False):
+        ai_cache_only = True
+    if getattr(cli_ns, "no_ai_cache", False):
+        disable_ai_cache = True
+    if getattr(cli_ns, "profile_memory", False):
+        profile_memory = True
+    if getattr(cli_ns, "profile", False):
+        profile_run = True
 
     return Config(
         base_dir=base_dir,
@@ -172,6 +270,26 @@ def load_config(env: Mapping[str, str], cli_args: object | None = None) -> Confi
         legacy_expected_cost_path=legacy_expected_cost_path,
         apply_dm23_21=apply_dm23_21,
         verbose=verbose,
+        bidtabs_cache_dir=bidtabs_cache_dir,
+        disable_bidtabs_cache=disable_bidtabs_cache,
+        bidtabs_workers=bidtabs_workers,
+        pricing_as_of=pricing_as_of,
+        pricing_cache_dir=pricing_cache_dir,
+        disable_pricing_cache=disable_pricing_cache,
+        pricing_cache_max_entries=pricing_cache_max_entries,
+        pricing_workers=pricing_workers,
+        ai_concurrency=ai_concurrency,
+        ai_timeout=ai_timeout,
+        ai_retries=ai_retries,
+        ai_batch_size=ai_batch_size,
+        ai_cache_dir=ai_cache_dir,
+        ai_cache_ttl_days=ai_cache_ttl_days,
+        ai_cache_max_entries=ai_cache_max_entries,
+        ai_cache_only=ai_cache_only,
+        disable_ai_cache=disable_ai_cache,
+        profile_memory=profile_memory,
+        profile_slowest_items=profile_slowest_items,
+        profile_run=profile_run,
     )
 
 
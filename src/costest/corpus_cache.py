@@ -0,0 +1,600 @@
+"""
+Persistent on-disk cache for the prepared BidTabs corpus.
+
+Parsing the legacy ``.xls`` exports through xlrd dominates every estimator
+run, even though the folder rarely changes between runs.  This module keeps
+the normalized, typed and sanitized corpus in a binary columnar store next
+to the other reference caches:
+
+- one ``.npy`` file per numeric/datetime column (loadable with ``mmap_mode``)
+- string columns stored as int32 category codes plus a JSON category list
+- any other column (and a non-integer index) as a fixed-width text array
+  plus a per-value type tag, so loading the cache never unpickles
+- optionally a single Parquet file when ``BIDTABS_CACHE_FORMAT=parquet``
+  and ``pyarrow`` is installed
+
+A ``manifest.json`` records each source file's name, size, mtime and SHA-256
+content hash.  Files whose size/mtime changed are re-hashed.  The corpus
+fingerprint and the partition keys also fold in ``PREPARATION_KEY``, a hash
+of the parsing and preparation code, so a change to how workbooks are read
+or sanitized invalidates the cache.
+
+Ingestion is incremental: the normalized rows of every source file are kept
+as a partition under ``parts/`` keyed by content hash, so when a new letting
+workbook arrives only that file is parsed.  Partitions of deleted files are
+pruned, and the prepared snapshot is rebuilt from the partitions because
+sanitizing de-duplicates bids across files.
+
+Derived snapshots, such as the DM 23-21 remapped corpus, are stored under
+``derived/`` next to the snapshot they were computed from.  Each one is keyed
+by the corpus fingerprint plus its own inputs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionArray
+
+from . import bidtabs_io
+from .bidtabs_io import (
+    coerce_bidtabs_types,
+    ensure_region_column,
+    list_bidtabs_files,
+    load_bidtabs_files,
+    parse_bidtabs_files,
+    sanitize_bidtabs,
+)
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = BASE_DIR / "data_sample" / "cache" / "bidtabs"
+CACHE_VERSION = 3
+MANIFEST_NAME = "manifest.json"
+
+_HASH_CHUNK = 1 << 20
+
+
+@dataclass
+class PreparedCorpus:
+    """Prepared BidTabs frame plus provenance of how it was obtained."""
+
+    frame: pd.DataFrame
+    status: str  # hit | built | incremental | disabled
+    fingerprint: str
+    cache_path: Optional[Path] = None
+    source_files: int = 0
+    parsed_files: int = 0
+    removed_files: int = 0
+    region_key: Optional[str] = None  # region_map_key() of the map REGION came from
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def region_map_key(region_map: pd.DataFrame | None) -> str:
+    """Stable hash of the DISTRICT -> REGION map a corpus was prepared with."""
+    if region_map is None or getattr(region_map, "empty", True):
+        return "none"
+    hashed = pd.util.hash_pandas_object(region_map, index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def _store_dir(cache_dir: Path, folder: Path) -> Path:
+    key = hashlib.sha1(str(folder.resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / key
+
+
+def scan_source_files(folder: Path, known: Optional[Dict[str, dict]] = None) -> List[dict]:
+    """
+    Describe every BidTabs source file in ``folder``.
+
+    ``known`` maps file names to previous manifest entries; when size and
+    mtime are unchanged the recorded hash is reused instead of re-reading
+    the file.
+    """
+    known = known or {}
+    entries: List[dict] = []
+    for path in list_bidtabs_files(folder):
+        stat = path.stat()
+        prior = known.get(path.name)
+        if prior and prior.get("size") == stat.st_size and prior.get("mtime_ns") == stat.st_mtime_ns:
+            sha = prior["sha256"]
+        else:
+            sha = file_sha256(path)
+        entries.append(
+            {
+                "name": path.name,
+                "size": int(stat.st_size),
+                "mtime_ns": int(stat.st_mtime_ns),
+                "sha256": sha,
+            }
+        )
+    return entries
+
+
+def corpus_fingerprint(files: List[dict], region_key: str) -> str:
+    payload = {
+        "version": CACHE_VERSION,
+        "preparation": PREPARATION_KEY,
+        "files": [(entry["name"], entry["sha256"]) for entry in files],
+        "region_map": region_key,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def prepare_bidtabs(raw: pd.DataFrame, region_map: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Apply region normalization, type coercion and sanitizing to a raw BidTabs stack."""
+    bid = ensure_region_column(raw, region_map)
+    bid = coerce_bidtabs_types(bid)
+    return sanitize_bidtabs(bid)
+
+
+# Changes whenever the workbook parsing (bidtabs_io) or prepare_bidtabs changes.
+PREPARATION_KEY = hashlib.sha256(
+    Path(bidtabs_io.__file__).read_bytes() + inspect.getsource(prepare_bidtabs).encode("utf-8")
+).hexdigest()[:16]
+
+
+# ------------ Columnar store ------------
+
+_VALUE_TAGS = ("nan", "none", "na", "nat", "str", "int", "float", "bool", "timestamp")
+
+
+def _encode_values(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Encode an object array as (type tags, fixed-width text); raises ``TypeError`` for other types."""
+    tags = np.empty(len(values), dtype=np.uint8)
+    texts: List[str] = []
+    for pos, value in enumerate(values):
+        text = ""
+        if value is None:
+            tag = "none"
+        elif value is pd.NA:
+            tag = "na"
+        elif value is pd.NaT:
+            tag = "nat"
+        elif isinstance(value, str):
+            tag, text = "str", value
+        elif isinstance(value, (bool, np.bool_)):
+            tag, text = "bool", str(int(value))
+        elif isinstance(value, (int, np.integer)):
+            tag, text = "int", str(int(value))
+        elif isinstance(value, (float, np.floating)):
+            tag, text = ("nan", "") if np.isnan(value) else ("float", repr(float(value)))
+        elif isinstance(value, pd.Timestamp):
+            tag, text = "timestamp", value.isoformat()
+        else:
+            raise TypeError(f"Cannot cache {type(value).__name__} values")
+        tags[pos] = _VALUE_TAGS.index(tag)
+        texts.append(text)
+    return tags, np.array(texts, dtype=np.str_)
+
+
+def _decode_values(tags: np.ndarray, texts: np.ndarray) -> np.ndarray:
+    decoders = {
+        "nan": lambda _: np.nan,
+        "none": lambda _: None,
+        "na": lambda _: pd.NA,
+        "nat": lambda _: pd.NaT,
+        "str": str,
+        "int": int,
+        "float": float,
+        "bool": lambda text: text == "1",
+        "timestamp": pd.Timestamp,
+    }
+    table = [decoders[tag] for tag in _VALUE_TAGS]
+    values = np.empty(len(tags), dtype=object)
+    for pos, (tag, text) in enumerate(zip(tags.tolist(), texts.tolist())):
+        values[pos] = table[tag](text)
+    return values
+
+
+def _write_values(series: pd.Series, data_dir: Path, stem: str) -> dict:
+    """Store one column (or the index) as ``stem`` files and return its spec."""
+    dtype = series.dtype
+    if pd.api.types.is_datetime64_ns_dtype(dtype) and getattr(dtype, "tz", None) is None:
+        np.save(data_dir / f"{stem}.npy", series.to_numpy().view("int64"))
+        kind = "datetime"
+    elif isinstance(dtype, np.dtype) and dtype.kind in "iufb":
+        np.save(data_dir / f"{stem}.npy", series.to_numpy())
+        kind = "numeric"
+    else:
+        codes, uniques = pd.factorize(series, sort=False)
+        missing = series[codes < 0]
+        if (
+            pd.api.types.is_object_dtype(series)
+            and all(isinstance(value, str) for value in uniques)
+            and all(isinstance(value, float) for value in missing)
+        ):
+            np.save(data_dir / f"{stem}.npy", codes.astype(np.int32))
+            (data_dir / f"{stem}.json").write_text(
+                json.dumps(list(uniques), ensure_ascii=False), encoding="utf-8"
+            )
+            kind = "category"
+        else:
+            tags, texts = _encode_values(series.to_numpy(dtype=object))
+            np.save(data_dir / f"{stem}.npy", tags)
+            np.save(data_dir / f"{stem}.text.npy", texts)
+            kind = "mixed"
+    return {"file": stem, "kind": kind, "dtype": str(dtype)}
+
+
+def _read_values(data_dir: Path, spec: dict) -> np.ndarray | ExtensionArray:
+    path = data_dir / f"{spec['file']}.npy"
+    kind = spec["kind"]
+    if kind == "numeric":
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+    if kind == "datetime":
+        return np.load(path, mmap_mode="r", allow_pickle=False).view("datetime64[ns]")
+    if kind == "category":
+        codes = np.load(path, mmap_mode="r", allow_pickle=False)
+        categories = json.loads((data_dir / f"{spec['file']}.json").read_text(encoding="utf-8"))
+        values = np.asarray(categories + [np.nan], dtype=object)
+        return values[codes]
+    if kind != "mixed":
+        raise ValueError(f"Unknown cached column kind {kind!r}")
+    texts = np.load(data_dir / f"{spec['file']}.text.npy", allow_pickle=False)
+    series = pd.Series(_decode_values(np.load(path, allow_pickle=False), texts), dtype=object)
+    try:
+        series = series.astype(spec["dtype"])
+    except (TypeError, ValueError):
+        pass
+    return series.array
+
+
+def _write_columns(frame: pd.DataFrame, data_dir: Path) -> tuple[List[dict], dict]:
+    specs: List[dict] = []
+    for pos, col in enumerate(frame.columns):
+        specs.append(dict(_write_values(frame[col], data_dir, f"{pos:03d}"), name=str(col)))
+    index = frame.index
+    if isinstance(index, pd.RangeIndex):
+        index_spec = {"kind": "range", "start": index.start, "stop": index.stop, "step": index.step}
+    else:
+        index_spec = _write_values(pd.Series(index), data_dir, "index")
+    return specs, index_spec
+
+
+def _read_columns(data_dir: Path, specs: List[dict], index_spec: dict) -> pd.DataFrame:
+    columns: Dict[str, object] = {spec["name"]: _read_values(data_dir, spec) for spec in specs}
+    if index_spec["kind"] == "range":
+        index = pd.RangeIndex(index_spec["start"], index_spec["stop"], index_spec["step"])
+    else:
+        index = pd.Index(_read_values(data_dir, index_spec))
+    frame = pd.DataFrame(columns, index=index)
+    return frame[[spec["name"] for spec in specs]]
+
+
+def _parquet_requested() -> bool:
+    if os.getenv("BIDTABS_CACHE_FORMAT", "").strip().lower() != "parquet":
+        return False
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.info("BIDTABS_CACHE_FORMAT=parquet requested but pyarrow is unavailable; using .npy columns.")
+        return False
+    return True
+
+
+def _write_frame(frame: pd.DataFrame, target: Path) -> dict:
+    """Write ``frame`` into the empty directory ``target`` and return its layout spec."""
+    if _parquet_requested():
+        try:
+            frame.to_parquet(target / "corpus.parquet", index=True)
+            return {"format": "parquet", "columns": [], "rows": int(len(frame))}
+        except Exception:  # pragma: no cover - mixed object columns
+            logger.debug("Parquet write failed; falling back to .npy columns", exc_info=True)
+    columns, index = _write_columns(frame, target)
+    return {"format": "npy", "columns": columns, "index": index, "rows": int(len(frame))}
+
+
+def _read_frame(target: Path, spec: dict) -> pd.DataFrame:
+    if spec.get("format") == "parquet":
+        return pd.read_parquet(target / "corpus.parquet")
+    return _read_columns(target, spec["columns"], spec["index"])
+
+
+def _publish_manifest(store: Path, manifest: dict) -> None:
+    tmp = store / f"{MANIFEST_NAME}.{uuid.uuid4().hex[:8]}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, store / MANIFEST_NAME)
+
+
+def write_store(store: Path, frame: pd.DataFrame, manifest: dict) -> None:
+    """Persist the prepared ``frame`` under ``store`` and atomically publish ``manifest``."""
+    store.mkdir(parents=True, exist_ok=True)
+    data_name = f"data-{uuid.uuid4().hex[:12]}"
+    data_dir = store / data_name
+    data_dir.mkdir()
+    try:
+        manifest = dict(manifest, snapshot=dict(_write_frame(frame, data_dir), data_dir=data_name))
+        _publish_manifest(store, manifest)
+    except Exception:
+        shutil.rmtree(data_dir, ignore_errors=True)
+        raise
+    for child in store.iterdir():
+        if child.is_dir() and child.name.startswith("data-") and child.name != data_name:
+            shutil.rmtree(child, ignore_errors=True)
+
+
+def read_manifest(store: Path) -> Optional[dict]:
+    path = store / MANIFEST_NAME
+    if not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != CACHE_VERSION:
+        return None
+    return manifest
+
+
+def read_store(store: Path, manifest: dict) -> pd.DataFrame:
+    snapshot = manifest["snapshot"]
+    return _read_frame(store / snapshot["data_dir"], snapshot)
+
+
+# ------------ Per-file partitions ------------
+
+def _part_dir(store: Path, sha256: str) -> Path:
+    key = hashlib.sha256(f"{PREPARATION_KEY}:{sha256}".encode("utf-8")).hexdigest()
+    return store / "parts" / key[:32]
+
+
+def _read_part(store: Path, sha256: str) -> Optional[pd.DataFrame]:
+    """Return the cached normalized rows for a source file, or ``None`` when absent."""
+    part = _part_dir(store, sha256)
+    try:
+        spec = json.loads((part / "part.json").read_text(encoding="utf-8"))
+        if not spec["rows"]:
+            return pd.DataFrame()
+        return _read_frame(part, spec)
+    except Exception:
+        return None
+
+
+def _write_part(store: Path, sha256: str, frame: pd.DataFrame) -> None:
+    part = _part_dir(store, sha256)
+    shutil.rmtree(part, ignore_errors=True)
+    part.mkdir(parents=True)
+    spec = _write_frame(frame, part) if not frame.empty else {"format": "npy", "columns": [], "rows": 0}
+    (part / "part.json").write_text(json.dumps(spec, indent=2), encoding="utf-8")
+
+
+def _prune_parts(store: Path, files: List[dict]) -> int:
+    keep = {_part_dir(store, entry["sha256"]).name for entry in files}
+    removed = 0
+    parts_root = store / "parts"
+    if parts_root.exists():
+        for child in parts_root.iterdir():
+            if child.name not in keep:
+                shutil.rmtree(child, ignore_errors=True)
+                removed += 1
+    return removed
+
+
+def _ingest_parts(
+    store: Path, folder: Path, files: List[dict], workers: int = 1
+) -> tuple[List[pd.DataFrame], int]:
+    """
+    Collect normalized rows for every source file, parsing only files whose
+    content hash has no stored partition yet.  Returns the frames in file
+    order and the number of files parsed.
+    """
+    parts: Dict[str, Optional[pd.DataFrame]] = {
+        entry["name"]: _read_part(store, entry["sha256"]) for entry in files
+    }
+    missing = [entry for entry in files if parts[entry["name"]] is None]
+    parsed = parse_bidtabs_files([folder / entry["name"] for entry in missing], workers)
+    for entry, dfs in zip(missing, parsed):
+        part = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+        parts[entry["name"]] = part
+        try:
+            _write_part(store, entry["sha256"], part)
+        except Exception:
+            logger.warning("Unable to persist BidTabs partition for %s", entry["name"], exc_info=True)
+
+    frames: List[pd.DataFrame] = []
+    for entry in files:
+        part = parts[entry["name"]]
+        entry["rows"] = int(len(part))
+        if not part.empty:
+            frames.append(part)
+    return frames, len(missing)
+
+
+# ------------ Public entry point ------------
+
+def load_prepared_bidtabs(
+    folder: str | Path,
+    region_map: pd.DataFrame | None = None,
+    *,
+    cache_dir: str | Path | None = None,
+    use_cache: bool = True,
+    workers: int = 1,
+) -> PreparedCorpus:
+    """
+    Return the prepared BidTabs corpus for ``folder``, using the on-disk cache when valid.
+
+    The prepared frame matches ``prepare_bidtabs(load_bidtabs_files(folder), region_map)``.
+    When the folder changed since the last run only added or modified files
+    are parsed; rows from deleted files are dropped and the prepared
+    snapshot is refreshed.  ``workers > 1`` parses workbooks in parallel.
+    """
+    folder = Path(folder)
+    region_key = region_map_key(region_map)
+
+    if not use_cache:
+        files = scan_source_files(folder)
+        frame = prepare_bidtabs(load_bidtabs_files(folder, workers), region_map)
+        return PreparedCorpus(
+            frame,
+            "disabled",
+            corpus_fingerprint(files, region_key),
+            None,
+            len(files),
+            parsed_files=len(files),
+            region_key=region_key,
+        )
+
+    store = _store_dir(Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR, folder)
+    manifest = read_manifest(store)
+    known = {entry["name"]: entry for entry in (manifest or {}).get("files", [])}
+    files = scan_source_files(folder, known)
+    if not files:
+        raise FileNotFoundError(f"No BidTabs files (.csv/.xls/.xlsx) found in {folder}")
+
+    fingerprint = corpus_fingerprint(files, region_key)
+    if manifest is not None:
+        if manifest.get("fingerprint") == fingerprint:
+            try:
+                frame = read_store(store, manifest)
+            except Exception:
+                logger.warning("BidTabs cache at %s is unreadable; rebuilding", store, exc_info=True)
+            else:
+                if any(f["mtime_ns"] != known[f["name"]]["mtime_ns"] for f in files):
+                    _refresh_manifest_stats(store, manifest, files)
+                return PreparedCorpus(
+                    frame, "hit", manifest["fingerprint"], store, len(files), region_key=region_key
+                )
+
+    store.mkdir(parents=True, exist_ok=True)
+    frames, parsed = _ingest_parts(store, folder, files, workers)
+    if not frames:
+        raise ValueError(f"Parsed 0 rows from files in {folder}")
+    frame = prepare_bidtabs(pd.concat(frames, ignore_index=True), region_map)
+    removed = len(set(known) - {entry["name"] for entry in files})
+
+    new_manifest = {
+        "version": CACHE_VERSION,
+        "folder": str(folder.resolve()),
+        "files": files,
+        "region_map": region_key,
+        "fingerprint": fingerprint,
+    }
+    try:
+        write_store(store, frame, new_manifest)
+        _prune_parts(store, files)
+    except Exception:
+        logger.warning("Unable to persist BidTabs cache at %s", store, exc_info=True)
+    status = "incremental" if manifest is not None else "built"
+    return PreparedCorpus(
+        frame,
+        status,
+        fingerprint,
+        store,
+        len(files),
+        parsed_files=parsed,
+        removed_files=removed,
+        region_key=region_key,
+    )
+
+
+# ------------ Derived snapshots ------------
+
+DERIVED_MANIFEST = "derived.json"
+
+
+def _derived_dir(corpus: PreparedCorpus, name: str) -> Optional[Path]:
+    if corpus.cache_path is None:
+        return None
+    return Path(corpus.cache_path) / "derived" / name
+
+
+def derived_key(corpus: PreparedCorpus, *parts: object) -> str:
+    """Key a derived snapshot by the corpus fingerprint and whatever else it depends on."""
+    payload = json.dumps([corpus.fingerprint, *[str(part) for part in parts]])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_derived_frame(corpus: PreparedCorpus, name: str, key: str) -> Optional[tuple[pd.DataFrame, dict]]:
+    """
+    Return ``(frame, info)`` for the derived snapshot ``name`` stored with ``key``.
+
+    Derived snapshots (for example the DM 23-21 remapped corpus) live next
+    to the prepared corpus they were built from, so they are only available
+    when the corpus came from the on-disk cache.
+    """
+    root = _derived_dir(corpus, name)
+    if root is None:
+        return None
+    try:
+        manifest = json.loads((root / DERIVED_MANIFEST).read_text(encoding="utf-8"))
+        if manifest.get("version") != CACHE_VERSION or manifest.get("key") != key:
+            return None
+        snapshot = manifest["snapshot"]
+        return _read_frame(root / snapshot["data_dir"], snapshot), dict(manifest.get("info") or {})
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.debug("Derived BidTabs snapshot %s is unreadable", root, exc_info=True)
+        return None
+
+
+def store_derived_frame(corpus: PreparedCorpus, name: str, key: str, frame: pd.DataFrame, **info: object) -> None:
+    """Persist ``frame`` as the derived snapshot ``name``, replacing any older one."""
+    root = _derived_dir(corpus, name)
+    if root is None or frame.empty:
+        return
+    data_name = f"data-{uuid.uuid4().hex[:12]}"
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        (root / data_name).mkdir()
+        manifest = {
+            "version": CACHE_VERSION,
+            "key": key,
+            "info": info,
+            "snapshot": dict(_write_frame(frame, root / data_name), data_dir=data_name),
+        }
+        tmp = root / f"{DERIVED_MANIFEST}.{uuid.uuid4().hex[:8]}.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp, root / DERIVED_MANIFEST)
+    except Exception:
+        shutil.rmtree(root / data_name, ignore_errors=True)
+        logger.warning("Unable to persist derived BidTabs snapshot at %s", root, exc_info=True)
+        return
+    for child in root.iterdir():
+        if child.is_dir() and child.name.startswith("data-") and child.name != data_name:
+            shutil.rmtree(child, ignore_errors=True)
+
+
+def _refresh_manifest_stats(store: Path, manifest: dict, files: List[dict]) -> None:
+    """Record new size/mtime for files whose content hash was unchanged (e.g. touched)."""
+    rows = {entry["name"]: entry.get("rows") for entry in manifest.get("files", [])}
+    updated = dict(manifest, files=[dict(entry, rows=rows.get(entry["name"])) for entry in files])
+    try:
+        _publish_manifest(store, updated)
+    except OSError:  # pragma: no cover - best effort
+        logger.debug("Unable to refresh BidTabs cache manifest", exc_info=True)
+
+
+__all__ = [
+    "DEFAULT_CACHE_DIR",
+    "PREPARATION_KEY",
+    "PreparedCorpus",
+    "corpus_fingerprint",
+    "derived_key",
+    "load_derived_frame",
+    "load_prepared_bidtabs",
+    "prepare_bidtabs",
+    "region_map_key",
+    "scan_source_files",
+    "store_derived_frame",
+]
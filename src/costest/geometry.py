@@ -6,6 +6,11 @@ Supported patterns:
 - Minimum area descriptors: "MIN AREA 8.5 SFT"
 
 All results are returned in square feet for downstream comparisons.
+
+:func:`parse_geometry` handles one description; :func:`geometry_codes` and
+:func:`geometry_frame` parse a whole BidTabs column by extracting each
+distinct description once with ``Series.str.extract`` and broadcasting the
+results back through integer codes.
 """
 
 from __future__ import annotations
@@ -13,7 +18,10 @@ from __future__ import annotations
 import math
 import re
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
 
 RECT_PATTERN = re.compile(
     r"(?P<a>\d+(?:\.\d+)?)\s*(?P<a_unit>FT|FEET|FOOT|F|'|IN|INCH|INCHES|\")?\s*[x\u00d7X]\s*(?P<b>\d+(?:\.\d+)?)\s*(?P<b_unit>FT|FEET|FOOT|F|'|IN|INCH|INCHES|\")?",
@@ -98,3 +106,101 @@ def parse_geometry(description: str) -> Optional[GeometryInfo]:
         return _parse_min_area(min_area_match, text)
 
     return None
+
+
+# ------------ Column-wise parsing ------------
+
+GEOMETRY_COLUMNS = ("GEOM_SHAPE", "GEOM_AREA_SQFT", "GEOM_DIMENSIONS")
+# Changes whenever the patterns (and therefore cached parse results) change.
+GEOMETRY_PARSER_KEY = "|".join(p.pattern for p in (RECT_PATTERN, CIRCLE_PATTERN, MIN_AREA_PATTERN))
+
+
+def _to_feet(values: pd.Series, units: pd.Series) -> pd.Series:
+    inches = units.fillna("").str.strip().str.upper().isin(_IN_UNITS)
+    return values.where(~inches, values / 12.0)
+
+
+def parse_geometry_table(descriptions: Iterable[object]) -> pd.DataFrame:
+    """
+    Parse ``descriptions`` like :func:`parse_geometry`, one row per input.
+
+    Returns ``GEOM_SHAPE``/``GEOM_AREA_SQFT``/``GEOM_DIMENSIONS`` columns with
+    ``None``/``NaN`` where no geometry was found.  Non-string entries have
+    no geometry.
+    """
+    text = pd.Series(list(descriptions), dtype=object)
+    text = text.where(text.map(lambda value: isinstance(value, str)), "").str.strip()
+    # Explicit object arrays keep ``None`` (a ``pd.Series(None, dtype=object)``
+    # filled through ``.loc`` turns the untouched rows into ``NaN``).
+    shape = np.full(len(text), None, dtype=object)
+    area = np.full(len(text), np.nan, dtype=float)
+    dims = np.full(len(text), None, dtype=object)
+
+    pending = pd.Series(True, index=text.index)
+    if len(text):
+        rect = text.str.extract(RECT_PATTERN)
+        hit = rect["a"].notna()
+        if hit.any():
+            found = rect.loc[hit]
+            a_ft = _to_feet(found["a"].astype(float), found["a_unit"])
+            b_ft = _to_feet(found["b"].astype(float), found["b_unit"])
+            mask = hit.to_numpy()
+            shape[mask] = "rectangle"
+            area[mask] = (a_ft * b_ft).to_numpy()
+            dims[mask] = [f"{a:.4g} ft x {b:.4g} ft" for a, b in zip(a_ft, b_ft)]
+        pending &= ~hit
+
+    if pending.any():
+        circle = text.loc[pending].str.extract(CIRCLE_PATTERN)
+        hit = circle["diameter"].notna().reindex(text.index, fill_value=False)
+        if hit.any():
+            found = circle.loc[hit[pending]]
+            diameter_ft = _to_feet(found["diameter"].astype(float), found["unit"])
+            radius_ft = diameter_ft / 2.0
+            mask = hit.to_numpy()
+            shape[mask] = "circle"
+            area[mask] = (math.pi * radius_ft * radius_ft).to_numpy()
+            dims[mask] = [f"diameter {d:.4g} ft" for d in diameter_ft]
+        pending &= ~hit
+
+    if pending.any():
+        min_area = text.loc[pending].str.extract(MIN_AREA_PATTERN)
+        hit = min_area["area"].notna().reindex(text.index, fill_value=False)
+        if hit.any():
+            mask = hit.to_numpy()
+            shape[mask] = "min_area"
+            area[mask] = min_area.loc[hit[pending], "area"].astype(float).to_numpy()
+
+    return pd.DataFrame({"GEOM_SHAPE": shape, "GEOM_AREA_SQFT": area, "GEOM_DIMENSIONS": dims})
+
+
+def _object_column(values: pd.Series) -> np.ndarray:
+    """Object values with missing entries as ``None`` (tables cached before this fix hold ``NaN``)."""
+    array = values.to_numpy(dtype=object)
+    return np.where(pd.isna(array), None, array)
+
+
+def geometry_codes(descriptions: pd.Series) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    Parse each distinct description once.
+
+    Returns ``(codes, table)``: ``table`` holds one row per distinct parsed
+    geometry and ``codes`` (``int32``, one per input row) points into it,
+    with ``-1`` for rows without geometry.
+    """
+    positions, uniques = pd.factorize(descriptions, sort=False)
+    parsed = parse_geometry_table(uniques)
+    found = parsed["GEOM_SHAPE"].notna().to_numpy()
+    lookup = np.full(len(uniques) + 1, -1, dtype=np.int32)
+    lookup[:-1][found] = np.arange(int(found.sum()), dtype=np.int32)
+    # factorize marks missing descriptions with -1, which hits the trailing slot.
+    return lookup[positions], parsed.loc[found].reset_index(drop=True)
+
+
+def geometry_frame(codes: np.ndarray, table: pd.DataFrame, index: pd.Index | None = None) -> pd.DataFrame:
+    """Broadcast a :func:`geometry_codes` table back to one ``GEOM_*`` row per code."""
+    codes = np.asarray(codes)
+    shape = np.append(_object_column(table["GEOM_SHAPE"]), None)[codes]
+    area = np.append(table["GEOM_AREA_SQFT"].to_numpy(dtype=float), np.nan)[codes]
+    dims = np.append(_object_column(table["GEOM_DIMENSIONS"]), None)[codes]
+    return pd.DataFrame({"GEOM_SHAPE": shape, "GEOM_AREA_SQFT": area, "GEOM_DIMENSIONS": dims}, index=index)
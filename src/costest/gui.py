@@ -3117,7 +3117,11 @@ class EstimatorApp:
         except Exception:
             env_overrides["MEMO_PRICE_MIN_CONFIDENCE"] = "0.70"
 
-        runtime_cfg = load_runtime_config(env_overrides, None)
+        try:
+            runtime_cfg = load_runtime_config(env_overrides, None)
+        except ValueError as exc:
+            self._queue.put(PipelineResult("error", str(exc)))
+            return
 
         try:
             with redirect_stdout(stdout_buffer), redirect_stderr(stderr_buffer):
@@ -6,6 +6,9 @@ from dataclasses import dataclass
 import csv
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 
 @dataclass(frozen=True)
 class CrosswalkRow:
@@ -59,6 +62,62 @@ def remap_item(old_item: str, xwalk: dict[str, CrosswalkRow]) -> tuple[str | Non
     return row.new_pay_item, meta
 
 
+DM2321_COLUMNS = (
+    "DM2321_MAPPING_RULE",
+    "DM2321_SOURCE_ITEM",
+    "DM2321_COURSE",
+    "DM2321_ESAL_CAT",
+    "DM2321_BINDER_CLASS",
+)
+
+
+def remap_frame(
+    frame: pd.DataFrame,
+    xwalk: dict[str, CrosswalkRow],
+    reverse_meta: dict[str, dict] | None = None,
+) -> tuple[pd.DataFrame, int]:
+    """Apply :func:`remap_item` to every ``ITEM_CODE`` of ``frame`` in one pass.
+
+    ``reverse_meta`` maps new pay items to their course/ESAL/binder metadata
+    so rows already carrying a new code are annotated too.  Deleted items are
+    dropped.  Returns ``(remapped, deleted_rows)``; the remapped frame has a
+    fresh ``RangeIndex`` and the ``DM2321_*`` columns, or is an empty slice of
+    ``frame`` when every row was deleted.
+    """
+    reverse_meta = reverse_meta or {}
+    codes = frame["ITEM_CODE"].astype(str).to_numpy(dtype=object)
+    positions, uniques = pd.factorize(codes, sort=False)
+
+    # Remap each distinct code once, then broadcast the results to the rows.
+    keep_code = np.ones(len(uniques), dtype=bool)
+    mapped = np.empty(len(uniques), dtype=object)
+    columns = {name: np.empty(len(uniques), dtype=object) for name in DM2321_COLUMNS}
+    for slot, item_code in enumerate(uniques):
+        new_code, meta = remap_item(item_code, xwalk)
+        if meta.get("deleted") and new_code is None:
+            keep_code[slot] = False
+            continue
+        mapped[slot] = new_code or item_code
+        reverse = reverse_meta.get(mapped[slot], {})
+        columns["DM2321_MAPPING_RULE"][slot] = meta.get("mapping_rule") or ("DM 23-21" if reverse else None)
+        columns["DM2321_SOURCE_ITEM"][slot] = meta.get("source_item") if meta.get("mapping_rule") else None
+        columns["DM2321_COURSE"][slot] = meta.get("course") or reverse.get("course")
+        columns["DM2321_ESAL_CAT"][slot] = meta.get("esal_cat") or reverse.get("esal_cat")
+        columns["DM2321_BINDER_CLASS"][slot] = meta.get("binder_class") or reverse.get("binder_class")
+
+    keep_rows = keep_code[positions]
+    deleted_rows = int(len(frame) - keep_rows.sum())
+    if not keep_rows.any():
+        return frame.iloc[0:0].copy(), deleted_rows
+    kept = positions[keep_rows]
+    remapped = frame.iloc[np.flatnonzero(keep_rows)].copy()
+    remapped.reset_index(drop=True, inplace=True)
+    remapped["ITEM_CODE"] = mapped[kept]
+    for name, values in columns.items():
+        remapped[name] = values[kept]
+    return remapped, deleted_rows
+
+
 DM2321_ADDERS_PER_TON = {"Base": 2.00, "Intermediate": 2.50, "Surface": 3.00}
 
 
@@ -1,5 +1,12 @@
+import copy
+import hashlib
+import logging
 import os
-from typing import List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -7,6 +14,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Aggregation method for category pricing. Supported:
 #  - WGT_AVG (default)
 #  - MEAN / AVG
@@ -26,6 +35,12 @@ QUANTITY_FILTER_MIN_POINTS = int(os.getenv('QUANTITY_FILTER_MIN_POINTS', '10'))
 PRIMARY_QUANTITY_BAND = (0.5, 1.5)
 EXPANDED_QUANTITY_BAND = (PRIMARY_QUANTITY_BAND[0], 2.0)
 
+
+# Capacity of the per-run category_breakdown memo (0 disables it).
+BREAKDOWN_MEMO_SIZE = int(os.getenv('BREAKDOWN_MEMO_SIZE', '4096'))
+# Changes whenever this module (and therefore any persisted pricing result) changes.
+PRICING_LOGIC_KEY = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
 # Optional experimental quantity elasticity adjustment
 ENABLE_QUANTITY_ELASTICITY = os.getenv('ENABLE_QUANTITY_ELASTICITY', '0').strip() in {'1', 'true', 'on', 'yes'}
 
@@ -38,8 +53,341 @@ CATEGORY_DEFS = [
     ('STATE_36M', 'STATE', 24, 36),
 ]
 
+# ``_MONTHS_AGO`` sentinels: bids let after ``as_of`` and bids without a letting date.
+FUTURE_LETTING_AGE = -1
+UNKNOWN_LETTING_AGE = -2
+# Sort key for missing letting dates in the per-item date index (after every real date).
+_NAT_SORT_KEY = np.iinfo(np.int64).max
+
+
+def resolve_as_of(value: object | None = None) -> pd.Timestamp:
+    """
+    Return the pinned pricing date: ``value``, else ``PRICING_AS_OF``, else today.
+
+    ``PRICING_AS_OF`` (YYYY-MM-DD) is read on every call, so a value set
+    after import takes effect.
+    """
+    raw = value if value is not None else (os.getenv('PRICING_AS_OF', '').strip() or None)
+    if raw is None:
+        return pd.Timestamp.today().normalize()
+    try:
+        return pd.Timestamp(raw).normalize()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid as-of date {raw!r}: expected a date in YYYY-MM-DD form") from None
+
+
+@lru_cache(maxsize=32)
+def _month_cutoffs(as_of: pd.Timestamp, span: int) -> np.ndarray:
+    """``as_of - DateOffset(months=k)`` for ``k = span .. 0`` (ascending dates)."""
+    return np.array(
+        [(as_of - pd.DateOffset(months=k)).to_datetime64() for k in range(span, -1, -1)],
+        dtype='datetime64[ns]',
+    )
+
+
+def months_before(let_dt: np.ndarray, as_of: pd.Timestamp) -> np.ndarray:
+    """
+    Whole-month age of each letting date relative to ``as_of``.
+
+    The age is the smallest ``k`` with ``let_dt >= as_of - DateOffset(months=k)``,
+    so ``age <= k`` is exactly the calendar test the category windows used to
+    run per call.  Dates after ``as_of`` get :data:`FUTURE_LETTING_AGE` and
+    missing dates :data:`UNKNOWN_LETTING_AGE`.
+    """
+    let_dt = np.asarray(let_dt, dtype='datetime64[ns]')
+    ages = np.full(let_dt.shape, UNKNOWN_LETTING_AGE, dtype=np.int64)
+    valid = ~np.isnat(let_dt)
+    if not valid.any():
+        return ages
+    dates = let_dt[valid]
+    oldest = pd.Timestamp(dates.min())
+    span = max(0, (as_of.year - oldest.year) * 12 + as_of.month - oldest.month) + 1
+    cutoffs = _month_cutoffs(as_of, span)
+    age = span + 1 - np.searchsorted(cutoffs, dates, side='right')
+    age[dates > as_of.to_datetime64()] = FUTURE_LETTING_AGE
+    ages[valid] = age
+    return ages
+
+
+def _window_mask(ages: np.ndarray, min_months: int | None, max_months: int | None) -> np.ndarray:
+    """Rows of a ``_MONTHS_AGO`` vector inside one ``CATEGORY_DEFS`` window."""
+    mask = ages != UNKNOWN_LETTING_AGE
+    if max_months is not None:
+        mask &= ages <= max_months
+    if min_months is not None:
+        mask &= (ages >= 0) if min_months == 0 else (ages > min_months)
+    if min_months == 0:
+        mask |= ages == UNKNOWN_LETTING_AGE
+    return mask
+
+
+# ``category_breakdown`` results: (price, source, cat_data) and, with details,
+# (price, source, cat_data, detail_map, used_categories, combined_detail).
+Breakdown = Tuple[float, str, Dict[str, object]]
+DetailedBreakdown = Tuple[float, str, Dict[str, object], Dict[str, pd.DataFrame], List[str], pd.DataFrame]
+
+
+def breakdown_settings() -> tuple:
+    """Aggregation knobs a :func:`category_breakdown` result depends on."""
+    return (
+        MODE,
+        CATEGORY_SIGMA_THRESHOLD,
+        MIN_SAMPLE_TARGET,
+        QUANTITY_FILTER_MIN_POINTS,
+        ENABLE_QUANTITY_ELASTICITY,
+    )
+
+
+class BreakdownMemo:
+    """
+    Bounded LRU of :func:`category_breakdown` results for one :class:`BidTabsIndex`.
+
+    Keys cover the item code, region, target quantity and the aggregation
+    knobs, so a result is only reused when it would be recomputed identically.
+    The exact target quantity is used rather than its quantity band: the
+    band's bounds scale with the target, so two quantities in one band can
+    keep different rows.  A result stored with details also answers the
+    plain request.  Callers get
+    fresh tuples/dicts; detail frames are shared and must not be mutated.
+    """
+
+    def __init__(self, maxsize: int = BREAKDOWN_MEMO_SIZE):
+        self.maxsize = max(0, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+
+    @staticmethod
+    def _key(item_code: str, region: int | None, target_quantity: float | None, include_details: bool) -> tuple:
+        target = None if target_quantity is None else float(target_quantity)
+        return (str(item_code), region, target, bool(include_details)) + breakdown_settings()
+
+    def get(
+        self,
+        item_code: str,
+        region: int | None,
+        target_quantity: float | None,
+        include_details: bool,
+    ) -> tuple | None:
+        if not self.maxsize:
+            return None
+        for details in ((True,) if include_details else (False, True)):
+            key = self._key(item_code, region, target_quantity, details)
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_breakdown(result if include_details else result[:3])
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        item_code: str,
+        region: int | None,
+        target_quantity: float | None,
+        include_details: bool,
+        result: tuple,
+    ) -> None:
+        if not self.maxsize:
+            return
+        key = self._key(item_code, region, target_quantity, include_details)
+        self._entries[key] = _copy_breakdown(result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def keys(self) -> set[tuple]:
+        return set(self._entries)
+
+    def entries_since(self, known: set[tuple]) -> dict[tuple, tuple]:
+        """Entries whose keys are not in ``known`` (a :meth:`keys` snapshot)."""
+        return {key: result for key, result in self._entries.items() if key not in known}
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+class BidTabsIndex:
+    """
+    ITEM_CODE-partitioned view of a BidTabs frame, built once per run.
+
+    Rows are stable-sorted by ITEM_CODE so every item pool is a contiguous
+    slice.  Original index labels are preserved (``_AUDIT_ROW_ID`` is
+    unchanged) and UNIT_PRICE/WEIGHT/JOB_SIZE/``_LET_DT`` are coerced up
+    front, so pools match what :func:`_prepare_pool` builds from a frame.
+
+    Each item slice also carries a letting-date ordering, so hiding bids let
+    after ``as_of`` is a binary search per item.  :meth:`at` re-anchors the
+    index to another date without touching the corpus.  ``memo`` caches
+    :func:`category_breakdown` results for the lifetime of the index;
+    ``result_store`` optionally backs it with a persistent cache (see
+    :mod:`costest.pricing_cache`).
+    """
+
+    def __init__(self, bidtabs: pd.DataFrame, as_of: object | None = None):
+        self.frame = bidtabs
+        self.as_of = resolve_as_of(as_of)
+        codes = bidtabs['ITEM_CODE'].astype(str).to_numpy(dtype=object)
+        order = np.argsort(codes, kind='stable')
+        ordered = bidtabs.iloc[order].copy()
+        for col in ('UNIT_PRICE', 'WEIGHT', 'JOB_SIZE'):
+            if col in ordered.columns:
+                ordered[col] = pd.to_numeric(ordered[col], errors='coerce')
+        if 'LETTING_DATE' in ordered.columns:
+            ordered['_LET_DT'] = pd.to_datetime(ordered['LETTING_DATE'], errors='coerce')
+        else:
+            ordered['_LET_DT'] = pd.NaT
+        self.sorted = ordered
+        self._order = order
+        self._let_dt = ordered['_LET_DT'].to_numpy(dtype='datetime64[ns]')
+
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1
+        starts = np.concatenate(([0], starts)) if len(sorted_codes) else starts
+        stops = np.append(starts[1:], len(sorted_codes)).astype(int)
+        self._spans = {
+            sorted_codes[start]: (int(start), int(stop)) for start, stop in zip(starts, stops)
+        }
+        if 'UNIT_PRICE' in ordered.columns:
+            self._price_missing = ordered['UNIT_PRICE'].isna().to_numpy()
+        else:
+            self._price_missing = None
+
+        date_keys = np.where(np.isnat(self._let_dt), _NAT_SORT_KEY, self._let_dt.view('i8'))
+        span_ids = np.repeat(np.arange(len(starts)), stops - starts)
+        self._date_order = np.lexsort((date_keys, span_ids))
+        self._date_keys = date_keys[self._date_order]
+        self._batch_columns: dict[str, np.ndarray | None] | None = None
+        self._visible_frame: pd.DataFrame | None = None
+        self.memo = BreakdownMemo()
+        self.result_store = None
+
+    def at(self, as_of: object | None) -> 'BidTabsIndex':
+        """Return a view of the same corpus priced as of ``as_of``."""
+        view = copy.copy(self)
+        view.as_of = resolve_as_of(as_of)
+        view._visible_frame = None
+        view.memo = BreakdownMemo(self.memo.maxsize)
+        return view
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.frame.columns
+
+    @property
+    def item_codes(self) -> list[str]:
+        return list(self._spans)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __contains__(self, item_code: object) -> bool:
+        return str(item_code) in self._spans
+
+    def span(self, item_code: str) -> tuple[int, int]:
+        return self._spans.get(str(item_code), (0, 0))
+
+    def visible_positions(self, item_code: str) -> np.ndarray:
+        """Positions of ``item_code`` rows let on or before ``as_of`` (or undated), in original order."""
+        start, stop = self.span(item_code)
+        keys = self._date_keys[start:stop]
+        cutoff = np.searchsorted(keys, self.as_of.to_datetime64().astype(np.int64), side='right')
+        undated = np.searchsorted(keys, _NAT_SORT_KEY, side='left')
+        if cutoff == undated:
+            return np.arange(start, stop)
+        order = self._date_order[start:stop]
+        return np.sort(np.concatenate((order[:cutoff], order[undated:])))
+
+    def visible_frame(self) -> pd.DataFrame:
+        """:attr:`frame` without the bids let after ``as_of``."""
+        if self._visible_frame is None:
+            future = self._let_dt > self.as_of.to_datetime64()
+            if future.any():
+                self._visible_frame = self.frame.iloc[np.sort(self._order[~future])]
+            else:
+                self._visible_frame = self.frame
+        return self._visible_frame
+
+    def months_ago(self, positions: np.ndarray) -> np.ndarray:
+        """``_MONTHS_AGO`` of the rows at ``positions`` relative to ``as_of``."""
+        return months_before(self._let_dt[positions], self.as_of)
+
+    def rows(self, item_code: str) -> pd.DataFrame:
+        """Rows for ``item_code`` in original order (coerced, no price filtering)."""
+        start, stop = self.span(item_code)
+        if start == stop:
+            return self.frame.iloc[0:0]
+        return self.sorted.iloc[self.visible_positions(item_code)]
+
+    def pool(self, item_code: str) -> pd.DataFrame:
+        """Equivalent of ``_prepare_pool(frame, item_code)`` as a per-item slice."""
+        start, stop = self.span(item_code)
+        if start == stop:
+            return self.frame.iloc[0:0].copy()
+        positions = self.pool_positions(item_code)
+        pool = self.sorted.iloc[positions].copy()
+        pool['_MONTHS_AGO'] = self.months_ago(positions)
+        return pool
+
+    def pool_positions(self, item_code: str) -> np.ndarray:
+        """Positions into :attr:`sorted` of the rows :meth:`pool` would return."""
+        positions = self.visible_positions(item_code)
+        if self._price_missing is not None:
+            positions = positions[~self._price_missing[positions]]
+        return positions
+
+    def detail_rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """Rows at ``positions`` of :attr:`sorted` tagged with ``_AUDIT_ROW_ID``."""
+        rows = self.sorted.iloc[positions].copy()
+        rows['_MONTHS_AGO'] = self.months_ago(positions)
+        rows['_AUDIT_ROW_ID'] = rows.index
+        return rows
+
+    def batch_ready(self) -> bool:
+        """Whether :func:`batch_category_breakdown` can use the array fast path."""
+        quantity = self.sorted.get('QUANTITY')
+        return (
+            'UNIT_PRICE' in self.sorted.columns
+            and self.sorted.index.is_unique
+            and (quantity is None or pd.api.types.is_numeric_dtype(quantity))
+        )
+
+    def batch_columns(self) -> dict[str, np.ndarray | None]:
+        """Numeric column arrays aligned with :attr:`sorted`, built on first use."""
+        if self._batch_columns is None:
+            ordered = self.sorted
+            self._batch_columns = {
+                'price': ordered['UNIT_PRICE'].to_numpy(dtype=float),
+                'weight': ordered['WEIGHT'].to_numpy(dtype=float) if 'WEIGHT' in ordered.columns else None,
+                'quantity': (
+                    ordered['QUANTITY'].to_numpy(dtype=float) if 'QUANTITY' in ordered.columns else None
+                ),
+                'let_dt': self._let_dt,
+            }
+        return self._batch_columns
+
+
+def bidtabs_frame(bidtabs: pd.DataFrame | BidTabsIndex) -> pd.DataFrame:
+    """Return the plain DataFrame behind ``bidtabs`` (a frame or :class:`BidTabsIndex`).
+
+    For an index this excludes bids let after its ``as_of`` date.
+    """
+    return bidtabs if isinstance(bidtabs, pd.DataFrame) else bidtabs.visible_frame()
+
+
+def _prepare_pool(
+    bidtabs: pd.DataFrame | BidTabsIndex,
+    item_code: str,
+    as_of: object | None = None,
+) -> pd.DataFrame:
+    """Coerced, priced rows of ``item_code`` let on or before ``as_of`` (see :func:`resolve_as_of`).
+
+    An index applies its own ``as_of``.
+    """
+    if not isinstance(bidtabs, pd.DataFrame):
+        return bidtabs.pool(item_code)
 
-def _prepare_pool(bidtabs: pd.DataFrame, item_code: str) -> pd.DataFrame:
     pool = bidtabs.loc[bidtabs['ITEM_CODE'].astype(str) == str(item_code)].copy()
     if pool.empty:
         return pool
@@ -58,18 +406,27 @@ def _prepare_pool(bidtabs: pd.DataFrame, item_code: str) -> pd.DataFrame:
         pool['_LET_DT'] = pd.to_datetime(pool['LETTING_DATE'], errors='coerce')
     else:
         pool['_LET_DT'] = pd.NaT
+    as_of = resolve_as_of(as_of)
+    ages = months_before(pool['_LET_DT'].to_numpy(dtype='datetime64[ns]'), as_of)
+    pool['_MONTHS_AGO'] = ages
+    future = ages == FUTURE_LETTING_AGE
+    if future.any():
+        logger.info(
+            "%s: ignoring %s bid(s) let after %s", item_code, int(future.sum()), as_of.date().isoformat()
+        )
+        pool = pool.loc[~future].copy()
 
     return pool
 
 
-def get_pool_for_codes(bidtabs: pd.DataFrame, codes: Sequence[str]) -> pd.DataFrame:
+def get_pool_for_codes(bidtabs: pd.DataFrame | BidTabsIndex, codes: Sequence[str]) -> pd.DataFrame:
     """
     Retrieve a combined BidTabs pool for a collection of item codes.
 
     Parameters
     ----------
     bidtabs:
-        Source BidTabs dataframe.
+        Source BidTabs dataframe or a prebuilt :class:`BidTabsIndex`.
     codes:
         Iterable of pay item codes to include.
 
@@ -97,10 +454,11 @@ def get_pool_for_codes(bidtabs: pd.DataFrame, codes: Sequence[str]) -> pd.DataFr
 
 
 def prepare_memo_rollup_pool(
-    bidtabs: pd.DataFrame,
+    bidtabs: pd.DataFrame | BidTabsIndex,
     codes: Sequence[str],
     project_region: Optional[int] = None,
     target_quantity: Optional[float] = None,
+    pool: Optional[pd.DataFrame] = None,
 ) -> pd.DataFrame:
     """
     Build a filtered pool for design memo rollups.
@@ -109,10 +467,14 @@ def prepare_memo_rollup_pool(
     - project region (if provided)
     - quantity banding relative to target quantity (0.5x - 1.5x)
     - ±2σ unit price trimming when enough observations exist
+
+    ``pool`` may carry a prior :func:`get_pool_for_codes` result for
+    ``codes`` so several target quantities can share one lookup.
     """
 
-    pool = get_pool_for_codes(bidtabs, codes)
+    pool = get_pool_for_codes(bidtabs, codes) if pool is None else pool
     if pool.empty:
+        pool = pool.copy()
         pool.attrs["quantity_filter_attempted_bounds"] = None
         pool.attrs["quantity_filter_applied"] = False
         pool.attrs["quantity_filter_relaxed"] = False
@@ -179,7 +541,7 @@ def prepare_memo_rollup_pool(
 
 
 def memo_rollup_price(
-    bidtabs: pd.DataFrame,
+    bidtabs: pd.DataFrame | BidTabsIndex,
     replacement_code: str,
     obsolete_codes: Sequence[str],
     project_region: Optional[int] = None,
@@ -197,6 +559,16 @@ def memo_rollup_price(
         project_region=project_region,
         target_quantity=target_quantity,
     )
+    return rollup_pool_price(pool, replacement_code, obsolete_codes)
+
+
+def rollup_pool_price(
+    pool: pd.DataFrame,
+    replacement_code: str,
+    obsolete_codes: Sequence[str],
+) -> tuple[float, int, str]:
+    """Price a :func:`prepare_memo_rollup_pool` result as :func:`memo_rollup_price` does."""
+
     if pool.empty:
         source_label = f"DESIGN_MEMO_ROLLUP:{replacement_code}"
         return float('nan'), 0, source_label
@@ -233,71 +605,78 @@ def _filter_window(
     if df.empty:
         return df.copy()
 
-    out = df.copy()
-    if '_LET_DT' not in out.columns:
-        out['_LET_DT'] = pd.to_datetime(out.get('LETTING_DATE'), errors='coerce')
-
-    dt = out['_LET_DT']
-    mask = pd.Series(False, index=out.index)
-    valid = dt.notna()
-
-    if valid.any():
-        criteria = pd.Series(True, index=dt.index[valid])
-        now = pd.Timestamp.today()
-        if max_months is not None:
-            lower_bound = now - pd.DateOffset(months=max_months)
-            criteria &= dt.loc[valid] >= lower_bound
-        if min_months is not None:
-            upper_bound = now - pd.DateOffset(months=min_months)
-            if min_months == 0:
-                criteria &= dt.loc[valid] <= upper_bound
-            else:
-                criteria &= dt.loc[valid] < upper_bound
-        mask.loc[valid] = criteria
+    if '_MONTHS_AGO' in df.columns:
+        ages = df['_MONTHS_AGO'].to_numpy()
+    else:
+        if '_LET_DT' in df.columns:
+            dt = df['_LET_DT']
+        elif 'LETTING_DATE' in df.columns:
+            dt = pd.to_datetime(df['LETTING_DATE'], errors='coerce')
+        else:
+            dt = pd.Series(pd.NaT, index=df.index)
+        ages = months_before(dt.to_numpy(dtype='datetime64[ns]'), resolve_as_of())
 
-    if min_months == 0:
-        mask |= dt.isna()
+    return df.loc[_window_mask(ages, min_months, max_months)]
 
-    return out.loc[mask].copy()
+
+def _sigma_keep_mask(prices: np.ndarray, threshold: float) -> np.ndarray | None:
+    """Mask of prices within ``threshold`` population standard deviations of the mean.
+
+    Mirrors ``Series.mean()`` / ``Series.std(ddof=0)`` so trimming matches the
+    pandas formulation bit for bit.  Returns ``None`` when the spread is zero.
+    """
+    count = float(prices.size)
+    mean = prices.sum(dtype=np.float64) / count
+    std = np.sqrt(((mean - prices) ** 2).sum(dtype=np.float64) / count)
+    if not std > 0:
+        return None
+    return (prices >= mean - threshold * std) & (prices <= mean + threshold * std)
+
+
+def _aggregate_values(prices: np.ndarray, weights: np.ndarray | None) -> float:
+    """Aggregate a price vector with ``MODE``; ``weights`` is ``None`` when unusable."""
+    if MODE == 'WGT_AVG' and weights is not None:
+        return float(np.average(prices, weights=weights))
+    if MODE in ('MEAN', 'AVG'):
+        return float(prices.sum(dtype=np.float64) / float(prices.size))
+    if MODE in ('P40_P60', 'TRIMMED_MEAN_P10_P90'):
+        series = pd.Series(prices)
+        if MODE == 'P40_P60':
+            return float((series.quantile(0.40) + series.quantile(0.60)) / 2)
+        trimmed = series.loc[series.between(series.quantile(0.10), series.quantile(0.90), inclusive='both')]
+        return float(trimmed.mean()) if not trimmed.empty else float(series.mean())
+    # MEDIAN / P50 / ROBUST_MEDIAN and unknown modes
+    return float(np.nanmedian(prices))
+
+
+def _usable_weights(weights: np.ndarray) -> np.ndarray | None:
+    if np.isnan(weights).all():
+        return None
+    return np.where(np.isnan(weights), 1.0, weights)
 
 
 def _aggregate_price(df: pd.DataFrame) -> tuple[float, int]:
     if df.empty:
         return np.nan, 0
 
-    if MODE == 'WGT_AVG' and 'WEIGHT' in df.columns and not df['WEIGHT'].isna().all():
-        weights = df['WEIGHT'].fillna(1.0).astype(float)
-        price = float(np.average(df['UNIT_PRICE'], weights=weights))
-    elif MODE in ('MEAN', 'AVG'):
-        price = float(df['UNIT_PRICE'].mean())
-    elif MODE in ('MEDIAN', 'P50'):
-        price = float(df['UNIT_PRICE'].median())
-    elif MODE == 'P40_P60':
-        p40 = df['UNIT_PRICE'].quantile(0.40)
-        p60 = df['UNIT_PRICE'].quantile(0.60)
-        price = float((p40 + p60) / 2)
-    elif MODE == 'TRIMMED_MEAN_P10_P90':
-        lower = df['UNIT_PRICE'].quantile(0.10)
-        upper = df['UNIT_PRICE'].quantile(0.90)
-        trimmed = df.loc[df['UNIT_PRICE'].between(lower, upper, inclusive='both')]
-        price = float(trimmed['UNIT_PRICE'].mean()) if not trimmed.empty else float(df['UNIT_PRICE'].mean())
-    elif MODE == 'ROBUST_MEDIAN':
-        price = float(df['UNIT_PRICE'].median())
-    else:
-        price = float(df['UNIT_PRICE'].median())
-
+    weights = None
+    if 'WEIGHT' in df.columns:
+        weights = _usable_weights(df['WEIGHT'].to_numpy(dtype=float))
+    price = _aggregate_values(df['UNIT_PRICE'].to_numpy(dtype=float), weights)
     return price, int(len(df))
 
 
 def _compute_categories(
-    bidtabs: pd.DataFrame,
+    bidtabs: pd.DataFrame | BidTabsIndex,
     item_code: str,
     project_region: int | None,
     collect_details: bool = False,
     target_quantity: float | None = None,
     quantity_band: tuple[float, float] | None = PRIMARY_QUANTITY_BAND,
+    pool: pd.DataFrame | None = None,
 ):
-    pool = _prepare_pool(bidtabs, item_code)
+    if pool is None:
+        pool = _prepare_pool(bidtabs, item_code)
 
     applied_quantity_band: tuple[float, float] | None = None
     if (
@@ -339,12 +718,10 @@ def _compute_categories(
             and cleaned['UNIT_PRICE'].notna().sum() >= 3
             and CATEGORY_SIGMA_THRESHOLD > 0
         ):
-            prices = cleaned['UNIT_PRICE'].astype(float)
-            mean = prices.mean()
-            std = prices.std(ddof=0)
-            if std > 0:
-                t = float(CATEGORY_SIGMA_THRESHOLD)
-                mask = (prices >= mean - t * std) & (prices <= mean + t * std)
+            mask = _sigma_keep_mask(
+                cleaned['UNIT_PRICE'].to_numpy(dtype=float), float(CATEGORY_SIGMA_THRESHOLD)
+            )
+            if mask is not None:
                 cleaned = cleaned.loc[mask]
 
         if cleaned.empty:
@@ -403,34 +780,67 @@ def _compute_categories(
     return final_price, source, results, detail_map, used_categories, combined_detail
 
 
-def pick_price(bidtabs: pd.DataFrame, item_code: str) -> tuple[float, str]:
+def pick_price(bidtabs: pd.DataFrame | BidTabsIndex, item_code: str) -> tuple[float, str]:
     price, source, *_ = _compute_categories(bidtabs, item_code, PROJECT_REGION)
     return price, source
 
 
-def category_breakdown(
-    bidtabs: pd.DataFrame,
-    item_code: str,
-    project_region: int | None = None,
-    include_details: bool = False,
-    target_quantity: float | None = None,
-) -> tuple[float, str, dict[str, object]] | tuple[float, str, dict[str, object], dict[str, pd.DataFrame], list[str], pd.DataFrame]:
-    """Compute category-based pricing statistics for ``item_code``.
+def _apply_quantity_elasticity(
+    price: float,
+    cat_data: dict[str, object],
+    combined_detail: pd.DataFrame,
+    target_quantity: float | None,
+) -> float:
+    """Optional quantity elasticity adjustment (experimental; disabled by default)."""
+    if not (ENABLE_QUANTITY_ELASTICITY and target_quantity and target_quantity > 0 and not combined_detail.empty):
+        return price
+    try:
+        sub = combined_detail.copy()
+        q = pd.to_numeric(sub.get('QUANTITY'), errors='coerce').dropna()
+        p = pd.to_numeric(sub.get('UNIT_PRICE'), errors='coerce').dropna()
+        joined = pd.DataFrame({'Q': q, 'P': p}).dropna()
+        if len(joined) >= 15 and joined['Q'].gt(0).all() and joined['P'].gt(0).all():
+            # log-log slope (elasticity)
+            x = np.log(joined['Q'].to_numpy())
+            y = np.log(joined['P'].to_numpy())
+            slope, intercept = np.polyfit(x, y, 1)
+            slope = float(np.clip(slope, -0.2, 0.2))
+            median_q = float(np.median(joined['Q']))
+            if median_q > 0 and np.isfinite(slope):
+                factor = (float(target_quantity) / median_q) ** slope
+                price = float(price) * float(np.clip(factor, 0.8, 1.2))
+                cat_data['QUANTITY_ELASTICITY_SLOPE'] = slope
+                cat_data['QUANTITY_ELASTICITY_APPLIED'] = True
+    except Exception:
+        cat_data['QUANTITY_ELASTICITY_APPLIED'] = False
+    return price
+
+
+def _band_widens(quantity: np.ndarray | None, target_quantity: float | None) -> bool:
+    """Whether ``EXPANDED_QUANTITY_BAND`` selects different bids than the primary band."""
+    if quantity is None or target_quantity is None or not target_quantity > 0:
+        return True
+    target = float(target_quantity)
+    primary = (quantity >= PRIMARY_QUANTITY_BAND[0] * target) & (quantity <= PRIMARY_QUANTITY_BAND[1] * target)
+    expanded = (quantity >= EXPANDED_QUANTITY_BAND[0] * target) & (quantity <= EXPANDED_QUANTITY_BAND[1] * target)
+    return bool((primary != expanded).any())
+
+
+def _finish_breakdown(
+    compute,
+    target_quantity: float | None,
+    include_details: bool,
+    quantity: np.ndarray | None = None,
+):
+    """Run the primary quantity band, widen it when thin, then apply elasticity.
 
-    The input dataframe must contain the canonical BidTabs columns such as
-    ``ITEM_CODE``, ``UNIT_PRICE``, and category aggregates (``DIST_*``/``STATE_*``).
-    When ``include_details`` is ``True`` the function returns the supplemental
-    detail map and combined pool dataframe used to derive pricing.
+    ``compute(quantity_band)`` returns the :func:`_compute_categories` tuple
+    for one item; both the per-item and batch engines share this cascade.
+    ``quantity`` holds the item's pool quantities; when the expanded band
+    would select exactly the same bids the primary result is kept rather
+    than recomputed.
     """
-    region = PROJECT_REGION if project_region is None else project_region
-    price, source, cat_data, detail_map, used_categories, combined_detail = _compute_categories(
-        bidtabs,
-        item_code,
-        region,
-        collect_details=include_details,
-        target_quantity=target_quantity,
-        quantity_band=PRIMARY_QUANTITY_BAND,
-    )
+    price, source, cat_data, detail_map, used_categories, combined_detail = compute(PRIMARY_QUANTITY_BAND)
 
     total_used_primary = int(cat_data.get("TOTAL_USED_COUNT", len(combined_detail)))
     lower_primary = cat_data.get("QUANTITY_FILTER_LOWER_MULTIPLIER")
@@ -444,14 +854,11 @@ def category_breakdown(
 
     if target_quantity is not None and target_quantity > 0:
         if total_used_primary < QUANTITY_FILTER_MIN_POINTS and has_primary_band:
-            price, source, cat_data, detail_map, used_categories, combined_detail = _compute_categories(
-                bidtabs,
-                item_code,
-                region,
-                collect_details=include_details,
-                target_quantity=target_quantity,
-                quantity_band=EXPANDED_QUANTITY_BAND,
-            )
+            if _band_widens(quantity, target_quantity):
+                price, source, cat_data, detail_map, used_categories, combined_detail = compute(EXPANDED_QUANTITY_BAND)
+            else:
+                cat_data["QUANTITY_FILTER_LOWER_MULTIPLIER"] = float(EXPANDED_QUANTITY_BAND[0])
+                cat_data["QUANTITY_FILTER_UPPER_MULTIPLIER"] = float(EXPANDED_QUANTITY_BAND[1])
             cat_data["QUANTITY_FILTER_BASE_COUNT"] = float(total_used_primary)
             cat_data["QUANTITY_FILTER_WAS_EXPANDED"] = True
         else:
@@ -461,33 +868,313 @@ def category_breakdown(
                 cat_data["QUANTITY_FILTER_LOWER_MULTIPLIER"] = np.nan
                 cat_data["QUANTITY_FILTER_UPPER_MULTIPLIER"] = np.nan
 
-    # Optional quantity elasticity adjustment (experimental; disabled by default)
-    if ENABLE_QUANTITY_ELASTICITY and target_quantity and target_quantity > 0 and not combined_detail.empty:
-        try:
-            sub = combined_detail.copy()
-            q = pd.to_numeric(sub.get('QUANTITY'), errors='coerce').dropna()
-            p = pd.to_numeric(sub.get('UNIT_PRICE'), errors='coerce').dropna()
-            joined = pd.DataFrame({'Q': q, 'P': p}).dropna()
-            if len(joined) >= 15 and joined['Q'].gt(0).all() and joined['P'].gt(0).all():
-                # log-log slope (elasticity)
-                x = np.log(joined['Q'].to_numpy())
-                y = np.log(joined['P'].to_numpy())
-                slope, intercept = np.polyfit(x, y, 1)
-                slope = float(np.clip(slope, -0.2, 0.2))
-                median_q = float(np.median(joined['Q']))
-                if median_q > 0 and np.isfinite(slope):
-                    factor = (float(target_quantity) / median_q) ** slope
-                    price = float(price) * float(np.clip(factor, 0.8, 1.2))
-                    cat_data['QUANTITY_ELASTICITY_SLOPE'] = slope
-                    cat_data['QUANTITY_ELASTICITY_APPLIED'] = True
-        except Exception:
-            cat_data['QUANTITY_ELASTICITY_APPLIED'] = False
+    price = _apply_quantity_elasticity(price, cat_data, combined_detail, target_quantity)
 
     if include_details:
         return price, source, cat_data, detail_map, used_categories, combined_detail
     return price, source, cat_data
 
 
+def category_breakdown(
+    bidtabs: pd.DataFrame | BidTabsIndex,
+    item_code: str,
+    project_region: int | None = None,
+    include_details: bool = False,
+    target_quantity: float | None = None,
+) -> Union[Breakdown, DetailedBreakdown]:
+    """Compute category-based pricing statistics for ``item_code``.
+
+    The input dataframe must contain the canonical BidTabs columns such as
+    ``ITEM_CODE``, ``UNIT_PRICE``, and category aggregates (``DIST_*``/``STATE_*``).
+    When ``include_details`` is ``True`` the function returns the supplemental
+    detail map and combined pool dataframe used to derive pricing.  Passing a
+    :class:`BidTabsIndex` avoids re-scanning the whole corpus per call and
+    serves repeated requests from its :class:`BreakdownMemo`.
+    """
+    region = PROJECT_REGION if project_region is None else project_region
+    indexed = not isinstance(bidtabs, pd.DataFrame)
+    if indexed:
+        cached = _cached_breakdown(bidtabs, item_code, region, target_quantity, include_details)
+        if cached is not None:
+            return cached
+    # Both quantity bands are cut from one prepared pool.
+    pool = _prepare_pool(bidtabs, item_code)
+    quantity = (
+        pd.to_numeric(pool['QUANTITY'], errors='coerce').to_numpy(dtype=float)
+        if 'QUANTITY' in pool.columns
+        else None
+    )
+    result = _finish_breakdown(
+        lambda band: _compute_categories(
+            bidtabs,
+            item_code,
+            region,
+            collect_details=include_details,
+            target_quantity=target_quantity,
+            quantity_band=band,
+            pool=pool,
+        ),
+        target_quantity,
+        include_details,
+        quantity,
+    )
+    if indexed:
+        _remember_breakdown(bidtabs, item_code, region, target_quantity, include_details, result)
+    return result
+
+
+def _cached_breakdown(
+    index: BidTabsIndex,
+    item_code: str,
+    region: int | None,
+    target_quantity: float | None,
+    include_details: bool,
+) -> tuple | None:
+    """Look ``item_code`` up in the run memo, then in the persistent result store."""
+    cached = index.memo.get(item_code, region, target_quantity, include_details)
+    if cached is None and index.result_store is not None:
+        cached = index.result_store.get(index, item_code, region, target_quantity, include_details)
+        if cached is not None:
+            index.memo.put(item_code, region, target_quantity, include_details, cached)
+    return cached
+
+
+def _remember_breakdown(
+    index: BidTabsIndex,
+    item_code: str,
+    region: int | None,
+    target_quantity: float | None,
+    include_details: bool,
+    result: tuple,
+) -> None:
+    index.memo.put(item_code, region, target_quantity, include_details, result)
+    if index.result_store is not None:
+        index.result_store.put(index, item_code, region, target_quantity, include_details, result)
+
+
+def merge_breakdowns(index: BidTabsIndex, entries: dict[tuple, tuple]) -> None:
+    """Add :meth:`BreakdownMemo.entries_since` results from a worker process to ``index``.
+
+    Entries go into the memo and the persistent result store, as if they had
+    been computed in this process.
+    """
+    for key, result in entries.items():
+        item_code, region, target_quantity, include_details = key[:4]
+        _remember_breakdown(index, item_code, region, target_quantity, include_details, result)
+
+
+# ------------ Batch engine ------------
+
+def _window_masks(ages: np.ndarray) -> list[np.ndarray]:
+    """One boolean mask per ``CATEGORY_DEFS`` window, matching :func:`_filter_window`."""
+    return [_window_mask(ages, min_months, max_months) for _, _, min_months, max_months in CATEGORY_DEFS]
+
+
+@dataclass
+class _BatchGroup:
+    """Arrays for one item's pool, sliced from the batch-wide gathered arrays."""
+
+    positions: np.ndarray
+    price: np.ndarray
+    weight: np.ndarray | None
+    quantity: np.ndarray | None
+    windows: list[np.ndarray]
+    region: np.ndarray
+
+
+def _batch_categories(
+    index: BidTabsIndex,
+    group: _BatchGroup,
+    region_scoped: bool,
+    collect_details: bool,
+    target_quantity: float | None,
+    quantity_band: tuple[float, float] | None,
+):
+    """Array counterpart of :func:`_compute_categories` for one pre-gathered pool."""
+    keep = np.ones(group.positions.size, dtype=bool)
+    applied_quantity_band: tuple[float, float] | None = None
+    if (
+        target_quantity is not None
+        and target_quantity > 0
+        and group.quantity is not None
+        and quantity_band is not None
+    ):
+        lower_multiplier, upper_multiplier = quantity_band
+        lower_q = lower_multiplier * float(target_quantity)
+        upper_q = upper_multiplier * float(target_quantity)
+        keep = (group.quantity >= lower_q) & (group.quantity <= upper_q)
+        applied_quantity_band = (lower_multiplier, upper_multiplier)
+
+    results: dict[str, float] = {}
+    selections: dict[str, np.ndarray] = {}
+    for (name, scope, _, _), window in zip(CATEGORY_DEFS, group.windows):
+        if scope == 'REGION' and not region_scoped:
+            selected = np.empty(0, dtype=np.intp)
+        else:
+            mask = keep & window
+            if scope == 'REGION':
+                mask &= group.region
+            selected = np.flatnonzero(mask)
+
+        if selected.size >= 3 and CATEGORY_SIGMA_THRESHOLD > 0:
+            trim = _sigma_keep_mask(group.price[selected], float(CATEGORY_SIGMA_THRESHOLD))
+            if trim is not None:
+                selected = selected[trim]
+
+        selections[name] = selected
+        if selected.size == 0:
+            results[f'{name}_PRICE'] = np.nan
+            results[f'{name}_COUNT'] = 0
+            continue
+        weights = _usable_weights(group.weight[selected]) if group.weight is not None else None
+        results[f'{name}_PRICE'] = _aggregate_values(group.price[selected], weights)
+        results[f'{name}_COUNT'] = int(selected.size)
+
+    used_categories: list[str] = []
+    combined: list[np.ndarray] = []
+    seen = np.zeros(group.positions.size, dtype=bool)
+    seen_count = 0
+    for name, _, _, _ in CATEGORY_DEFS:
+        selected = selections[name]
+        new_rows = selected[~seen[selected]]
+        if new_rows.size == 0:
+            continue
+        combined.append(new_rows)
+        used_categories.append(name)
+        seen[new_rows] = True
+        seen_count += int(new_rows.size)
+        if seen_count >= MIN_SAMPLE_TARGET:
+            break
+
+    if combined:
+        used = np.concatenate(combined)
+        weights = _usable_weights(group.weight[used]) if group.weight is not None else None
+        final_price = _aggregate_values(group.price[used], weights)
+        total_used = int(used.size)
+        source = used_categories[-1]
+    else:
+        used = np.empty(0, dtype=np.intp)
+        final_price = np.nan
+        source = 'NO_DATA'
+        total_used = 0
+
+    results['TOTAL_USED_COUNT'] = total_used
+    if applied_quantity_band is not None:
+        lower_mult, upper_mult = applied_quantity_band
+        results['QUANTITY_FILTER_LOWER_MULTIPLIER'] = float(lower_mult)
+        results['QUANTITY_FILTER_UPPER_MULTIPLIER'] = float(upper_mult)
+    elif target_quantity is not None:
+        results['QUANTITY_FILTER_LOWER_MULTIPLIER'] = np.nan
+        results['QUANTITY_FILTER_UPPER_MULTIPLIER'] = np.nan
+
+    detail_map: dict[str, pd.DataFrame] = {}
+    if collect_details:
+        for name, selected in selections.items():
+            detail_map[name] = index.detail_rows(group.positions[selected])
+    if used.size and (collect_details or ENABLE_QUANTITY_ELASTICITY):
+        combined_detail = index.detail_rows(group.positions[used])
+    else:
+        # Only read for its length (TOTAL_USED_COUNT is always present) and elasticity.
+        combined_detail = pd.DataFrame(columns=index.sorted.columns)
+
+    return final_price, source, results, detail_map, used_categories, combined_detail
+
+
+def batch_category_breakdown(
+    bidtabs: pd.DataFrame | BidTabsIndex,
+    requests: Sequence[tuple[str, float | None]],
+    project_region: int | None = None,
+    include_details: bool = False,
+) -> list[tuple]:
+    """Price many ``(item_code, target_quantity)`` requests in one pass.
+
+    Returns one :func:`category_breakdown` result per request, in order and
+    with identical values.  Pools for every distinct item are gathered from
+    the :class:`BidTabsIndex` at once, window/region/quantity masks are built
+    with vectorized passes over the gathered rows, and only the per-item
+    trimming, aggregation and ``MIN_SAMPLE_TARGET`` cascade run on small
+    array slices.  Requests already in the index's :class:`BreakdownMemo`
+    are served from it and new results are added to it.  Duplicate requests
+    share one computation but receive independent result objects.
+    """
+    index = bidtabs if not isinstance(bidtabs, pd.DataFrame) else BidTabsIndex(bidtabs)
+    region = PROJECT_REGION if project_region is None else project_region
+    keys = [(str(code), target) for code, target in requests]
+    unique_keys = list(dict.fromkeys(keys))
+
+    computed: dict[tuple, tuple] = {}
+    for code, target in unique_keys:
+        cached = _cached_breakdown(index, code, region, target, include_details)
+        if cached is not None:
+            computed[(code, target)] = cached
+    pending = [key for key in unique_keys if key not in computed]
+
+    batchable = index.batch_ready()
+    codes = list(dict.fromkeys(code for code, _ in pending if batchable and code in index))
+    groups: dict[str, _BatchGroup] = {}
+    region_scoped = region is not None and 'REGION' in index.sorted.columns
+    if codes:
+        spans = [index.pool_positions(code) for code in codes]
+        gathered = np.concatenate(spans)
+        columns = index.batch_columns()
+        windows = _window_masks(months_before(columns['let_dt'][gathered], index.as_of))
+        if region_scoped:
+            region_match = (index.sorted['REGION'].iloc[gathered] == region).to_numpy(dtype=bool)
+        else:
+            region_match = np.zeros(gathered.size, dtype=bool)
+        price = columns['price'][gathered]
+        weight = columns['weight'][gathered] if columns['weight'] is not None else None
+        quantity = columns['quantity'][gathered] if columns['quantity'] is not None else None
+        offset = 0
+        for code, positions in zip(codes, spans):
+            part = slice(offset, offset + positions.size)
+            offset += positions.size
+            groups[code] = _BatchGroup(
+                positions,
+                price[part],
+                weight[part] if weight is not None else None,
+                quantity[part] if quantity is not None else None,
+                [mask[part] for mask in windows],
+                region_match[part],
+            )
+
+    for code, target in pending:
+        group = groups.get(code)
+        if group is None:
+            computed[(code, target)] = category_breakdown(
+                index, code, project_region=region, include_details=include_details, target_quantity=target
+            )
+            continue
+        computed[(code, target)] = _finish_breakdown(
+            lambda band, group=group, target=target: _batch_categories(
+                index, group, region_scoped, include_details, target, band
+            ),
+            target,
+            include_details,
+            group.quantity,
+        )
+        _remember_breakdown(index, code, region, target, include_details, computed[(code, target)])
+
+    results: list[tuple] = []
+    handed_out: set[tuple] = set()
+    for code, target in keys:
+        result = computed[(code, target)]
+        if (code, target) in handed_out:
+            result = _copy_breakdown(result)
+        handed_out.add((code, target))
+        results.append(result)
+    return results
+
+
+def _copy_breakdown(result: tuple) -> tuple:
+    """Fresh containers for a breakdown tuple; detail frames are shared, not copied."""
+    price, source, cat_data, *details = result
+    if not details:
+        return price, source, dict(cat_data)
+    detail_map, used_categories, combined_detail = details
+    return price, source, dict(cat_data), dict(detail_map), list(used_categories), combined_detail
+
+
 def compute_recency_factor(estimate_df: pd.DataFrame) -> float:
     """
     Estimate a recency adjustment based on STATE window ratios.
@@ -0,0 +1,274 @@
+"""
+Persistent cross-run cache of category pricing results.
+
+Estimators re-run the same project many times while tweaking the expected
+contract cost or district, and most items end up priced from exactly the
+same BidTabs rows.  This module stores :func:`~costest.price_logic.category_breakdown`
+results in a small SQLite database next to the corpus cache so unchanged
+items in a re-run cost a key lookup.
+
+Entries are keyed by:
+
+- the corpus key (the prepared corpus fingerprint plus run-level remaps),
+- the item code and a hash of the row labels in the item's visible pool,
+  so contract-cost filtering only invalidates items whose pool changed,
+- the region, target quantity and details flag,
+- the aggregation settings, the pinned ``as_of`` date and
+  :data:`~costest.price_logic.PRICING_LOGIC_KEY`, so editing the pricing
+  code invalidates earlier results.
+
+Entries of other corpus keys are kept, so alternating between BidTabs
+snapshots or remaps does not throw results away; they simply stop being
+used and age out.  Detail frames are stored as row labels and rebuilt from
+the :class:`~costest.price_logic.BidTabsIndex`.  The store is bounded to
+``max_entries`` rows, evicting the least recently used entries first, and
+entries unused for ``max_age_days`` are dropped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .price_logic import PRICING_LOGIC_KEY, BidTabsIndex, breakdown_settings
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = BASE_DIR / "data_sample" / "cache" / "pricing"
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MAX_AGE_DAYS = 30.0
+CACHE_VERSION = 2
+DB_NAME = "pricing.sqlite3"
+
+
+def _json_default(value: object) -> object:
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Unsupported pricing cache value: {type(value).__name__}")
+
+
+def _labels(frame: pd.DataFrame) -> list:
+    if frame is None or frame.empty or "_AUDIT_ROW_ID" not in frame.columns:
+        return []
+    return frame["_AUDIT_ROW_ID"].tolist()
+
+
+class PricingCache:
+    """SQLite-backed store of category pricing results for one corpus key."""
+
+    def __init__(
+        self,
+        path: Path,
+        corpus_key: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.path = Path(path)
+        self.corpus_key = f"v{CACHE_VERSION}:{corpus_key}"
+        self.max_entries = max(1, int(max_entries))
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self._touched: Dict[str, float] = {}
+        self._pending: Dict[str, str] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, corpus TEXT NOT NULL, payload TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+    # ------------ Keys ------------
+
+    def _key(
+        self,
+        index: BidTabsIndex,
+        item_code: str,
+        region: int | None,
+        target_quantity: float | None,
+        include_details: bool,
+    ) -> Optional[str]:
+        if not index.sorted.index.is_unique:
+            return None
+        labels = index.sorted.index.to_numpy()[index.pool_positions(item_code)]
+        pool_hash = hashlib.blake2b(pd.util.hash_array(labels).tobytes(), digest_size=16).hexdigest()
+        payload = [
+            self.corpus_key,
+            PRICING_LOGIC_KEY,
+            str(item_code),
+            pool_hash,
+            None if region is None else int(region),
+            None if target_quantity is None else float(target_quantity),
+            bool(include_details),
+            index.as_of.date().isoformat(),
+            list(breakdown_settings()),
+        ]
+        return hashlib.sha256(json.dumps(payload, default=_json_default).encode("utf-8")).hexdigest()
+
+    # ------------ Lookup ------------
+
+    def _load(self, key: str) -> Optional[dict]:
+        text = self._pending.get(key)
+        if text is None:
+            row = self._conn.execute(
+                "SELECT payload FROM entries WHERE key = ? AND corpus = ?", (key, self.corpus_key)
+            ).fetchone()
+            if row is None:
+                return None
+            text = row[0]
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+    def get(
+        self,
+        index: BidTabsIndex,
+        item_code: str,
+        region: int | None,
+        target_quantity: float | None,
+        include_details: bool,
+    ) -> Optional[tuple]:
+        """Return the stored ``category_breakdown`` tuple, or ``None`` on a miss."""
+        for details in ((True,) if include_details else (False, True)):
+            key = self._key(index, item_code, region, target_quantity, details)
+            if key is None:
+                return None
+            entry = self._load(key)
+            if entry is None:
+                continue
+            self.hits += 1
+            self._touched[key] = time.time()
+            return self._rebuild(index, entry, include_details)
+        self.misses += 1
+        return None
+
+    def _rebuild(self, index: BidTabsIndex, entry: dict, include_details: bool) -> tuple:
+        price = entry["price"]
+        price = float("nan") if price is None else float(price)
+        cat_data = dict(entry["cat_data"])
+        if not include_details:
+            return price, entry["source"], cat_data
+
+        def rows(labels: list) -> pd.DataFrame:
+            positions = index.sorted.index.get_indexer(pd.Index(labels, dtype=index.sorted.index.dtype))
+            return index.detail_rows(positions)
+
+        detail_map = {name: rows(labels) for name, labels in entry["details"].items()}
+        return price, entry["source"], cat_data, detail_map, list(entry["used_categories"]), rows(entry["combined"])
+
+    # ------------ Storage ------------
+
+    def put(
+        self,
+        index: BidTabsIndex,
+        item_code: str,
+        region: int | None,
+        target_quantity: float | None,
+        include_details: bool,
+        result: tuple,
+    ) -> None:
+        key = self._key(index, item_code, region, target_quantity, include_details)
+        if key is None:
+            return
+        price, source, cat_data, *details = result
+        entry: dict = {
+            "price": None if pd.isna(price) else float(price),
+            "source": source,
+            "cat_data": cat_data,
+        }
+        if include_details:
+            detail_map, used_categories, combined_detail = details
+            entry["details"] = {name: _labels(frame) for name, frame in detail_map.items()}
+            entry["used_categories"] = list(used_categories)
+            entry["combined"] = _labels(combined_detail)
+        try:
+            self._pending[key] = json.dumps(entry, default=_json_default)
+        except TypeError:
+            logger.debug("Skipping unserializable pricing result for %s", item_code, exc_info=True)
+            return
+        self._touched[key] = time.time()
+        self.stored += 1
+
+    def flush(self) -> None:
+        """Write pending entries, refresh access times and evict stale or surplus entries."""
+        now = time.time()
+        rows = [(key, self.corpus_key, text, self._touched.get(key, now)) for key, text in self._pending.items()]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, corpus, payload, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(stamp, key) for key, stamp in self._touched.items() if key not in self._pending],
+            )
+            if self.max_age_days is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM entries WHERE last_used < ?", (now - self.max_age_days * 86400.0,)
+                )
+                self.evicted += int(cursor.rowcount or 0)
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self.evicted += int(cursor.rowcount or 0)
+        self._pending.clear()
+        self._touched.clear()
+
+    def close(self) -> None:
+        """Close the database; call :meth:`flush` first to keep this run's results."""
+        self._conn.close()
+
+    def stats(self) -> Dict[str, object]:
+        size = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "evicted": self.evicted,
+            "entries": int(size),
+            "max_entries": self.max_entries,
+        }
+
+
+def corpus_key(fingerprint: str, *parts: object) -> str:
+    """Combine the corpus fingerprint with run-level remaps that change item pools."""
+    payload = json.dumps([fingerprint, *[str(part) for part in parts]])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def open_pricing_cache(
+    corpus_key: str,
+    cache_dir: str | Path | None = None,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+) -> Optional[PricingCache]:
+    """Open the pricing cache for ``corpus_key``; returns ``None`` when it cannot be used."""
+    path = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+    try:
+        return PricingCache(path / DB_NAME, corpus_key, max_entries)
+    except (OSError, sqlite3.Error):
+        logger.warning("Pricing cache at %s is unavailable; pricing without it", path, exc_info=True)
+        return None
+
+
+__all__ = [
+    "DEFAULT_CACHE_DIR",
+    "PricingCache",
+    "corpus_key",
+    "open_pricing_cache",
+]
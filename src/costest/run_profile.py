@@ -0,0 +1,315 @@
+"""
+Per-stage timing and memory instrumentation for estimator runs.
+
+:class:`RunProfiler` turns the numbered ``[pipeline:NN]`` stages of
+:func:`costest.cli.run` into timed spans.  Each span records wall time, CPU
+time, the process peak RSS when it closed, optional ``tracemalloc``
+allocation figures and any row counts noted while it was open; nested
+sub-spans (for example the batch pricing pass) hang off the current stage.
+Per-item pricing latency is kept as a histogram plus the slowest items with
+the path that priced them; the caller folds each item's share of batched
+work (category pricing, prefetched alternate seeks) into its time.  :meth:`RunProfiler.as_dict` is written into
+``run_metadata.json`` under ``profile``.
+
+:func:`profile_call` is the heavier ``--profile`` mode: it runs the whole
+pipeline under :mod:`cProfile` and writes a ``.pstats`` file plus collapsed
+stacks for flamegraph tools.
+"""
+
+from __future__ import annotations
+
+import bisect
+import cProfile
+import heapq
+import io
+import logging
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+
+try:  # pragma: no cover - platform dependent
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upper bucket edges (milliseconds) of the per-item latency histogram.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+DEFAULT_SLOWEST_ITEMS = 10
+PSTATS_NAME = "run_profile.pstats"
+COLLAPSED_NAME = "run_profile.collapsed.txt"
+PROFILE_SUMMARY_ROWS = 20
+
+_MB = 1024.0 * 1024.0
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (``None`` when unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere.
+    return round(peak / (_MB if sys.platform == "darwin" else 1024.0), 1)
+
+
+class Span:
+    """One timed section of a run."""
+
+    def __init__(self, name: str, trace_memory: bool):
+        self.name = name
+        self.children: List[Span] = []
+        self.counts: Dict[str, int] = {}
+        self.wall_seconds: Optional[float] = None
+        self.cpu_seconds: Optional[float] = None
+        self.peak_rss_mb: Optional[float] = None
+        self.alloc_delta_mb: Optional[float] = None
+        self.alloc_peak_mb: Optional[float] = None
+        self._trace_memory = trace_memory and tracemalloc.is_tracing()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._traced = tracemalloc.get_traced_memory()[0] if self._trace_memory else 0
+
+    @property
+    def closed(self) -> bool:
+        return self.wall_seconds is not None
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.process_time() - self._cpu
+        self.peak_rss_mb = peak_rss_mb()
+        if self._trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.alloc_delta_mb = round((current - self._traced) / _MB, 3)
+            self.alloc_peak_mb = round(peak / _MB, 3)
+
+    def as_dict(self) -> Dict[str, object]:
+        payload: Dict[str, object] = {
+            "name": self.name,
+            "wall_seconds": None if self.wall_seconds is None else round(self.wall_seconds, 4),
+            "cpu_seconds": None if self.cpu_seconds is None else round(self.cpu_seconds, 4),
+            "peak_rss_mb": self.peak_rss_mb,
+        }
+        if self.alloc_delta_mb is not None:
+            payload["alloc_delta_mb"] = self.alloc_delta_mb
+            payload["alloc_peak_mb"] = self.alloc_peak_mb
+        if self.counts:
+            payload["counts"] = dict(self.counts)
+        if self.children:
+            payload["children"] = [child.as_dict() for child in self.children]
+        return payload
+
+
+class RunProfiler:
+    """
+    Collects the span tree and item latencies of one estimator run.
+
+    With ``trace_memory`` the profiler starts :mod:`tracemalloc` (if it is not
+    already tracing) and each top-level stage resets the traced peak, so
+    ``alloc_peak_mb`` is the stage's own high-water mark.  Tracing slows the
+    run noticeably and is off by default.
+    """
+
+    def __init__(self, trace_memory: bool = False, slowest_items: int = DEFAULT_SLOWEST_ITEMS):
+        self.trace_memory = bool(trace_memory)
+        self.slowest_items = max(0, int(slowest_items))
+        self._started_tracing = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.root = Span("run", self.trace_memory)
+        self._stack: List[Span] = [self.root]
+        self._histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._item_count = 0
+        self._item_seconds = 0.0
+        self._slowest: List[tuple] = []
+
+    # ------------ Spans ------------
+
+    def stage(self, name: str) -> Span:
+        """Close the current top-level stage (and its open children) and start ``name``."""
+        while len(self._stack) > 1:
+            self._stack.pop().close()
+        if self.trace_memory and tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        span = Span(name, self.trace_memory)
+        self.root.children.append(span)
+        self._stack.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        """Time a sub-section of the current stage."""
+        span = Span(name, self.trace_memory)
+        self._stack[-1].children.append(span)
+        self._stack.append(span)
+        try:
+            yield span
+        finally:
+            span.close()
+            if self._stack[-1] is span:
+                self._stack.pop()
+
+    def count(self, **counts: int) -> None:
+        """Attach row counts to the innermost open span."""
+        self._stack[-1].counts.update({key: int(value) for key, value in counts.items()})
+
+    # ------------ Items ------------
+
+    def record_item(self, item_code: str, seconds: float, path: str) -> None:
+        """Record how long ``item_code`` took to price and which path priced it."""
+        self._item_count += 1
+        self._item_seconds += seconds
+        self._histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000.0)] += 1
+        if not self.slowest_items:
+            return
+        entry = (seconds, self._item_count, item_code, path)
+        if len(self._slowest) < self.slowest_items:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    # ------------ Output ------------
+
+    def finish(self) -> None:
+        """Close every open span and stop ``tracemalloc`` if this profiler started it."""
+        while self._stack:
+            self._stack.pop().close()
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def item_latency(self) -> Dict[str, object]:
+        edges = [f"<={edge}ms" for edge in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "items": self._item_count,
+            "total_seconds": round(self._item_seconds, 4),
+            "histogram": {edge: count for edge, count in zip(edges, self._histogram)},
+            "slowest": [
+                {"item_code": code, "seconds": round(seconds, 4), "path": path}
+                for seconds, _, code, path in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+    def as_dict(self) -> Dict[str, object]:
+        payload = self.root.as_dict()
+        payload["memory_tracing"] = self.trace_memory
+        payload["item_latency"] = self.item_latency()
+        return payload
+
+
+# ------------ cProfile ------------
+
+
+def _frame_label(func: tuple) -> str:
+    filename, lineno, name = func
+    if filename == "~":  # built-in
+        label = name
+    else:
+        label = f"{os.path.basename(filename)}:{lineno}({name})"
+    return label.replace(";", ":").replace(" ", "_")
+
+
+def collapsed_stacks(stats: pstats.Stats, min_microseconds: int = 1) -> Dict[str, int]:
+    """
+    Reconstruct ``frame;frame;frame -> microseconds`` stacks from ``stats``.
+
+    cProfile only keeps caller/callee edges, so a callee's time is split
+    across call paths in proportion to the cumulative time each caller edge
+    recorded.  Recursive calls are folded into the first occurrence.
+    """
+    raw = stats.stats  # type: ignore[attr-defined]
+    callees: Dict[tuple, List[tuple]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+    roots = [func for func, entry in raw.items() if not entry[4]]
+
+    folded: Dict[str, int] = {}
+    min_seconds = min_microseconds / 1_000_000.0
+
+    def walk(func: tuple, stack: List[str], on_stack: set, scale: float) -> None:
+        _, _, own_seconds, cumulative, _ = raw[func]
+        stack.append(_frame_label(func))
+        on_stack.add(func)
+        own = int(round(own_seconds * scale * 1_000_000))
+        if own >= min_microseconds:
+            key = ";".join(stack)
+            folded[key] = folded.get(key, 0) + own
+        for child in callees.get(func, ()):
+            if child in on_stack:
+                continue
+            child_cumulative = raw[child][3]
+            edge_cumulative = raw[child][4][func][3]
+            if child_cumulative <= 0 or edge_cumulative * scale < min_seconds:
+                continue
+            walk(child, stack, on_stack, scale * edge_cumulative / child_cumulative)
+        on_stack.discard(func)
+        stack.pop()
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 10_000))
+    try:
+        for root in roots:
+            walk(root, [], set(), 1.0)
+    finally:
+        sys.setrecursionlimit(limit)
+    return folded
+
+
+def profile_call(output_dir: Path, func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run ``func`` under :mod:`cProfile` and write the profile next to the outputs.
+
+    Writes ``run_profile.pstats`` (for ``pstats``/snakeviz) and
+    ``run_profile.collapsed.txt`` (collapsed stacks for flamegraph.pl or
+    speedscope) to ``output_dir`` and logs the top functions by cumulative
+    time.  The profile is written even when ``func`` raises.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        try:
+            _write_profile(profiler, Path(output_dir))
+        except Exception:  # pragma: no cover - defensive
+            logger.warning("Unable to write cProfile output to %s", output_dir, exc_info=True)
+
+
+def _write_profile(profiler: cProfile.Profile, output_dir: Path) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pstats_path = output_dir / PSTATS_NAME
+    collapsed_path = output_dir / COLLAPSED_NAME
+    profiler.dump_stats(str(pstats_path))
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    folded = collapsed_stacks(stats)
+    with open(collapsed_path, "w", encoding="utf-8") as fh:
+        for stack, microseconds in sorted(folded.items()):
+            fh.write(f"{stack} {microseconds}\n")
+
+    stats.sort_stats("cumulative").print_stats(PROFILE_SUMMARY_ROWS)
+    logger.info("[profile] top %s functions by cumulative time:\n%s", PROFILE_SUMMARY_ROWS, stream.getvalue().rstrip())
+    logger.info("[profile] wrote %s and %s", pstats_path, collapsed_path)
+
+
+__all__ = [
+    "COLLAPSED_NAME",
+    "LATENCY_BUCKETS_MS",
+    "PSTATS_NAME",
+    "RunProfiler",
+    "Span",
+    "collapsed_stacks",
+    "peak_rss_mb",
+    "profile_call",
+]
@@ -0,0 +1,408 @@
+"""
+Long-running local estimator service that keeps the BidTabs corpus hot.
+
+``costest serve`` loads, indexes and geometry-augments the prepared BidTabs
+corpus and primes the reference-data caches once at startup, then answers
+estimate requests over HTTP (TCP or a Unix socket) using the standard
+library only.  Every request runs the regular pipeline
+(:func:`costest.cli.run`) against the shared corpus in a scratch folder and
+returns the rows of its ``Estimate_Audit.csv``.
+
+Endpoints:
+
+``GET /health``
+    Service status: corpus fingerprint and rows, load time, queue usage.
+``POST /estimate``
+    Either a JSON object ``{"quantities": [{"ITEM_CODE": ..., "DESCRIPTION": ...,
+    "UNIT": ..., "QUANTITY": ...}, ...], "expected_cost": ..., "district": ...,
+    "as_of": ...}`` or a raw quantities ``.xlsx`` body with the same options as
+    query parameters.  Responds with ``{"columns": [...], "rows": [[...], ...]}``,
+    or CSV text with ``?format=csv``.
+``POST /reload``
+    Re-read the BidTabs corpus (after ``scripts/ingest_bidtabs.py``) and the
+    reference datasets; requests already running finish on the old corpus.
+
+Requests run in a bounded worker pool; at most ``queue_size`` further
+requests wait for a worker and any beyond that get ``503``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from . import cli, reference_data
+from .batch import BatchCorpora
+from .bidtabs_io import QuantitiesColumnError
+from .config import Config, parse_as_of
+from .config import load_config as load_runtime_config
+from .corpus_cache import PreparedCorpus
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 8
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+
+class ServiceBusy(RuntimeError):
+    """Raised when every worker is busy and the request queue is full."""
+
+
+class EstimateRequestError(ValueError):
+    """Raised for malformed estimate requests."""
+
+
+class EstimatorService:
+    """Prices estimate requests against one preloaded BidTabs corpus."""
+
+    def __init__(
+        self,
+        runtime_cfg: Config,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        work_dir: Path | None = None,
+    ):
+        # Requests already run in parallel threads; forking alternate-seek
+        # workers from a threaded server is unsafe, so price each one serially.
+        # cProfile cannot profile concurrent requests either.
+        self.runtime_cfg = replace(runtime_cfg, pricing_workers=1, profile_run=False)
+        self.workers = max(1, int(workers))
+        self.queue_size = max(0, int(queue_size))
+        self.work_dir = Path(work_dir) if work_dir else Path(tempfile.gettempdir()) / "costest-serve"
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="costest-serve")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._corpus_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._corpora: Optional[BatchCorpora] = None
+        self._corpus: Optional[PreparedCorpus] = None
+        self._loaded_at: Optional[float] = None
+        self._in_flight = 0
+        self.served = 0
+        self.failed = 0
+
+    # ------------ Corpus ------------
+
+    def load(self) -> Dict[str, object]:
+        """(Re)load reference data and the BidTabs corpus; returns :meth:`status`."""
+        with self._reload_lock:
+            started = time.perf_counter()
+            for loader in (
+                reference_data.load_payitem_catalog,
+                reference_data.load_unit_price_summary,
+                reference_data.load_spec_sections,
+            ):
+                loader.cache_clear()
+                loader()
+            corpora = BatchCorpora(self.runtime_cfg)
+            corpus = corpora()
+            with self._corpus_lock:
+                self._corpora = corpora
+                self._corpus = corpus
+                self._loaded_at = time.time()
+            logger.info(
+                "[serve] corpus %s loaded (%s rows, %s) in %.1fs",
+                corpus.fingerprint[:12],
+                f"{len(corpus.frame):,}",
+                corpus.status,
+                time.perf_counter() - started,
+            )
+        return self.status()
+
+    def status(self) -> Dict[str, object]:
+        with self._corpus_lock:
+            corpus = self._corpus
+            loaded_at = self._loaded_at
+            in_flight = self._in_flight
+        return {
+            "status": "ready" if corpus is not None else "loading",
+            "corpus_fingerprint": corpus.fingerprint if corpus is not None else None,
+            "corpus_rows": len(corpus.frame) if corpus is not None else 0,
+            "loaded_at": loaded_at,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": in_flight,
+            "served": self.served,
+            "failed": self.failed,
+        }
+
+    # ------------ Requests ------------
+
+    def estimate(self, quantities: pd.DataFrame | bytes, options: Mapping[str, object]) -> pd.DataFrame:
+        """
+        Price ``quantities`` (a frame of rows or raw ``.xlsx`` bytes).
+
+        ``options`` may carry ``expected_cost``, ``district``, ``region`` and
+        ``as_of``.  Returns the ``Estimate_Audit.csv`` rows; raises
+        :class:`ServiceBusy` when the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusy("All estimator workers are busy; retry shortly")
+        with self._corpus_lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(self._estimate, quantities, dict(options)).result()
+        finally:
+            with self._corpus_lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _request_config(self, options: Mapping[str, object], folder: Path, quantities_path: Path) -> Config:
+        cfg = replace(
+            self.runtime_cfg,
+            quantities_path=quantities_path,
+            output_dir=folder,
+            output_xlsx=folder / "Estimate_Draft.xlsx",
+            output_audit=folder / "Estimate_Audit.csv",
+            output_payitem_audit=folder / "PayItems_Audit.xlsx",
+        )
+        try:
+            expected_cost = options.get("expected_cost")
+            region = options.get("region")
+            overrides = {
+                "expected_contract_cost": None if expected_cost in (None, "") else float(expected_cost),
+                "project_district": str(options.get("district") or "").strip() or None,
+                "project_region": None if region in (None, "") else int(region),
+            }
+            as_of = parse_as_of(options.get("as_of"), "as_of")
+        except (TypeError, ValueError) as exc:
+            raise EstimateRequestError(f"Invalid estimate option: {exc}") from exc
+        if any(value is not None for value in overrides.values()):
+            cfg = replace(cfg, **overrides)
+        if as_of:
+            cfg = replace(cfg, pricing_as_of=as_of)
+        return cfg
+
+    def _estimate(self, quantities: pd.DataFrame | bytes, options: Mapping[str, object]) -> pd.DataFrame:
+        with self._corpus_lock:
+            corpora = self._corpora
+        if corpora is None:
+            raise ServiceBusy("BidTabs corpus is still loading")
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            with tempfile.TemporaryDirectory(dir=self.work_dir) as tmp:
+                folder = Path(tmp)
+                quantities_path = folder / "request_project_quantities.xlsx"
+                if isinstance(quantities, bytes):
+                    quantities_path.write_bytes(quantities)
+                else:
+                    quantities.to_excel(quantities_path, index=False, engine="openpyxl")
+                cfg = self._request_config(options, folder, quantities_path)
+                try:
+                    rc = cli.run(runtime_config=cfg, corpus=corpora)
+                except QuantitiesColumnError as exc:
+                    raise EstimateRequestError(exc.args[0]) from exc
+                if rc != 0:
+                    raise RuntimeError(f"Estimator run failed with code {rc}")
+                audit = pd.read_csv(cfg.output_audit)
+        except Exception:
+            with self._corpus_lock:
+                self.failed += 1
+            raise
+        with self._corpus_lock:
+            self.served += 1
+        return audit
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def _quantities_from_json(payload: object) -> tuple[pd.DataFrame, Dict[str, object]]:
+    if not isinstance(payload, dict):
+        raise EstimateRequestError("Estimate body must be a JSON object")
+    rows = payload.get("quantities")
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+        raise EstimateRequestError("'quantities' must be a non-empty list of objects")
+    options = {key: value for key, value in payload.items() if key != "quantities"}
+    return pd.DataFrame(rows), options
+
+
+class EstimatorRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for :class:`EstimatorService`."""
+
+    server_version = "costest-serve"
+
+    @property
+    def service(self) -> EstimatorService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - BaseHTTPRequestHandler signature
+        logger.debug("[serve] " + format, *args)
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: HTTPStatus, payload: object) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            raise EstimateRequestError("Request body is empty")
+        if length > MAX_BODY_BYTES:
+            raise EstimateRequestError(f"Request body exceeds {MAX_BODY_BYTES:,} bytes")
+        return self.rfile.read(length)
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler API
+        if urlsplit(self.path).path == "/health":
+            self._send_json(HTTPStatus.OK, self.service.status())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown endpoint"})
+
+    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler API
+        url = urlsplit(self.path)
+        try:
+            if url.path == "/reload":
+                self._send_json(HTTPStatus.OK, self.service.load())
+            elif url.path == "/estimate":
+                self._estimate(url.query)
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown endpoint"})
+        except EstimateRequestError as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        except ServiceBusy as exc:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(exc)})
+        except Exception as exc:
+            logger.exception("[serve] %s failed", url.path)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
+
+    def _estimate(self, query: str) -> None:
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        response_format = params.pop("format", "json")
+        body = self._read_body()
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type == "application/json":
+            try:
+                quantities, options = _quantities_from_json(json.loads(body))
+            except ValueError as exc:
+                raise EstimateRequestError(f"Invalid JSON body: {exc}") from exc
+            options = {**params, **options}
+        else:
+            quantities, options = body, params
+
+        started = time.perf_counter()
+        audit = self.service.estimate(quantities, options)
+        elapsed = time.perf_counter() - started
+        logger.info("[serve] priced %s rows in %.2fs", len(audit), elapsed)
+        if response_format == "csv":
+            self._send(HTTPStatus.OK, audit.to_csv(index=False).encode("utf-8"), "text/csv")
+            return
+        # to_json maps NaN/NaT/numpy scalars to JSON-safe values.
+        split = json.loads(audit.to_json(orient="split", index=False))
+        payload = {"columns": split["columns"], "rows": split["data"]}
+        payload["elapsed_seconds"] = round(elapsed, 3)
+        self._send_json(HTTPStatus.OK, payload)
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def get_request(self):
+            request, _ = super().get_request()
+            return request, ("unix", 0)
+
+
+def make_server(
+    service: EstimatorService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: str | Path | None = None,
+) -> socketserver.BaseServer:
+    """Bind an HTTP server for ``service`` on ``host:port`` or a Unix socket."""
+    if socket_path:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise OSError("Unix sockets are not supported on this platform")
+        path = Path(socket_path)
+        if path.exists():
+            path.unlink()
+        server = ThreadingUnixHTTPServer(str(path), EstimatorRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), EstimatorRequestHandler)
+        server.daemon_threads = True
+    server.service = service  # type: ignore[attr-defined]
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = cli.build_parser(
+        prog="costest serve",
+        description="Serve estimate requests from a BidTabs corpus loaded once at startup",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to listen on (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default {DEFAULT_PORT})")
+    parser.add_argument("--socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument(
+        "--request-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Estimate requests priced concurrently (default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"Requests allowed to wait for a worker before returning 503 (default {DEFAULT_QUEUE_SIZE})",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        runtime_cfg = load_runtime_config(os.environ, args)
+    except ValueError as exc:
+        parser.error(str(exc))
+    log_level = logging.DEBUG if runtime_cfg.verbose else logging.INFO
+    logging.basicConfig(level=log_level, format="%(message)s")
+
+    service = EstimatorService(runtime_cfg, workers=args.request_workers, queue_size=args.queue_size)
+    try:
+        service.load()
+        server = make_server(service, args.host, args.port, args.socket)
+    except Exception:  # pragma: no cover - defensive
+        logger.exception("Fatal error starting the estimator service")
+        service.close()
+        return 1
+    where = args.socket or f"http://{args.host}:{args.port}"
+    logger.info("[serve] listening on %s", where)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("[serve] shutting down")
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+__all__ = [
+    "EstimateRequestError",
+    "EstimatorRequestHandler",
+    "EstimatorService",
+    "ServiceBusy",
+    "make_server",
+]
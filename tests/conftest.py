@@ -3,6 +3,8 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure the src directory is importable without requiring installation.
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 # Ensure the src directory is importable without requiring installation.
@@ -10,3 +12,17 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 src_path = PROJECT_ROOT / "src"
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(tmp_path, monkeypatch):
+    """Point the BidTabs, pricing and AI caches at a per-test folder."""
+    from costest import ai_cache, corpus_cache, pricing_cache
+
+    cache_root = tmp_path / "_caches"
+    for name, module in (("bidtabs", corpus_cache), ("pricing", pricing_cache), ("ai", ai_cache)):
+        monkeypatch.setenv(f"{name.upper()}_CACHE_DIR", str(cache_root / name))
+        monkeypatch.setattr(module, "DEFAULT_CACHE_DIR", cache_root / name)
+    ai_cache.configure_ai_cache(None)
+    yield
+    ai_cache.configure_ai_cache(None)
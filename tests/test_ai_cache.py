@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from costest import ai_cache
+from costest.ai_cache import AICacheMiss, AICacheSettings, cached_completion, configure_ai_cache
+
+MESSAGES = [{"role": "system", "content": "rules"}, {"role": "user", "content": '{"target": "714-1"}'}]
+
+
+@pytest.fixture
+def use_cache(tmp_path):
+    def configure(**overrides):
+        configure_ai_cache(AICacheSettings(cache_dir=tmp_path, **overrides))
+
+    yield configure
+    configure_ai_cache(None)
+
+
+def _counting_call(answer="reply"):
+    calls = []
+
+    def call():
+        calls.append(1)
+        return answer
+
+    return call, calls
+
+
+def test_identical_requests_are_answered_from_disk(use_cache):
+    use_cache()
+    call, calls = _counting_call()
+    assert cached_completion(call, "gpt-4.1", MESSAGES, temperature=0.0) == "reply"
+    assert cached_completion(call, "gpt-4.1", MESSAGES, temperature=0.0) == "reply"
+    assert len(calls) == 1
+
+    cached_completion(call, "gpt-4.1", MESSAGES, temperature=0.2)
+    cached_completion(call, "gpt-4o", MESSAGES, temperature=0.0)
+    assert len(calls) == 3
+
+
+def test_cache_only_replays_hits_and_refuses_misses(use_cache):
+    use_cache()
+    call, calls = _counting_call()
+    cached_completion(call, "gpt-4.1", MESSAGES)
+
+    use_cache(cache_only=True)
+    assert cached_completion(call, "gpt-4.1", MESSAGES) == "reply"
+    with pytest.raises(AICacheMiss):
+        cached_completion(call, "gpt-4.1", MESSAGES + [{"role": "user", "content": "new"}])
+    assert len(calls) == 1
+
+
+def test_expired_entries_are_refetched(use_cache, monkeypatch):
+    use_cache(ttl_days=1.0)
+    call, calls = _counting_call()
+    cached_completion(call, "gpt-4.1", MESSAGES)
+    later = time.time() + 2 * 86400
+    monkeypatch.setattr(ai_cache.time, "time", lambda: later)
+    cached_completion(call, "gpt-4.1", MESSAGES)
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted(use_cache):
+    use_cache(max_entries=2)
+    call, calls = _counting_call()
+    first = [{"role": "user", "content": "first"}]
+    cached_completion(call, "gpt-4.1", first)
+    cached_completion(call, "gpt-4.1", [{"role": "user", "content": "second"}])
+    cached_completion(call, "gpt-4.1", [{"role": "user", "content": "third"}])
+    assert len(calls) == 3
+    cached_completion(call, "gpt-4.1", first)
+    assert len(calls) == 4
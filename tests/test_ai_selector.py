@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from costest import ai_selector
+
+
+class _FakeClient:
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        target = json.loads(kwargs["messages"][1]["content"])["target"]
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.active -= 1
+        if target["ITEM_CODE"] == "BAD":
+            raise RuntimeError("upstream 500")
+        content = json.dumps({"selected": [{"item_code": target["ITEM_CODE"], "weight": 1.0}], "notes": "ok"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _requests(codes):
+    return [({"ITEM_CODE": code}, [{"item_code": code}], None) for code in codes]
+
+
+def test_concurrent_selection_overlaps_calls_and_keeps_order(monkeypatch):
+    client = _FakeClient()
+    options = []
+
+    def fake_get_client(timeout=None, max_retries=None):
+        options.append((timeout, max_retries))
+        return client
+
+    monkeypatch.delenv("DISABLE_OPENAI", raising=False)
+    monkeypatch.setenv("DISABLE_AI_CACHE", "1")
+    monkeypatch.setattr(ai_selector, "_get_client", fake_get_client)
+    codes = ["A", "B", "BAD", "C", "D", "E"]
+    results = ai_selector.choose_alternates_concurrently(_requests(codes), concurrency=3, timeout=5.0, max_retries=1)
+
+    assert 1 < client.peak <= 3
+    assert set(options) == {(5.0, 1)}
+    assert isinstance(results[2], RuntimeError)
+    assert [result[0][0].item_code for position, result in enumerate(results) if position != 2] == [
+        "A",
+        "B",
+        "C",
+        "D",
+        "E",
+    ]
+
+
+def test_concurrency_one_runs_serially(monkeypatch):
+    client = _FakeClient(delay=0.0)
+    monkeypatch.delenv("DISABLE_OPENAI", raising=False)
+    monkeypatch.setenv("DISABLE_AI_CACHE", "1")
+    monkeypatch.setattr(ai_selector, "_get_client", lambda timeout=None, max_retries=None: client)
+    results = ai_selector.choose_alternates_concurrently(_requests(["A", "B"]), concurrency=1)
+    assert client.peak == 1
+    assert [result[0][0].item_code for result in results] == ["A", "B"]
+
+
+class _BatchClient:
+    def __init__(self, drop=()):
+        self.drop = set(drop)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        payload = json.loads(kwargs["messages"][1]["content"])
+        self.requests.append(payload)
+        if "targets" in payload:
+            results = [
+                {
+                    "target_id": entry["target_id"],
+                    "selected": [{"item_code": entry["target"]["ITEM_CODE"], "weight": 1.0}],
+                }
+                for entry in payload["targets"]
+                if entry["target"]["ITEM_CODE"] not in self.drop
+            ]
+            content = json.dumps({"results": results})
+        else:
+            code = payload["target"]["ITEM_CODE"]
+            content = json.dumps({"selected": [{"item_code": code, "weight": 1.0}], "notes": "single"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _use_client(monkeypatch, client):
+    monkeypatch.delenv("DISABLE_OPENAI", raising=False)
+    monkeypatch.setenv("DISABLE_AI_CACHE", "1")
+    monkeypatch.setattr(ai_selector, "_get_client", lambda timeout=None, max_retries=None: client)
+
+
+def test_batched_selection_packs_targets_and_shares_references(monkeypatch):
+    client = _BatchClient()
+    _use_client(monkeypatch, client)
+    spec = {"spec_text": "x" * 4000}
+    requests = [({"ITEM_CODE": code}, [{"item_code": code}], spec) for code in ("A", "B", "C", "D", "E")]
+
+    results = ai_selector.choose_alternates_batched(requests, batch_size=3)
+
+    assert [len(payload["targets"]) for payload in client.requests] == [3, 2]
+    assert all(len(payload["references"]) == 1 for payload in client.requests)
+    assert [result[0][0].item_code for result in results] == ["A", "B", "C", "D", "E"]
+
+
+def test_batched_selection_falls_back_per_target_on_bad_entries(monkeypatch):
+    client = _BatchClient(drop={"B"})
+    _use_client(monkeypatch, client)
+    requests = _requests(["A", "B", "C"])
+
+    results = ai_selector.choose_alternates_batched(requests, batch_size=3)
+
+    assert len(client.requests) == 2
+    assert client.requests[1]["target"] == {"ITEM_CODE": "B"}
+    assert [result[0][0].item_code for result in results] == ["A", "B", "C"]
+    assert results[1][1] == "single"
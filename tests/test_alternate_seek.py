@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import random
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from costest import alternate_seek
+from costest.alternate_seek import (
+    CATEGORY_LABELS,
+    AlternateCandidate,
+    GeometryCandidateIndex,
+    _deterministic_weight_score,
+    _deterministic_weight_scores,
+    _score_candidate,
+    _score_candidates,
+    geometry_candidate_index,
+)
+from costest.price_logic import BidTabsIndex
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ITEM_CODE": ["714-1", "714-2", "714-1", "715-1", "714-3", "714-4", "7141", "714-2"],
+            "GEOM_SHAPE": ["box", "box", "box", "box", "pipe", None, "box", "box"],
+            "GEOM_AREA_SQFT": [10.0, 11.5, 12.5, 10.5, 10.0, 11.0, 10.0, None],
+            "UNIT_PRICE": [100.0] * 8,
+        },
+        index=[50, 51, 52, 53, 54, 55, 56, 57],
+    )
+
+
+def _scan(frame, prefix, shape, lower, upper, exclude_code):
+    rows = frame.loc[frame["ITEM_CODE"].astype(str).str.startswith(prefix + "-")]
+    rows = rows.loc[(rows["ITEM_CODE"] != exclude_code) & rows["GEOM_AREA_SQFT"].notna()]
+    if shape is not None:
+        rows = rows.loc[rows["GEOM_SHAPE"] == shape]
+    return rows.loc[(rows["GEOM_AREA_SQFT"] >= lower) & (rows["GEOM_AREA_SQFT"] <= upper)]
+
+
+def test_candidate_rows_match_corpus_scan():
+    frame = _frame()
+    index = GeometryCandidateIndex(frame)
+    for shape in ("box", "pipe", "arch", None):
+        for lower, upper in ((8.0, 12.0), (10.0, 12.5), (0.0, 100.0), (11.6, 12.4)):
+            for exclude in ("714-9", "714-1"):
+                expected = _scan(frame, "714", shape, lower, upper, exclude)
+                actual = index.candidate_rows("714", shape, lower, upper, exclude)
+                pd.testing.assert_frame_equal(actual, expected)
+    assert index.candidate_rows("999", None, 0.0, 100.0, "").empty
+
+
+def test_candidate_index_is_built_once_per_bidtabs_index():
+    index = BidTabsIndex(_frame())
+    assert geometry_candidate_index(index) is geometry_candidate_index(index)
+    assert geometry_candidate_index(index.at("2020-01-01")) is not geometry_candidate_index(index)
+
+
+def _random_candidates(rng: random.Random, count: int):
+    shapes = ["box", "box_culvert", "pipe", "arch", "", None]
+    words = ["PRECAST", "COATED", "GALVANIZED", "REINFORCED", "TEMPORARY", "POLYMER", "STAINLESS", "CONCRETE"]
+    sections = ["", "714.03", "714.05", "715.02", "902"]
+    candidates, bundles = [], []
+    for position in range(count):
+        cat_data = {
+            f"{label}_COUNT": rng.choice([0, 0, 1, 3, 12, 40]) for label in CATEGORY_LABELS
+        }
+        candidates.append(
+            AlternateCandidate(
+                item_code=f"714-{position}",
+                description=" ".join(rng.sample(words, rng.randint(0, 3))).lower(),
+                area_sqft=rng.choice([0.0, -1.0, float("nan"), rng.uniform(5, 40), rng.uniform(18, 22)]),
+                base_price=100.0,
+                adjusted_price=100.0,
+                ratio=rng.uniform(0.5, 2.0),
+                data_points=rng.choice([0, 1, 9, 10, 55, 400]),
+                cat_data=cat_data,
+                shape=rng.choice(shapes),
+                source="bidtabs-prefix",
+            )
+        )
+        section = rng.choice(sections)
+        if section or rng.random() < 0.5:
+            bundles.append({"payitem": {"section": section, "description": rng.choice(words)}})
+        else:
+            bundles.append(None)
+    return candidates, bundles
+
+
+def test_vectorized_scores_match_scalar_scoring():
+    rng = random.Random(7)
+    for target_shape, target_section in (("box", "714.03"), ("pipe", ""), (None, "714.05"), ("", "")):
+        target_bundle = {"payitem": {"section": target_section, "description": "Galvanized box"}}
+        candidates, bundles = _random_candidates(rng, 60)
+        tolerances = [rng.choice([0.2, 0.35]) for _ in candidates]
+        vectorized = _score_candidates(
+            20.0,
+            target_shape,
+            candidates,
+            target_bundle,
+            bundles,
+            target_description="Coated precast culvert",
+            area_tolerances=tolerances,
+        )
+        for candidate, bundle, tolerance, result in zip(candidates, bundles, tolerances, vectorized):
+            expected = _score_candidate(
+                20.0,
+                target_shape,
+                candidate,
+                target_bundle,
+                bundle,
+                target_description="Coated precast culvert",
+                area_tolerance=tolerance,
+            )
+            assert result == expected
+            candidate.similarity = result[0]
+
+        candidates[0].item_code = "UNIT_PRICE_SUMMARY"
+        candidates[1].similarity = {}
+        assert _deterministic_weight_scores(candidates).tolist() == [
+            _deterministic_weight_score(candidate) for candidate in candidates
+        ]
+
+
+def test_find_alternate_prices_times_each_target(monkeypatch):
+    def _gather(bidtabs, code, geometry, **kwargs):
+        time.sleep(0.05 if code == "714-slow" else 0.0)
+        if code == "714-none":
+            return None
+        return SimpleNamespace(code=code, target_info={}, ai_candidates=lambda: [], reference_bundle={})
+
+    def _choose(requests, **kwargs):
+        time.sleep(0.04)
+        return [None] * len(requests)
+
+    monkeypatch.setattr(alternate_seek, "gather_alternate_candidates", _gather)
+    monkeypatch.setattr(alternate_seek, "choose_alternates_concurrently", _choose)
+    monkeypatch.setattr(alternate_seek, "complete_alternate_price", lambda search, outcome: search.code)
+    targets = [(code, None, "BOX", {}) for code in ("714-slow", "714-fast", "714-none")]
+
+    results, seconds = alternate_seek.find_alternate_prices(BidTabsIndex(_frame()), targets, return_timings=True)
+
+    assert results == ["714-slow", "714-fast", None]
+    assert seconds[0] >= 0.05 + 0.02  # own search plus half of the shared AI phase
+    assert 0.02 <= seconds[1] < 0.05
+    assert seconds[2] < 0.02
+    assert alternate_seek.find_alternate_prices(BidTabsIndex(_frame()), targets, allow_ai=False)[2] is None
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import os
+from dataclasses import replace
+
+import pandas as pd
+
+from costest import cli
+from costest.batch import BatchCorpora, BatchProject, _project_config, discover_projects
+from costest.config import load_config
+from costest.corpus_cache import load_prepared_bidtabs
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+    return path
+
+
+def test_discover_projects_from_folder_and_manifest(tmp_path):
+    folder = tmp_path / "projects"
+    alpha = _touch(folder / "Alpha_project_quantities.xlsx")
+    _touch(folder / "Alpha_project_attributes.xlsx")
+    beta = _touch(folder / "Beta_project_quantities.xlsx")
+    _touch(folder / "notes.xlsx")
+
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(
+        "QUANTITIES_XLSX,EXPECTED_COST,DISTRICT\n"
+        "projects/Beta_project_quantities.xlsx,\"$2,500,000\",Crawfordsville\n"
+    )
+
+    projects = discover_projects([folder], manifest=manifest)
+
+    assert [p.name for p in projects] == ["Beta", "Alpha", "Beta_2"]
+    assert projects[0].quantities_path == beta.resolve()
+    assert projects[0].expected_cost == 2_500_000.0
+    assert projects[0].district == "Crawfordsville"
+    assert projects[1].quantities_path == alpha.resolve()
+    assert projects[1].attributes_path == (folder / "Alpha_project_attributes.xlsx").resolve()
+    assert projects[2].attributes_path is None
+
+
+def test_project_config_routes_outputs_and_inputs(tmp_path):
+    env = dict(os.environ)
+    env["EXPECTED_TOTAL_CONTRACT_COST"] = "1000000"
+    base = load_config(env)
+
+    manifest_project = BatchProject("Beta", tmp_path / "Beta_project_quantities.xlsx", 2_500_000.0, "Seymour")
+    cfg = _project_config(base, manifest_project, tmp_path / "out")
+    assert cfg.quantities_path == manifest_project.quantities_path
+    assert cfg.output_audit == (tmp_path / "out" / "Beta" / "Estimate_Audit.csv").resolve()
+    assert cfg.expected_contract_cost == 2_500_000.0
+    assert cfg.project_district == "Seymour"
+
+    attrs = tmp_path / "Alpha_project_attributes.xlsx"
+    sibling_project = BatchProject("Alpha", tmp_path / "Alpha_project_quantities.xlsx", attributes_path=attrs)
+    cfg = _project_config(base, sibling_project, tmp_path / "out")
+    assert cfg.project_attributes == attrs
+    assert cfg.expected_contract_cost is None
+
+
+def test_batch_corpus_honours_project_region_map(tmp_path):
+    folder = tmp_path / "bidtabs"
+    folder.mkdir()
+    pd.DataFrame(
+        {
+            "ITEM_CODE": ["401-10258", "401-10258", "715-05160"],
+            "DESCRIPTION": ["HMA SURFACE", "HMA SURFACE", "PIPE 12 IN"],
+            "UNIT": ["TON", "TON", "LFT"],
+            "QUANTITY": [100, 50, 40],
+            "UNIT_PRICE": [85.5, 90.0, 120.0],
+            "LETTING_DATE": ["01/15/2024", "02/01/2024", "03/10/2023"],
+            "BIDDER": ["ACME", "BETA", "GAMMA"],
+            "DISTRICT": ["SEYMOUR", "LAPORTE", "SEYMOUR"],
+        }
+    ).to_csv(folder / "a.csv", index=False)
+    attrs = tmp_path / "Alpha_project_attributes.xlsx"
+    with pd.ExcelWriter(attrs, engine="openpyxl") as writer:
+        pd.DataFrame({"EXPECTED_TOTAL_CONTRACT_COST": [1_000_000]}).to_excel(writer, sheet_name="PROJECT", index=False)
+        pd.DataFrame({"DISTRICT": ["SEYMOUR", "LAPORTE"], "REGION": [7, 8]}).to_excel(
+            writer, sheet_name="REGION_MAP", index=False
+        )
+    _, _, region_map = cli.load_project_attributes(attrs)
+    cfg = replace(load_config(dict(os.environ)), bidtabs_dir=folder, bidtabs_cache_dir=tmp_path / "cache")
+
+    corpora = BatchCorpora(cfg)
+    default = corpora()
+    batch = cli._shared_corpus(corpora, region_map)
+    single = load_prepared_bidtabs(folder, region_map, use_cache=False)
+
+    assert len(corpora) == 2
+    assert batch.frame["REGION"].tolist() == single.frame["REGION"].tolist() == [7, 8, 7]
+    assert default.frame["REGION"].tolist() == [5, 4, 5]
+    assert cli._shared_corpus(default, region_map) is None
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import pandas as pd
+import pytest
 
-from costest.bidtabs_io import load_quantities
+from costest.bidtabs_io import load_bidtabs_files, load_quantities
 
 
 def test_load_quantities_supports_alt_project_headers(tmp_path):
@@ -24,3 +25,35 @@ def test_load_quantities_supports_alt_project_headers(tmp_path):
     assert result["DESCRIPTION"].tolist() == ["Clearing Right of Way", "Excavation"]
     assert result["UNIT"].tolist() == ["LS", "CY"]
     assert result["QUANTITY"].tolist() == [1, 250.5]
+
+
+def test_parallel_bidtabs_loading_matches_serial(tmp_path):
+    for idx in range(4):
+        pd.DataFrame(
+            {
+                "ITEM_CODE": [f"2030{idx}000", "40110258"],
+                "DESCRIPTION": ["EXCAVATION", "HMA SURFACE"],
+                "UNIT": ["CYS", "TON"],
+                "QUANTITY": [str(100 + idx), "50"],
+                "UNIT_PRICE": ["12.5", str(80 + idx)],
+                "LETTING_DATE": ["01/15/2024", "02/01/2024"],
+            }
+        ).to_csv(tmp_path / f"letting_{idx}.csv", index=False)
+
+    serial = load_bidtabs_files(tmp_path)
+    parallel = load_bidtabs_files(tmp_path, workers=3)
+
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert serial["ITEM_CODE"].tolist()[::2] == ["203-00000", "203-01000", "203-02000", "203-03000"]
+
+
+def test_parallel_bidtabs_loading_propagates_file_errors(tmp_path):
+    pd.DataFrame({"ITEM_CODE": ["20302000"], "UNIT_PRICE": ["1"]}).to_csv(tmp_path / "a.csv", index=False)
+    (tmp_path / "b.xls").write_bytes(b"not a workbook")
+
+    with pytest.raises(Exception) as serial_exc:
+        load_bidtabs_files(tmp_path)
+    with pytest.raises(Exception) as parallel_exc:
+        load_bidtabs_files(tmp_path, workers=2)
+
+    assert type(parallel_exc.value) is type(serial_exc.value)
@@ -0,0 +1,65 @@
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+from costest import ai_cache, cli, price_logic
+from costest.price_logic import BidTabsIndex
+
+
+def _fake_alternate(bidtabs, code, geometry, **kwargs):
+    return (code, kwargs["target_description"], len(bidtabs), kwargs["allow_ai"])
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requires fork")
+def test_prefetch_alternate_seek_keeps_task_order(monkeypatch):
+    monkeypatch.setattr(cli, "find_alternate_price", _fake_alternate)
+    monkeypatch.setattr(cli.reference_data, "build_reference_bundle", lambda code: {})
+    index = BidTabsIndex(pd.DataFrame({"ITEM_CODE": ["A", "B"], "UNIT_PRICE": [1.0, 2.0]}))
+    index.result_store = sentinel = object()
+    tasks = {7: ("714-1", "BOX 4 FT X 6 FT"), 2: ("714-2", "BOX 5 FT X 5 FT"), 5: ("714-3", "PIPE 12 IN")}
+
+    results = cli._prefetch_alternate_seek(tasks, index, 3, False, workers=2)
+
+    assert list(results) == [7, 2, 5]
+    assert results[2][0] == ("714-2", "BOX 5 FT X 5 FT", 2, False)
+    assert all(seconds >= 0.0 for _, seconds in results.values())
+    assert index.result_store is sentinel
+
+
+def test_prefetch_alternate_seek_serial_when_single_worker(monkeypatch):
+    monkeypatch.setattr(cli, "find_alternate_price", _fake_alternate)
+    index = BidTabsIndex(pd.DataFrame({"ITEM_CODE": ["A"], "UNIT_PRICE": [1.0]}))
+
+    assert cli._prefetch_alternate_seek({0: ("714-1", "x"), 1: ("714-2", "y")}, index, None, True, workers=1) == {}
+
+
+class _RecordingStore:
+    def __init__(self):
+        self.stored = []
+
+    def get(self, *args):
+        return None
+
+    def put(self, index, item_code, region, target_quantity, include_details, result):
+        self.stored.append((item_code, region, target_quantity, include_details))
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requires fork")
+def test_prefetch_alternate_seek_returns_worker_breakdowns(monkeypatch):
+    def _pricing_alternate(bidtabs, code, geometry, **kwargs):
+        ai_cache._count("hits")
+        return price_logic.category_breakdown(bidtabs, "A", project_region=kwargs["project_region"])[0]
+
+    monkeypatch.setattr(cli, "find_alternate_price", _pricing_alternate)
+    monkeypatch.setattr(cli.reference_data, "build_reference_bundle", lambda code: {})
+    index = BidTabsIndex(pd.DataFrame({"ITEM_CODE": ["A", "A"], "UNIT_PRICE": [1.0, 3.0]}))
+    index.result_store = store = _RecordingStore()
+    hits_before = ai_cache.ai_cache_counts()["hits"]
+
+    results = cli._prefetch_alternate_seek({0: ("714-1", "x"), 1: ("714-2", "y")}, index, 1, False, workers=2)
+
+    assert set(results) == {0, 1}
+    assert ("A", 1, None, False) in store.stored
+    assert index.memo.get("A", 1, None, False) is not None
+    assert ai_cache.ai_cache_counts()["hits"] == hits_before + 2
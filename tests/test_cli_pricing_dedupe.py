@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import replace
+
+import pandas as pd
+
+from costest import cli
+from costest.config import load_config
+
+BOX_CODE = "714-99901"
+BOX_DESC = "BOX CULVERT 4 FT X 6 FT"
+BOX_NEIGHBOUR = "BOX CULVERT 4 FT X 5 FT"
+
+
+def _bidtabs(folder):
+    folder.mkdir()
+    rows = []
+    for month in range(1, 5):
+        rows.append(["401-10258", "HMA SURFACE", "TON", 100, 95.0 + month, f"{month:02d}/15/2024", "ACME", "SEYMOUR"])
+        rows.append(["401-10258", "HMA SURFACE", "TON", 1000, 55.0 - month, f"{month:02d}/20/2024", "ACME", "SEYMOUR"])
+    for month, price in enumerate([640.0, 655.0, 700.0], start=1):
+        rows.append(["714-99902", BOX_NEIGHBOUR, "LFT", 40, price, f"{month:02d}/10/2024", "BETA", "SEYMOUR"])
+    pd.DataFrame(
+        rows,
+        columns=["ITEM_CODE", "DESCRIPTION", "UNIT", "QUANTITY", "UNIT_PRICE", "LETTING_DATE", "BIDDER", "DISTRICT"],
+    ).to_csv(folder / "bids.csv", index=False)
+
+
+def _run(tmp_path, name, lines):
+    quantities = tmp_path / f"{name}_project_quantities.xlsx"
+    pd.DataFrame(lines, columns=["ITEM_CODE", "DESCRIPTION", "UNIT", "QUANTITY"]).to_excel(
+        quantities, index=False, engine="openpyxl"
+    )
+    out = tmp_path / name
+    cfg = replace(
+        load_config(dict(os.environ)),
+        bidtabs_dir=tmp_path / "bidtabs",
+        quantities_path=quantities,
+        project_attributes=tmp_path / "missing_attributes.xlsx",
+        output_dir=out,
+        output_xlsx=out / "Estimate_Draft.xlsx",
+        output_audit=out / "Estimate_Audit.csv",
+        output_payitem_audit=out / "PayItems_Audit.xlsx",
+        disable_ai=True,
+        disable_alt_seek=False,
+        pricing_workers=1,
+        pricing_as_of="2024-12-31",
+    )
+    assert cli.run(runtime_config=cfg) == 0
+    audit = pd.read_csv(cfg.output_audit)
+    details = pd.read_excel(cfg.output_payitem_audit, sheet_name=None, engine="openpyxl")
+    metadata = json.loads((out / "run_metadata.json").read_text(encoding="utf-8"))
+    return audit, details, metadata
+
+
+def test_repeated_lines_are_priced_once_and_match_the_first(tmp_path, monkeypatch):
+    _bidtabs(tmp_path / "bidtabs")
+    seeks = []
+    real_seek = cli.find_alternate_price
+
+    def counting_seek(bidtabs, code, geometry, **kwargs):
+        seeks.append(code)
+        return real_seek(bidtabs, code, geometry, **kwargs)
+
+    monkeypatch.setattr(cli, "find_alternate_price", counting_seek)
+    hma = ["401-10258", "HMA SURFACE", "TON", 100]
+    box = [BOX_CODE, BOX_DESC, "LFT", 60]
+    hma_large = ["401-10258", "HMA SURFACE", "TON", 1000]
+    audit, details, metadata = _run(tmp_path, "repeats", [hma, box, hma, box, hma_large])
+
+    assert seeks == [BOX_CODE]
+    assert metadata["pricing_dedupe"]["reused_lines"] == 2
+    repeats = audit.iloc[[2, 3]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(repeats, audit.iloc[[0, 1]].reset_index(drop=True))
+    # Same code, different quantity: priced separately on its own quantity band.
+    assert audit.loc[4, "QUANTITY"] == 1000
+    assert audit.loc[4, "UNIT_PRICE_EST"] < audit.loc[0, "UNIT_PRICE_EST"]
+
+    # Without the repeats the remaining lines and the PayItems detail are unchanged.
+    seeks.clear()
+    single_audit, single_details, single_metadata = _run(tmp_path, "single", [hma, box, hma_large])
+    assert seeks == [BOX_CODE]
+    assert single_metadata["pricing_dedupe"]["reused_lines"] == 0
+    pd.testing.assert_frame_equal(audit.iloc[[0, 1, 4]].reset_index(drop=True), single_audit)
+    assert list(details) == list(single_details)
+    for sheet in details:
+        pd.testing.assert_frame_equal(details[sheet], single_details[sheet])
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import copy
+import math
 from types import SimpleNamespace
 from pathlib import Path
 
 import pandas as pd
 
-from costest.cli import run
+from costest.cli import _ContractPercentPricer, run
 from costest.config import load_cli_config
 from costest.sample_data import DATA_SAMPLE_DIR, create_estimate_workbook_from_template, create_payitems_workbook_from_template
 
@@ -41,3 +43,112 @@ def test_contract_percents_externalized(tmp_path: Path) -> None:
     assert meta_path.exists()
     meta = pd.read_json(meta_path)
     assert "spec_edition" in meta.columns
+
+
+def _per_rule_scan(rows: list[dict], rules: list[tuple[str, float, set[str], str]]) -> None:
+    """The contract-percent stage as it was before subtotals were cached: one full scan per rule."""
+    for code, percent, exclude_codes, note_label in rules:
+        row_obj = next((entry for entry in rows if entry.get("ITEM_CODE") == code), None)
+        if row_obj is None:
+            continue
+        qty_val = float(row_obj.get("QUANTITY", 0) or 0)
+        if qty_val <= 0:
+            continue
+        subtotal = 0.0
+        for entry in rows:
+            if entry.get("ITEM_CODE") in exclude_codes:
+                continue
+            subtotal += float(entry.get("QUANTITY", 0) or 0) * float(entry.get("UNIT_PRICE_EST", 0) or 0)
+        rounded_amount = math.floor(subtotal * percent / 1000.0) * 1000.0
+        row_obj["UNIT_PRICE_EST"] = round(rounded_amount / qty_val, 2) if qty_val else 0.0
+        note_text = f"{note_label} {percent * 100:.1f}% of applicable items = ${rounded_amount:,.0f}."
+        existing_note = str(row_obj.get("NOTES", "") or "").strip()
+        row_obj["NOTES"] = f"{existing_note} {note_text}".strip() if existing_note else note_text
+
+
+def _priced(rows: list[dict], rules: list[tuple[str, float, set[str], str]]) -> pd.DataFrame:
+    pricer = _ContractPercentPricer(rows)
+    for code, percent, exclude_codes, note_label in rules:
+        position = pricer.position(code)
+        if position is not None and float(rows[position].get("QUANTITY", 0) or 0) > 0:
+            pricer.apply(position, percent, exclude_codes, note_label)
+    return pd.DataFrame(rows)[["ITEM_CODE", "QUANTITY", "UNIT_PRICE_EST", "NOTES"]]
+
+
+def _expected(rows: list[dict], rules: list[tuple[str, float, set[str], str]]) -> pd.DataFrame:
+    _per_rule_scan(rows, rules)
+    return pd.DataFrame(rows)[["ITEM_CODE", "QUANTITY", "UNIT_PRICE_EST", "NOTES"]]
+
+
+def _project_rows() -> list[dict]:
+    # Amounts whose float sum depends on the order they are added in.
+    rows = [
+        {"ITEM_CODE": "105-06845", "QUANTITY": 1, "UNIT_PRICE_EST": 0.0, "NOTES": ""},
+        {"ITEM_CODE": "110-01001", "QUANTITY": 1, "UNIT_PRICE_EST": 0.0, "NOTES": "Existing note."},
+    ]
+    prices = [0.1, 1e16 / 3, 0.2, 49_999.97, 0.3, 1e-3, 7_777_777.77, 0.7]
+    for index, price in enumerate(prices):
+        rows.append({"ITEM_CODE": f"401-{index:05d}", "QUANTITY": 3 + index, "UNIT_PRICE_EST": price, "NOTES": ""})
+    return rows
+
+
+def test_contract_percents_match_per_rule_scan_for_repeated_codes() -> None:
+    rows = _project_rows()
+    rows.append({"ITEM_CODE": "105-06845", "QUANTITY": 4, "UNIT_PRICE_EST": 123.45, "NOTES": ""})
+    rules = [
+        ("105-06845", 0.02, {"105-06845", "110-01001"}, "Per IDM Chapter 20:"),
+        ("110-01001", 0.05, {"105-06845", "110-01001"}, "Per IDM Chapter 20:"),
+    ]
+    actual = _priced(copy.deepcopy(rows), rules)
+    pd.testing.assert_frame_equal(actual, _expected(copy.deepcopy(rows), rules))
+    # The first row carrying the code is repriced; the later duplicate is left alone.
+    assert actual.loc[0, "NOTES"].startswith("Per IDM Chapter 20: 2.0%")
+    assert actual.iloc[-1]["UNIT_PRICE_EST"] == 123.45
+
+
+def test_contract_percents_match_per_rule_scan_for_shared_exclusion_set() -> None:
+    rows = _project_rows()
+    rows[4]["ITEM_CODE"] = "109-01002"
+    shared = {"105-06845", "110-01001", "109-01002"}
+    rules = [
+        ("105-06845", 0.02, shared, "Mobilization (2023 ed.)"),
+        ("110-01001", 0.05, shared, "Construction engineering (2023 ed.)"),
+        ("109-01002", 0.015, shared, "Field office (2023 ed.)"),
+        ("999-99999", 0.5, shared, "Missing line"),
+    ]
+    rows[1]["NOTES"] = ""
+    pd.testing.assert_frame_equal(_priced(copy.deepcopy(rows), rules), _expected(copy.deepcopy(rows), rules))
+
+
+def test_contract_percent_subtotal_adds_lines_in_row_order() -> None:
+    # In row order these add up to 999.9999999999999; smallest-first they reach 1000.0.
+    rows = [{"ITEM_CODE": "105-06845", "QUANTITY": 1, "UNIT_PRICE_EST": 0.0, "NOTES": ""}]
+    for index, price in enumerate([999.4, 0.3, 0.3]):
+        rows.append({"ITEM_CODE": f"401-{index:05d}", "QUANTITY": 1, "UNIT_PRICE_EST": price, "NOTES": ""})
+    rules = [("105-06845", 1.0, {"105-06845"}, "Per IDM Chapter 20:")]
+    actual = _priced(copy.deepcopy(rows), rules)
+    pd.testing.assert_frame_equal(actual, _expected(copy.deepcopy(rows), rules))
+    assert actual.loc[0, "UNIT_PRICE_EST"] == 0.0
+
+def test_contract_percents_drop_subtotals_that_included_a_repriced_line() -> None:
+    rows = _project_rows()
+    rules = [
+        # Caches the subtotal excluding only 105-06845, which includes 110-01001.
+        ("105-06845", 0.02, {"105-06845"}, "Per IDM Chapter 20:"),
+        # Reprices 110-01001, so that cached subtotal is stale.
+        ("110-01001", 0.05, {"110-01001"}, "Per IDM Chapter 20:"),
+        # Reuses the exclusion set of the first rule and must see the new amount.
+        ("401-00000", 0.01, {"105-06845"}, "Per IDM Chapter 20:"),
+    ]
+    actual = _priced(copy.deepcopy(rows), rules)
+    pd.testing.assert_frame_equal(actual, _expected(copy.deepcopy(rows), rules))
+
+    rows = copy.deepcopy(rows)
+    pricer = _ContractPercentPricer(rows)
+    before = pricer.subtotal({"105-06845"})
+    pricer.apply(1, 0.05, {"110-01001"}, "Per IDM Chapter 20:")
+    after = pricer.subtotal({"105-06845"})
+    assert after != before
+    assert after == sum(
+        float(entry["QUANTITY"]) * float(entry["UNIT_PRICE_EST"]) for entry in rows if entry["ITEM_CODE"] != "105-06845"
+    )
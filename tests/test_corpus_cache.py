@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from costest import corpus_cache
+from costest.bidtabs_io import load_bidtabs_files
+from costest.corpus_cache import (
+    PreparedCorpus,
+    derived_key,
+    load_derived_frame,
+    load_prepared_bidtabs,
+    prepare_bidtabs,
+    store_derived_frame,
+)
+
+
+def _write_bidtabs(path, rows):
+    frame = pd.DataFrame(
+        rows,
+        columns=[
+            "ITEM_CODE",
+            "DESCRIPTION",
+            "UNIT",
+            "QUANTITY",
+            "UNIT_PRICE",
+            "LETTING_DATE",
+            "BIDDER",
+            "REGION",
+            "JOB_SIZE",
+        ],
+    )
+    frame.to_csv(path, index=False)
+
+
+def _seed_folder(folder):
+    folder.mkdir()
+    _write_bidtabs(
+        folder / "a.csv",
+        [
+            ["401-10258", "HMA SURFACE", "TON", "100", "85.5", "01/15/2024", "ACME", "2", "900000"],
+            ["401-10258", "HMA SURFACE", "TON", "100", "85.5", "01/15/2024", "ACME", "2", "900000"],
+            ["401-10258", "HMA SURFACE", "TON", "50", "0", "02/01/2024", "BETA", "3", "500000"],
+        ],
+    )
+    _write_bidtabs(
+        folder / "b.csv",
+        [
+            ["715-05160", "PIPE 12 IN", "LFT", "40", "120", "03/10/2023", "GAMMA", "1", ""],
+            ["715-05160", "", "LFT", "", "130", "bad date", "", "1", "1200000"],
+        ],
+    )
+
+
+def test_cache_round_trip_matches_fresh_preparation(tmp_path):
+    folder = tmp_path / "bidtabs"
+    _seed_folder(folder)
+    cache_dir = tmp_path / "cache"
+
+    expected = prepare_bidtabs(load_bidtabs_files(folder))
+    first = load_prepared_bidtabs(folder, cache_dir=cache_dir)
+    second = load_prepared_bidtabs(folder, cache_dir=cache_dir)
+
+    assert first.status == "built"
+    assert second.status == "hit"
+    assert second.fingerprint == first.fingerprint
+    pd.testing.assert_frame_equal(first.frame, expected)
+    pd.testing.assert_frame_equal(second.frame, expected)
+    assert len(second.frame) == 3  # duplicate and zero-price rows sanitized away
+
+
+def test_cache_ingests_only_changed_sources(tmp_path):
+    folder = tmp_path / "bidtabs"
+    _seed_folder(folder)
+    cache_dir = tmp_path / "cache"
+    baseline = load_prepared_bidtabs(folder, cache_dir=cache_dir)
+    assert baseline.parsed_files == 2
+
+    # Touching a file without changing its bytes keeps the cache valid.
+    stat = (folder / "a.csv").stat()
+    os.utime(folder / "a.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+    assert load_prepared_bidtabs(folder, cache_dir=cache_dir).status == "hit"
+
+    _write_bidtabs(
+        folder / "c.csv",
+        [["203-02000", "EXCAVATION", "CYS", "500", "22", "05/05/2024", "DELTA", "4", "2000000"]],
+    )
+    added = load_prepared_bidtabs(folder, cache_dir=cache_dir)
+    assert added.status == "incremental"
+    assert added.parsed_files == 1
+    assert added.fingerprint != baseline.fingerprint
+    pd.testing.assert_frame_equal(added.frame, prepare_bidtabs(load_bidtabs_files(folder)))
+
+    _write_bidtabs(
+        folder / "b.csv",
+        [["715-05160", "PIPE 12 IN", "LFT", "40", "125", "03/10/2023", "GAMMA", "1", ""]],
+    )
+    modified = load_prepared_bidtabs(folder, cache_dir=cache_dir)
+    assert modified.parsed_files == 1
+    assert modified.frame.loc[modified.frame["ITEM_CODE"] == "715-05160", "UNIT_PRICE"].tolist() == [125.0]
+
+    (folder / "c.csv").unlink()
+    removed = load_prepared_bidtabs(folder, cache_dir=cache_dir)
+    assert removed.status == "incremental"
+    assert removed.removed_files == 1
+    assert removed.parsed_files == 0
+    assert "203-02000" not in set(removed.frame["ITEM_CODE"])
+    pd.testing.assert_frame_equal(removed.frame, prepare_bidtabs(load_bidtabs_files(folder)))
+
+
+def test_cache_can_be_disabled(tmp_path):
+    folder = tmp_path / "bidtabs"
+    _seed_folder(folder)
+    cache_dir = tmp_path / "cache"
+
+    result = load_prepared_bidtabs(folder, cache_dir=cache_dir, use_cache=False)
+
+    assert result.status == "disabled"
+    assert not cache_dir.exists()
+
+
+def test_derived_frame_round_trip(tmp_path):
+    frame = pd.DataFrame({"ITEM_CODE": ["401-000001", "999-99999"], "DM2321_COURSE": ["Surface", None]})
+    corpus = PreparedCorpus(frame, "hit", "abc123", cache_path=tmp_path)
+    key = derived_key(corpus, "crosswalk-sha")
+
+    assert load_derived_frame(corpus, "dm2321", key) is None
+    store_derived_frame(corpus, "dm2321", key, frame, deleted_rows=3)
+
+    loaded, info = load_derived_frame(corpus, "dm2321", key)
+    assert info == {"deleted_rows": 3}
+    assert loaded["ITEM_CODE"].tolist() == ["401-000001", "999-99999"]
+    assert loaded["DM2321_COURSE"].tolist() == ["Surface", None]
+    assert load_derived_frame(corpus, "dm2321", derived_key(corpus, "other-sha")) is None
+    assert load_derived_frame(PreparedCorpus(frame, "disabled", "abc123"), "dm2321", key) is None
+
+
+def test_preparation_code_change_invalidates_snapshot_and_partitions(tmp_path, monkeypatch):
+    folder = tmp_path / "bidtabs"
+    _seed_folder(folder)
+    cache_dir = tmp_path / "cache"
+    baseline = load_prepared_bidtabs(folder, cache_dir=cache_dir)
+
+    monkeypatch.setattr(corpus_cache, "PREPARATION_KEY", "changed-parser")
+    rebuilt = load_prepared_bidtabs(folder, cache_dir=cache_dir)
+
+    assert rebuilt.status == "incremental"
+    assert rebuilt.parsed_files == 2
+    assert rebuilt.fingerprint != baseline.fingerprint
+    assert len(list((baseline.cache_path / "parts").iterdir())) == 2
+    assert load_prepared_bidtabs(folder, cache_dir=cache_dir).status == "hit"
+
+
+def test_mixed_columns_and_index_round_trip_without_pickle(tmp_path, monkeypatch):
+    frame = pd.DataFrame(
+        {
+            "MIXED": ["401-10258", 7, 2.5, None, np.nan, True, pd.Timestamp("2024-01-15"), pd.NaT],
+            "NULLABLE": pd.array([1, None, 3, 4, 5, 6, 7, 8], dtype="Int64"),
+            "TEXT": pd.array(["a", None, "c", "d", "e", "f", "g", "h"], dtype="string"),
+        },
+        index=pd.Index(["r0", "r1", "r2", "r3", "r4", "r5", "r6", "r7"]),
+    )
+    corpus = PreparedCorpus(frame, "hit", "abc123", cache_path=tmp_path)
+    store_derived_frame(corpus, "mixed", "key", frame)
+
+    real_load = np.load
+
+    def no_pickle_load(*args, **kwargs):
+        assert kwargs.get("allow_pickle") is False
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(corpus_cache.np, "load", no_pickle_load)
+    loaded, _ = load_derived_frame(corpus, "mixed", "key")
+
+    pd.testing.assert_frame_equal(loaded, frame)
+    assert [type(value) for value in loaded["MIXED"].iloc[:3]] == [str, int, float]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from costest.geometry import GEOMETRY_COLUMNS, geometry_codes, geometry_frame, parse_geometry
+
+DESCRIPTIONS = [
+    "BOX CULVERT, 9' x 6'",
+    "PIPE, TYPE 2, Ø 42 IN",
+    "STRUCTURE, MIN AREA 8.5 SFT",
+    "HMA SURFACE",
+    "  inlet 12 in X 18 in  ",
+    "MANHOLE, DIA 3 FT",
+    "",
+    "BOX CULVERT, 9' x 6'",
+    "CASTING 24 x 36",
+]
+
+
+def test_geometry_frame_matches_parse_geometry():
+    series = pd.Series(DESCRIPTIONS + [None], index=range(100, 100 + len(DESCRIPTIONS) + 1))
+    codes, table = geometry_codes(series)
+    frame = geometry_frame(codes, table, index=series.index)
+
+    assert len(table) == 6  # distinct parsed geometries only
+    assert codes[0] == codes[7]
+    assert list(frame.index) == list(series.index)
+    for description, (_, row) in zip(series, frame.iterrows()):
+        expected = parse_geometry(description) if isinstance(description, str) else None
+        if expected is None:
+            assert row["GEOM_SHAPE"] is None
+            assert math.isnan(row["GEOM_AREA_SQFT"])
+            assert row["GEOM_DIMENSIONS"] is None
+        else:
+            assert row["GEOM_SHAPE"] == expected.shape
+            assert row["GEOM_AREA_SQFT"] == expected.area_sqft
+            assert row["GEOM_DIMENSIONS"] == expected.dimensions
+
+
+def test_geometry_codes_without_matches():
+    codes, table = geometry_codes(pd.Series(["HMA SURFACE", "TOPSOIL"]))
+    assert codes.tolist() == [-1, -1]
+    frame = geometry_frame(codes, table)
+    assert frame["GEOM_SHAPE"].tolist() == [None, None]
+    assert np.isnan(frame["GEOM_AREA_SQFT"]).all()
+
+
+def test_cached_geometry_table_round_trips_none():
+    codes, table = geometry_codes(pd.Series(DESCRIPTIONS))
+    # augment_geometry stores the table as JSON in the derived-frame manifest.
+    cached = json.loads(json.dumps(table.to_dict(orient="list")))
+    restored = geometry_frame(codes, pd.DataFrame(cached, columns=list(GEOMETRY_COLUMNS)))
+    fresh = geometry_frame(codes, table)
+    assert restored["GEOM_DIMENSIONS"].tolist() == fresh["GEOM_DIMENSIONS"].tolist()
+    assert restored["GEOM_DIMENSIONS"].tolist()[2] is None
+    assert restored["GEOM_SHAPE"].tolist()[3] is None
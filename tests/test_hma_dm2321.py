@@ -10,6 +10,7 @@ from costest.hma_dm2321 import (
     DM2321_ADDERS_PER_TON,
     load_crosswalk,
     maybe_apply_dm2321_adder,
+    remap_frame,
     remap_item,
 )
 from costest.price_logic import category_breakdown
@@ -66,6 +67,63 @@ def test_remap_unknown_item_returns_original():
     assert meta["deleted"] is False
 
 
+def _loop_remap(frame, xwalk, reverse_meta):
+    """Row-by-row reference implementation of the corpus remap."""
+    keep, columns = [], {name: [] for name in ("ITEM_CODE", "RULE", "SOURCE", "COURSE", "ESAL", "BINDER")}
+    for idx, item_code in enumerate(frame["ITEM_CODE"].astype(str)):
+        new_code, meta = remap_item(item_code, xwalk)
+        if meta.get("deleted") and new_code is None:
+            continue
+        mapped = new_code or item_code
+        reverse = reverse_meta.get(mapped, {})
+        keep.append(idx)
+        columns["ITEM_CODE"].append(mapped)
+        columns["RULE"].append(meta.get("mapping_rule") or ("DM 23-21" if reverse else None))
+        columns["SOURCE"].append(meta.get("source_item") if meta.get("mapping_rule") else None)
+        columns["COURSE"].append(meta.get("course") or reverse.get("course"))
+        columns["ESAL"].append(meta.get("esal_cat") or reverse.get("esal_cat"))
+        columns["BINDER"].append(meta.get("binder_class") or reverse.get("binder_class"))
+    return keep, columns
+
+
+def test_remap_frame_matches_row_by_row_remap():
+    xwalk = load_crosswalk(DATA / "hma_crosswalk_dm23_21.csv")
+    reverse_meta = {
+        row.new_pay_item: {"course": row.course, "esal_cat": row.esal_cat, "binder_class": row.binder_class}
+        for row in xwalk.values()
+        if row.new_pay_item
+    }
+    frame = pd.DataFrame(
+        {
+            "ITEM_CODE": ["401-07321", "410-10128", "999-99999", "401-000001", "401-07321", None],
+            "UNIT_PRICE": [80.0, 90.0, 5.0, 85.0, 81.0, 1.0],
+        },
+        index=[10, 11, 12, 13, 14, 15],
+    )
+
+    remapped, deleted = remap_frame(frame, xwalk, reverse_meta)
+    keep, expected = _loop_remap(frame, xwalk, reverse_meta)
+
+    assert deleted == len(frame) - len(keep)
+    assert list(remapped.index) == list(range(len(keep)))
+    assert remapped["UNIT_PRICE"].tolist() == frame["UNIT_PRICE"].iloc[keep].tolist()
+    assert remapped["ITEM_CODE"].tolist() == expected["ITEM_CODE"]
+    assert remapped["DM2321_MAPPING_RULE"].tolist() == expected["RULE"]
+    assert remapped["DM2321_SOURCE_ITEM"].tolist() == expected["SOURCE"]
+    assert remapped["DM2321_COURSE"].tolist() == expected["COURSE"]
+    assert remapped["DM2321_ESAL_CAT"].tolist() == expected["ESAL"]
+    assert remapped["DM2321_BINDER_CLASS"].tolist() == expected["BINDER"]
+
+
+def test_remap_frame_all_deleted_returns_empty_slice():
+    xwalk = load_crosswalk(DATA / "hma_crosswalk_dm23_21.csv")
+    frame = pd.DataFrame({"ITEM_CODE": ["410-10128"], "UNIT_PRICE": [90.0]})
+    remapped, deleted = remap_frame(frame, xwalk)
+    assert deleted == 1
+    assert remapped.empty
+    assert list(remapped.columns) == ["ITEM_CODE", "UNIT_PRICE"]
+
+
 def test_dm2321_quantity_band_is_disabled_for_history():
     xwalk = load_crosswalk(DATA / "hma_crosswalk_dm23_21.csv")
     bid = load_bidtabs_files(BIDTABS)
@@ -141,6 +141,62 @@ def test_design_memo_rollup_relaxes_quantity_filter(monkeypatch):
     assert detail["QUANTITY_FILTER_RELAXED"].all()
 
 
+def _bid_row(item_code: str, unit_price: float, quantity: float, letting_date: str) -> dict:
+    return {
+        "ITEM_CODE": item_code,
+        "UNIT_PRICE": unit_price,
+        "QUANTITY": quantity,
+        "WEIGHT": 1.0,
+        "REGION": 3,
+        "LETTING_DATE": letting_date,
+    }
+
+
+def test_design_memo_rollup_pool_shared_across_rows(monkeypatch):
+    rows = [_blank_row("401-11526", 5000.0), _blank_row("401-11526", 5000.0), _blank_row("401-11526", 50.0)]
+    monkeypatch.setattr(reference_data, "load_unit_price_summary", lambda: {})
+
+    lookups = []
+    real_get_pool = cli.get_pool_for_codes
+
+    def _counting_get_pool(bidtabs, codes):
+        lookups.append(tuple(codes))
+        return real_get_pool(bidtabs, codes)
+
+    monkeypatch.setattr(cli, "get_pool_for_codes", _counting_get_pool)
+
+    data = [
+        _bid_row("401-10258", 90.0, 40.0, "2024-01-15"),
+        _bid_row("401-10259", 92.0, 55.0, "2023-09-20"),
+        _bid_row("401-10258", 88.0, 60.0, "2023-06-10"),
+    ]
+    apply_non_geometry_fallbacks(rows, pd.DataFrame(data), project_region=3, payitem_details={})
+
+    assert len(lookups) == 1
+    assert [row["SOURCE"] for row in rows] == ["DESIGN_MEMO_ROLLUP"] * 3
+    assert rows[0]["NOTES"] == rows[1]["NOTES"]
+    assert "quantity filter relaxed" in rows[0]["NOTES"]
+    assert "quantity filter relaxed" not in rows[2]["NOTES"]
+
+
+def test_repeated_line_gets_the_same_fallback_price(monkeypatch):
+    # The pricing loop copies a repeated line's row before the fallback pass runs.
+    first = _blank_row("401-11526", 5000.0)
+    rows = [first, _blank_row("401-10258", 10.0), dict(first)]
+    monkeypatch.setattr(reference_data, "load_unit_price_summary", lambda: {})
+    data = [
+        _bid_row("401-10258", 90.0, 40.0, "2024-01-15"),
+        _bid_row("401-10259", 92.0, 55.0, "2023-09-20"),
+        _bid_row("401-10258", 88.0, 60.0, "2023-06-10"),
+    ]
+
+    apply_non_geometry_fallbacks(rows, pd.DataFrame(data), project_region=3, payitem_details={})
+
+    assert rows[0]["SOURCE"] == "DESIGN_MEMO_ROLLUP"
+    assert rows[2] is not rows[0]
+    assert rows[2] == rows[0]
+
+
 def test_design_memo_summary_average_fallback(monkeypatch):
     rows = [_blank_row("401-11526", 500.0)]
 
@@ -5,6 +5,7 @@ import os
 
 import numpy as np
 import pandas as pd
+import pytest
 
 import costest.price_logic as price_logic
 
@@ -64,6 +65,31 @@ def test_quantity_filter_expands_when_pool_sparse():
     assert (combined_detail["QUANTITY"] >= 50.0).all()
 
 
+def test_quantity_filter_keeps_primary_pass_when_expansion_adds_nothing(monkeypatch):
+    df = pd.DataFrame(
+        {
+            "ITEM_CODE": ["S"] * 8,
+            "UNIT_PRICE": np.linspace(10, 17, 8),
+            "QUANTITY": [80.0] * 5 + [400.0] * 3,
+        }
+    )
+    bands = []
+    real_compute = price_logic._compute_categories
+
+    def _tracking_compute(*args, **kwargs):
+        bands.append(kwargs.get("quantity_band"))
+        return real_compute(*args, **kwargs)
+
+    monkeypatch.setattr(price_logic, "_compute_categories", _tracking_compute)
+    price, source, cat_data = price_logic.category_breakdown(df, "S", target_quantity=100.0)
+
+    assert bands == [price_logic.PRIMARY_QUANTITY_BAND]
+    assert cat_data["TOTAL_USED_COUNT"] == 5
+    assert cat_data["QUANTITY_FILTER_WAS_EXPANDED"] is True
+    assert cat_data["QUANTITY_FILTER_UPPER_MULTIPLIER"] == 2.0
+    assert np.isclose(price, 12.0)
+
+
 def test_quantity_filter_stays_tight_when_enough_points():
     df = pd.DataFrame(
         {
@@ -80,3 +106,208 @@ def test_quantity_filter_stays_tight_when_enough_points():
     assert cat_data["QUANTITY_FILTER_WAS_EXPANDED"] is False
     assert cat_data["QUANTITY_FILTER_LOWER_MULTIPLIER"] == 0.5
     assert cat_data["QUANTITY_FILTER_UPPER_MULTIPLIER"] == 1.5
+
+
+def test_bidtabs_index_matches_frame_pricing():
+    today = pd.Timestamp.today().normalize()
+    df = pd.DataFrame(
+        {
+            "ITEM_CODE": ["B", "A", "B", "A", "C", "A", "B", "A"],
+            "UNIT_PRICE": [5.0, 10.0, 6.0, 12.0, 3.0, None, 7.0, 11.0],
+            "QUANTITY": [10.0, 100.0, 12.0, 90.0, 1.0, 80.0, 11.0, 110.0],
+            "REGION": [1, 2, 1, 2, 3, 2, 2, 1],
+            "LETTING_DATE": [
+                today - pd.DateOffset(months=m) for m in (2, 3, 14, 5, 1, 7, 30, 26)
+            ],
+        },
+        index=[10, 11, 12, 13, 14, 15, 16, 17],
+    )
+    index = price_logic.BidTabsIndex(df)
+
+    assert index.item_codes == ["A", "B", "C"]
+    pd.testing.assert_frame_equal(index.pool("A"), price_logic._prepare_pool(df, "A"))
+    assert index.pool("MISSING").empty
+
+    for code in ("A", "B", "C", "MISSING"):
+        expected = price_logic.category_breakdown(df, code, project_region=2, include_details=True)
+        actual = price_logic.category_breakdown(index, code, project_region=2, include_details=True)
+        assert actual[1] == expected[1]
+        assert actual[4] == expected[4]
+        np.testing.assert_equal(actual[0], expected[0])
+        assert actual[2] == expected[2]
+        pd.testing.assert_frame_equal(actual[5], expected[5])
+
+    pooled = price_logic.get_pool_for_codes(index, ["B", "A"])
+    pd.testing.assert_frame_equal(pooled, price_logic.get_pool_for_codes(df, ["B", "A"]))
+
+
+def test_batch_category_breakdown_matches_per_item():
+    today = pd.Timestamp.today().normalize()
+    rng = np.random.default_rng(7)
+    rows = 400
+    df = pd.DataFrame(
+        {
+            "ITEM_CODE": rng.choice(["A", "B", "C", "D"], size=rows),
+            "UNIT_PRICE": rng.normal(50.0, 10.0, size=rows).round(2),
+            "WEIGHT": rng.uniform(0.5, 2.0, size=rows),
+            "QUANTITY": rng.uniform(10.0, 300.0, size=rows).round(1),
+            "REGION": rng.integers(1, 4, size=rows),
+            "LETTING_DATE": [today - pd.DateOffset(months=int(m)) for m in rng.integers(0, 40, size=rows)],
+        },
+        index=np.arange(1000, 1000 + rows),
+    )
+    df.loc[df.index[::17], "UNIT_PRICE"] = np.nan
+    df.loc[df.index[::23], "LETTING_DATE"] = pd.NaT
+    index = price_logic.BidTabsIndex(df)
+
+    requests = [("A", 100.0), ("B", None), ("C", 20.0), ("MISSING", 5.0), ("A", 100.0), ("D", 290.0)]
+    batch = price_logic.batch_category_breakdown(index, requests, project_region=2, include_details=True)
+
+    assert len(batch) == len(requests)
+    for (code, target), actual in zip(requests, batch):
+        expected = price_logic.category_breakdown(
+            df, code, project_region=2, include_details=True, target_quantity=target
+        )
+        np.testing.assert_equal(actual[0], expected[0])
+        assert actual[1] == expected[1]
+        np.testing.assert_equal(actual[2], expected[2])
+        assert actual[4] == expected[4]
+        for name, frame in expected[3].items():
+            assert actual[3][name].index.tolist() == frame.index.tolist()
+        assert actual[5].index.tolist() == expected[5].index.tolist()
+
+    assert batch[0][2] is not batch[4][2]
+
+
+def test_months_before_matches_calendar_windows():
+    as_of = pd.Timestamp("2024-03-31")
+    dates = pd.to_datetime(
+        ["2024-04-01", "2024-03-31", "2024-02-29", "2024-02-28", "2023-03-31", "2023-03-30", "2021-03-31", None]
+    )
+    ages = price_logic.months_before(dates.to_numpy(dtype="datetime64[ns]"), as_of)
+
+    assert ages.tolist() == [
+        price_logic.FUTURE_LETTING_AGE,
+        0,
+        1,
+        2,
+        12,
+        13,
+        36,
+        price_logic.UNKNOWN_LETTING_AGE,
+    ]
+    for _, _, min_months, max_months in price_logic.CATEGORY_DEFS:
+        lower = as_of - pd.DateOffset(months=max_months)
+        upper = as_of - pd.DateOffset(months=min_months)
+        expected = (dates >= lower) & ((dates <= upper) if min_months == 0 else (dates < upper))
+        if min_months == 0:
+            expected |= dates.isna()
+        mask = price_logic._window_mask(ages, min_months, max_months)
+        assert mask.tolist() == list(expected)
+
+
+def test_bidtabs_index_as_of_hides_later_bids():
+    as_of = pd.Timestamp("2023-06-30")
+    df = pd.DataFrame(
+        {
+            "ITEM_CODE": ["A", "A", "B", "A", "A", "A"],
+            "UNIT_PRICE": [10.0, 50.0, 7.0, 12.0, 11.0, 13.0],
+            "QUANTITY": [100.0, 100.0, 5.0, 90.0, 110.0, 95.0],
+            "REGION": [1, 1, 1, 1, 1, 1],
+            "LETTING_DATE": ["2023-01-15", "2024-02-01", "2023-03-01", None, "2022-11-20", "2023-07-01"],
+        }
+    )
+    index = price_logic.BidTabsIndex(df).at(as_of)
+
+    assert index.pool("A").index.tolist() == [0, 3, 4]
+    assert index.rows("A").index.tolist() == [0, 3, 4]
+    assert price_logic.bidtabs_frame(index).index.tolist() == [0, 2, 3, 4]
+
+    truncated = price_logic.BidTabsIndex(df.loc[[0, 2, 3, 4]], as_of=as_of)
+    expected = price_logic.category_breakdown(truncated, "A", project_region=1, include_details=True)
+    actual = price_logic.category_breakdown(index, "A", project_region=1, include_details=True)
+    np.testing.assert_equal(actual[0], expected[0])
+    assert actual[1] == expected[1]
+    np.testing.assert_equal(actual[2], expected[2])
+    pd.testing.assert_frame_equal(actual[5], expected[5])
+
+    [batched] = price_logic.batch_category_breakdown(index, [("A", 100.0)], project_region=1)
+    single = price_logic.category_breakdown(index, "A", project_region=1, target_quantity=100.0)
+    np.testing.assert_equal(batched[2], single[2])
+
+
+def test_frame_pool_reads_pricing_as_of_per_call(monkeypatch, caplog):
+    df = pd.DataFrame(
+        {
+            "ITEM_CODE": ["A", "A", "A"],
+            "UNIT_PRICE": [10.0, 50.0, 12.0],
+            "LETTING_DATE": ["2023-01-15", "2024-02-01", "2023-07-01"],
+        }
+    )
+    monkeypatch.delenv("PRICING_AS_OF", raising=False)
+    assert price_logic._prepare_pool(df, "A").index.tolist() == [0, 1, 2]
+
+    monkeypatch.setenv("PRICING_AS_OF", "2023-06-30")
+    with caplog.at_level("INFO", logger="costest.price_logic"):
+        assert price_logic._prepare_pool(df, "A").index.tolist() == [0]
+    assert "ignoring 2 bid(s) let after 2023-06-30" in caplog.text
+    assert price_logic._prepare_pool(df, "A", as_of="2023-12-31").index.tolist() == [0, 2]
+
+
+def test_breakdown_memo_serves_repeated_requests():
+    today = pd.Timestamp.today().normalize()
+    df = pd.DataFrame(
+        {
+            "ITEM_CODE": ["A", "A", "A", "B"],
+            "UNIT_PRICE": [10.0, 11.0, 12.0, 5.0],
+            "QUANTITY": [100.0, 90.0, 110.0, 4.0],
+            "REGION": [1, 1, 2, 1],
+            "LETTING_DATE": [today - pd.DateOffset(months=m) for m in (1, 2, 3, 4)],
+        }
+    )
+    index = price_logic.BidTabsIndex(df)
+
+    detailed = price_logic.category_breakdown(index, "A", project_region=1, include_details=True)
+    plain = price_logic.category_breakdown(index, "A", project_region=1)
+    again = price_logic.category_breakdown(index, "A", project_region=1, include_details=True)
+    other_target = price_logic.category_breakdown(index, "A", project_region=1, target_quantity=100.0)
+
+    assert index.memo.stats()["hits"] == 2
+    assert index.memo.stats()["misses"] == 2
+    assert len(plain) == 3
+    assert plain[2] == detailed[2] and plain[2] is not detailed[2]
+    assert again[4] == detailed[4]
+    assert other_target[2]["QUANTITY_FILTER_LOWER_MULTIPLIER"] == 0.5
+
+    first, second = price_logic.batch_category_breakdown(index, [("B", None), ("B", None)], project_region=1)
+    assert index.memo.stats()["hits"] == 2
+    assert first[2] == second[2] and first[2] is not second[2]
+
+    batch = price_logic.batch_category_breakdown(index, [("A", None), ("B", None), ("B", None)], project_region=1)
+    assert batch[0][2] == plain[2]
+    assert batch[1][2] == batch[2][2] and batch[1][2] is not batch[2][2]
+    assert index.at(today).memo.stats()["size"] == 0
+
+
+def test_as_of_rejected_before_any_corpus_work(monkeypatch, capsys):
+    from costest import api, cli
+    from costest.config import load_config
+
+    assert load_config({"PRICING_AS_OF": " 2024-06-30 "}, None).pricing_as_of == "2024-06-30"
+    with pytest.raises(ValueError, match="PRICING_AS_OF '2024-13-45'"):
+        load_config({"PRICING_AS_OF": "2024-13-45"}, None)
+    with pytest.raises(ValueError, match="EstimateOptions.as_of"):
+        api._options_env(api.EstimateOptions(as_of="30/06/2024"))
+    with pytest.raises(ValueError, match="expected a date in YYYY-MM-DD form"):
+        price_logic.resolve_as_of("2024-13-45")
+
+    monkeypatch.setattr(cli, "run", lambda **_: pytest.fail("run() reached with a bad as-of date"))
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(["--as-of", "2024-13-45"])
+    assert excinfo.value.code == 2
+    assert "Invalid --as-of '2024-13-45'" in capsys.readouterr().err
+
+    monkeypatch.setenv("PRICING_AS_OF", "2024-02-30")
+    with pytest.raises(SystemExit):
+        cli.main([])
+    assert "Invalid PRICING_AS_OF '2024-02-30'" in capsys.readouterr().err
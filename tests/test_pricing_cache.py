@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from costest import price_logic, pricing_cache
+from costest.pricing_cache import open_pricing_cache
+
+
+def _corpus():
+    today = pd.Timestamp.today().normalize()
+    return pd.DataFrame(
+        {
+            "ITEM_CODE": ["A", "A", "A", "B", "A"],
+            "UNIT_PRICE": [10.0, 11.0, 12.0, 5.0, 40.0],
+            "QUANTITY": [100.0, 90.0, 110.0, 4.0, 95.0],
+            "REGION": [1, 1, 2, 1, 1],
+            "JOB_SIZE": [1e6, 1e6, 1e6, 1e6, 9e6],
+            "LETTING_DATE": [today - pd.DateOffset(months=m) for m in (1, 2, 3, 4, 14)],
+        }
+    )
+
+
+def _assert_same(actual, expected):
+    np.testing.assert_equal(actual[0], expected[0])
+    assert actual[1] == expected[1]
+    np.testing.assert_equal(actual[2], expected[2])
+    assert actual[4] == expected[4]
+    assert actual[5].index.tolist() == expected[5].index.tolist()
+    for name, frame in expected[3].items():
+        assert actual[3][name].index.tolist() == frame.index.tolist()
+
+
+def test_pricing_cache_serves_later_runs(tmp_path):
+    bid = _corpus()
+    first_index = price_logic.BidTabsIndex(bid)
+    first_cache = open_pricing_cache("corpus-1", tmp_path)
+    first_index.result_store = first_cache
+    expected = price_logic.category_breakdown(first_index, "A", project_region=1, include_details=True)
+    first_cache.flush()
+    first_cache.close()
+    assert first_cache.stored == 1
+
+    second_index = price_logic.BidTabsIndex(bid)
+    second_cache = open_pricing_cache("corpus-1", tmp_path)
+    second_index.result_store = second_cache
+    actual = price_logic.category_breakdown(second_index, "A", project_region=1, include_details=True)
+    plain = price_logic.category_breakdown(second_index, "B", project_region=1)
+    assert second_cache.hits == 1
+    assert second_cache.misses == 1
+    _assert_same(actual, expected)
+    assert len(plain) == 3
+
+    # A contract filter that drops one of A's rows changes its pool, so A is recomputed.
+    filtered_index = price_logic.BidTabsIndex(bid.loc[bid["JOB_SIZE"] < 5e6])
+    filtered_index.result_store = second_cache
+    price_logic.category_breakdown(filtered_index, "A", project_region=1, include_details=True)
+    assert second_cache.misses == 2
+    second_cache.flush()
+    second_cache.close()
+
+
+def _prime(tmp_path, corpus_key, items=("A", "B")):
+    cache = open_pricing_cache(corpus_key, tmp_path)
+    index = price_logic.BidTabsIndex(_corpus())
+    index.result_store = cache
+    for item in items:
+        price_logic.category_breakdown(index, item, project_region=1, include_details=True)
+    cache.flush()
+    cache.close()
+
+
+def test_pricing_cache_keeps_other_corpora_and_evicts_least_recent(tmp_path):
+    _prime(tmp_path, "corpus-1")
+
+    reopened = open_pricing_cache("corpus-2", tmp_path, max_entries=3)
+    assert reopened.stats()["entries"] == 2
+    index = price_logic.BidTabsIndex(_corpus())
+    index.result_store = reopened
+    price_logic.batch_category_breakdown(index, [("A", None), ("B", 4.0)], project_region=1, include_details=True)
+    reopened.flush()
+    assert reopened.misses == 2
+    assert reopened.evicted == 1
+    assert reopened.stats()["entries"] == 3
+    reopened.close()
+
+    again = open_pricing_cache("corpus-2", tmp_path)
+    index = price_logic.BidTabsIndex(_corpus())
+    index.result_store = again
+    price_logic.category_breakdown(index, "A", project_region=1, include_details=True)
+    assert again.hits == 1
+    again.close()
+
+
+def test_pricing_cache_drops_entries_past_max_age(tmp_path, monkeypatch):
+    _prime(tmp_path, "corpus-1")
+    later = time.time() + 31 * 86400
+    monkeypatch.setattr(pricing_cache.time, "time", lambda: later)
+    cache = open_pricing_cache("corpus-1", tmp_path)
+    cache.flush()
+    assert cache.evicted == 2
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_pricing_code_changes_invalidate_entries(tmp_path, monkeypatch):
+    _prime(tmp_path, "corpus-1", items=("A",))
+    monkeypatch.setattr(pricing_cache, "PRICING_LOGIC_KEY", "edited")
+    cache = open_pricing_cache("corpus-1", tmp_path)
+    index = price_logic.BidTabsIndex(_corpus())
+    index.result_store = cache
+    price_logic.category_breakdown(index, "A", project_region=1, include_details=True)
+    assert (cache.hits, cache.misses) == (0, 1)
+    cache.close()
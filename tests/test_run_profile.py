@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import tracemalloc
+
+from costest.cli import _pricing_path
+from costest.run_profile import RunProfiler
+
+
+def test_stages_nest_spans_and_counts():
+    profiler = RunProfiler()
+    profiler.stage("Ingest")
+    profiler.count(bidtabs_rows=120)
+    profiler.stage("Pricing")
+    with profiler.span("Batch category pricing"):
+        profiler.count(requests=3)
+    profiler.count(priced_rows=3)
+    profiler.finish()
+
+    payload = profiler.as_dict()
+    assert [stage["name"] for stage in payload["children"]] == ["Ingest", "Pricing"]
+    ingest, pricing = payload["children"]
+    assert ingest["counts"] == {"bidtabs_rows": 120}
+    assert pricing["counts"] == {"priced_rows": 3}
+    assert pricing["children"][0]["counts"] == {"requests": 3}
+    assert payload["wall_seconds"] >= ingest["wall_seconds"] >= 0
+    assert "alloc_delta_mb" not in ingest
+
+
+def test_item_latency_histogram_and_slowest():
+    profiler = RunProfiler(slowest_items=2)
+    profiler.record_item("A", 0.0005, "category:DIST_12M")
+    profiler.record_item("B", 0.030, "alternate_seek")
+    profiler.record_item("C", 7.0, "fallback:UNIT_PRICE_SUMMARY")
+    latency = profiler.item_latency()
+
+    assert latency["items"] == 3
+    assert latency["histogram"]["<=1ms"] == 1
+    assert latency["histogram"]["<=50ms"] == 1
+    assert latency["histogram"][">5000ms"] == 1
+    assert [entry["item_code"] for entry in latency["slowest"]] == ["C", "B"]
+    assert latency["slowest"][0]["path"] == "fallback:UNIT_PRICE_SUMMARY"
+
+
+def test_memory_tracing_is_scoped_to_the_profiler():
+    was_tracing = tracemalloc.is_tracing()
+    profiler = RunProfiler(trace_memory=True)
+    profiler.stage("Allocate")
+    blob = [bytes(1024) for _ in range(256)]
+    profiler.finish()
+    stage = profiler.as_dict()["children"][0]
+    assert stage["alloc_delta_mb"] > 0
+    assert tracemalloc.is_tracing() == was_tracing
+    del blob
+
+
+def test_pricing_path_labels():
+    assert _pricing_path({"ALTERNATE_USED": True}, prefetched=True) == "alternate_seek (prefetched)"
+    assert _pricing_path({"SOURCE": "DIST_12M"}) == "category:DIST_12M"
+    assert _pricing_path({"SOURCE": "DESIGN_MEMO_ROLLUP:401-1<-A"}) == "fallback:DESIGN_MEMO_ROLLUP"
+    assert _pricing_path({"SOURCE": "NO_DATA"}) == "no_data"
+
+
+def _leaf(n):
+    return sum(i * i for i in range(n))
+
+
+def _outer():
+    return _leaf(50_000) + _leaf(20_000)
+
+
+def test_profile_call_writes_pstats_and_collapsed_stacks(tmp_path):
+    import pstats
+
+    from costest.run_profile import COLLAPSED_NAME, PSTATS_NAME, profile_call
+
+    assert profile_call(tmp_path, _outer) == _outer()
+
+    stats = pstats.Stats(str(tmp_path / PSTATS_NAME))
+    assert any(name == "_outer" for _, _, name in stats.stats)
+    lines = (tmp_path / COLLAPSED_NAME).read_text().splitlines()
+    stacks = dict(line.rsplit(" ", 1) for line in lines)
+    assert any("(_outer);" in stack and "(_leaf)" in stack for stack in stacks)
+    assert all(int(value) > 0 for value in stacks.values())
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from costest import cli
+from costest.bidtabs_io import QuantitiesColumnError
+from costest.config import load_config
+from costest.serve import EstimateRequestError, EstimatorService, ServiceBusy, make_server
+
+
+class _EchoService(EstimatorService):
+    """Service double that echoes the quantities instead of running the pipeline."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+        self.release.set()
+
+    def _estimate(self, quantities, options):
+        assert self.release.wait(5)
+        return quantities.assign(UNIT_PRICE_EST=12.5, DISTRICT=options.get("district"))
+
+
+def test_estimate_endpoint_returns_audit_columns():
+    service = _EchoService(load_config(dict(os.environ)))
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        port = server.server_address[1]
+        body = json.dumps(
+            {
+                "quantities": [{"ITEM_CODE": "401-10258", "DESCRIPTION": "HMA", "UNIT": "TON", "QUANTITY": 5}],
+                "district": "Seymour",
+            }
+        ).encode("utf-8")
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/estimate",
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            payload = json.loads(response.read())
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+    assert payload["columns"] == ["ITEM_CODE", "DESCRIPTION", "UNIT", "QUANTITY", "UNIT_PRICE_EST", "DISTRICT"]
+    assert payload["rows"] == [["401-10258", "HMA", "TON", 5, 12.5, "Seymour"]]
+
+
+def test_full_queue_is_rejected():
+    service = _EchoService(load_config(dict(os.environ)), workers=1, queue_size=0)
+    service.release.clear()
+    frame = pd.DataFrame({"ITEM_CODE": ["401-10258"]})
+    first = threading.Thread(target=service.estimate, args=(frame, {}))
+    first.start()
+    try:
+        deadline = time.time() + 5
+        while service.status()["in_flight"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(ServiceBusy):
+            service.estimate(frame, {})
+    finally:
+        service.release.set()
+        first.join(5)
+        service.close()
+    assert service.status()["in_flight"] == 0
+
+
+def test_request_options_override_project_inputs(tmp_path):
+    service = EstimatorService(load_config(dict(os.environ)))
+    try:
+        cfg = service._request_config(
+            {"expected_cost": "2500000", "district": "Seymour", "as_of": "2024-06-30"},
+            tmp_path,
+            tmp_path / "q.xlsx",
+        )
+    finally:
+        service.close()
+    assert cfg.output_audit == tmp_path / "Estimate_Audit.csv"
+    assert cfg.expected_contract_cost == 2_500_000.0
+    assert cfg.project_district == "Seymour"
+    assert cfg.pricing_as_of == "2024-06-30"
+    assert cfg.pricing_workers == 1
+
+
+def test_bad_requests_are_told_apart_from_internal_errors(tmp_path, monkeypatch):
+    service = EstimatorService(load_config(dict(os.environ)))
+    service.work_dir = tmp_path
+    service._corpora = object()
+    frame = pd.DataFrame({"ITEM_CODE": ["401-10258"], "QUANTITY": [5]})
+
+    def missing_column(**_):
+        raise QuantitiesColumnError("Missing one of ('UNIT', 'UOM') in quantities file")
+
+    def internal_bug(**_):
+        raise KeyError("UNIT_PRICE_EST")
+
+    try:
+        with pytest.raises(EstimateRequestError, match="as_of '2024-13-45'"):
+            service._request_config({"as_of": "2024-13-45"}, tmp_path, tmp_path / "q.xlsx")
+        monkeypatch.setattr(cli, "run", missing_column)
+        with pytest.raises(EstimateRequestError, match=r"Missing one of \('UNIT', 'UOM'\)"):
+            service._estimate(frame, {})
+        monkeypatch.setattr(cli, "run", internal_bug)
+        with pytest.raises(KeyError) as excinfo:
+            service._estimate(frame, {})
+        assert not isinstance(excinfo.value, EstimateRequestError)
+    finally:
+        service.close()